@@ -1,28 +1,65 @@
 import logging
 import os
+import sqlite3
 from logging.handlers import RotatingFileHandler
 
-from flask import Flask, jsonify
+from flask import Flask, g, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, get_jwt, get_jwt_identity, verify_jwt_in_request
 from flask_cors import CORS
 from flask_marshmallow import Marshmallow
 from flask_migrate import Migrate # Import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from .config import Config
 from .utils.exceptions import AuthError
+from .utils.session_cache import SessionCache
+from .utils.password_hasher import PasswordHasher
+from .utils.rate_limiter import RateLimiter
+from .utils.search_index import SearchIndex
+from .utils.response_cache import ResponseCache
+from .utils.storage import Storage
+from .utils.media_cleanup import MediaCleanup
+from .utils.media_processing import MediaProcessor
+from .utils.answer_keys import AnswerKeyCache
 
 db = SQLAlchemy()
 jwt = JWTManager()
 cors = CORS()
 ma = Marshmallow()
 migrate = Migrate() # Initialize Migrate
-
-# A set to store revoked token identifiers
-# For a production environment, this should be a persistent store like Redis.
-revoked_tokens = set()
+# Caches each user's active session jti for the blocklist check.
+# Set SESSION_CACHE_BACKEND to 'redis' to share it between workers.
+session_cache = SessionCache()
+# Runs password hashing on a bounded process pool (see PASSWORD_HASH_* in config).
+password_hasher = PasswordHasher()
+# Sliding-window limits on login attempts; shared between workers when RATE_LIMIT_BACKEND is 'redis'.
+rate_limiter = RateLimiter()
+# Full-text search over courses, lessons and exercises (see SEARCH_BACKEND in config).
+search_index = SearchIndex(db)
+# Serialized JSON for read-mostly endpoints such as the published catalog (see RESPONSE_CACHE_* in config).
+response_cache = ResponseCache()
+# Local folder or S3-compatible bucket holding uploaded files (see STORAGE_BACKEND in config).
+storage = Storage()
+# Removes uploaded files of deleted lessons and courses in the background (see MEDIA_CLEANUP_* in config).
+media_cleanup = MediaCleanup()
+# Builds renditions, thumbnails and waveforms of uploads on a process pool (see MEDIA_PROCESSING_* in config).
+media_processor = MediaProcessor()
+# Exercise answer keys compiled once per worker for grading (see GRADING_CACHE_SIZE in config).
+answer_keys = AnswerKeyCache()
+
+# SQLite only enforces foreign keys, and so ON DELETE CASCADE, when each connection asks for it.
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
 
 def create_app():
-    app = Flask(__name__)
+    # No static route: uploads live under app/static and are only served, with
+    # authorization, through /api/media.
+    app = Flask(__name__, static_folder=None)
     app.config.from_object(Config)
 
     # Configure Logging
@@ -48,6 +85,9 @@ def create_app():
         elif isinstance(e, AuthError):
             # Handle custom AuthError exceptions by returning a JSON response
             app.logger.warning(f"AuthError caught: {e.message} (Status: {e.status_code})")
+            if getattr(e, 'retry_after', None):
+                # ServiceBusy and TooManyRequests tell the client when to retry
+                return jsonify(message=e.message), e.status_code, {'Retry-After': str(e.retry_after)}
             return jsonify(message=e.message), e.status_code
         
         # Log and return a generic error for all other unhandled exceptions
@@ -59,6 +99,15 @@ def create_app():
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}}) # Example CORS config
     ma.init_app(app)
     migrate.init_app(app, db) # Initialize Migrate with app and db
+    session_cache.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    search_index.init_app(app)
+    response_cache.init_app(app)
+    storage.init_app(app)
+    media_cleanup.init_app(app)
+    media_processor.init_app(app)
+    answer_keys.init_app(app)
 
     # Import models here to ensure they are registered with SQLAlchemy
     from app.models.user import User
@@ -68,12 +117,30 @@ def create_app():
     from app.models.course_content import CourseContent # Import CourseContent model
     from app.models.exercise import Exercise, ExerciseAttempt # Import Exercise and ExerciseAttempt models
     from app.models.progress import ProgressTracking # Import ProgressTracking model
+    from app.models.media import MediaFile # Import MediaFile model
+
+    from app.utils.principal import Principal
+    from app.services.auth_service import AuthService
 
-    # JWT user lookup loader
+    # JWT user lookup loader. Resolves the request's Principal (see utils/principal.py).
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]
-        return User.query.get(identity)
+        # With JWT_ROLE_CLAIMS_ENABLED, access tokens carry the role and account status,
+        # so the principal is built from the verified token without touching the database.
+        if app.config.get('JWT_ROLE_CLAIMS_ENABLED') and 'role' in jwt_data:
+            principal = Principal.from_claims(jwt_data)
+        else:
+            identity = jwt_data["sub"]
+            user = User.query.get(identity)
+            principal = Principal.from_user(user) if user else None
+        g.principal = principal
+        return principal
+
+    # The loader above caches the principal on `g`, which can outlive a single request
+    # when an app context is pushed around it, so start each request clean.
+    @app.before_request
+    def reset_request_principal():
+        g.pop('principal', None)
 
     # Register a callback function that checks if a JWT is in the blocklist.
     # This function is called automatically by Flask-JWT-Extended when JWT_BLACKLIST_ENABLED is True.
@@ -81,15 +148,18 @@ def create_app():
     def check_if_token_in_blocklist(jwt_header, jwt_payload):
         user_id = jwt_payload["sub"]
         jti = jwt_payload["jti"] # Get the unique identifier for the JWT
-        
-        auth_entry = Authentication.query.filter_by(user_id=user_id).first()
+
+        # The active jti is served from the session cache; the authentication table
+        # is only queried on a miss. AuthService invalidates the entry on login,
+        # refresh and logout.
+        session_jti = session_cache.get_session_jti(user_id, lambda: AuthService.get_session_jti(user_id))
 
         # A token is considered in the blocklist (revoked) if:
         # 1. No authentication entry exists for the user (shouldn't happen if user_lookup_loader works).
         # 2. The stored session_token for the user does not match the current token's jti.
         #    This implies the user logged out (session_token cleared) or logged in again
         #    (session_token updated to a new jti, invalidating old tokens).
-        if not auth_entry or auth_entry.session_token != jti:
+        if session_jti is None or session_jti != jti:
             return True # Token is in blocklist (revoked)
         
         return False # Token is not in blocklist (valid)
@@ -101,6 +171,8 @@ def create_app():
     from app.routes.progress import progress_bp
     from app.routes.speech import speech_bp
     from app.routes.admin import admin_bp
+    from app.routes.search import search_bp
+    from app.routes.media import media_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(courses_bp, url_prefix='/api/courses')
@@ -109,5 +181,10 @@ def create_app():
     app.register_blueprint(progress_bp, url_prefix='/api/progress')
     app.register_blueprint(speech_bp, url_prefix='/api/speech')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(media_bp, url_prefix='/api/media')
+
+    from app.commands import register_commands
+    register_commands(app)
 
     return app
@@ -0,0 +1,104 @@
+import click
+from flask.cli import with_appcontext
+
+@click.command('import-users')
+@click.argument('path', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Input format. Guessed from the file name if omitted.')
+@click.option('--batch-size', type=int, default=None, help='Rows per multi-row INSERT.')
+@click.option('--workers', type=int, default=None, help='Processes used for password hashing.')
+@with_appcontext
+def import_users_command(path, fmt, batch_size, workers):
+    """Bulk-create users from a CSV or NDJSON file."""
+    from app.services.user_import_service import UserImportService
+
+    fmt = fmt or UserImportService.detect_format(path.name)
+    report = UserImportService.import_users(path, fmt, batch_size=batch_size, workers=workers)
+    for error in report['errors']:
+        click.echo(f"row {error['row']} ({error['email']}): {error['message']}", err=True)
+    click.echo(f"Created {report['created']} users, {report['failed']} rows failed.")
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuilds the full-text search index from the course, lesson and exercise tables."""
+    from app import search_index
+
+    search_index.rebuild()
+    click.echo(f"Rebuilt the {type(search_index.backend).__name__} search index.")
+
+@click.command('reconcile-enrollment-counts')
+@with_appcontext
+def reconcile_enrollment_counts_command():
+    """Recomputes courses.enrollment_count from the enrollments table. Meant to run periodically, e.g. from cron."""
+    from app.services.course_service import CourseService
+
+    fixed = CourseService.reconcile_enrollment_counts()
+    click.echo(f"Corrected the enrollment count of {fixed} courses.")
+
+@click.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Print every query plan, not just failures.')
+@with_appcontext
+def check_query_plans_command(verbose):
+    """Fails if a hot service query would scan a whole table (SQLite only)."""
+    from app import db
+    from app.utils.query_plans import service_plans, full_scans
+
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException("check-query-plans runs EXPLAIN QUERY PLAN and needs a SQLite database.")
+
+    failures = 0
+    for name, statement, plan in service_plans():
+        scans = full_scans(plan)
+        if scans:
+            failures += 1
+        if scans or verbose:
+            click.echo(f"{'FAIL' if scans else 'ok'}   {name}: {' '.join(statement.split())}")
+            for line in plan:
+                click.echo(f"       {line}")
+    if failures:
+        raise click.ClickException(f"{failures} queries fall back to a full table scan.")
+    click.echo("All hot queries use an index.")
+
+@click.command('process-media')
+@click.option('--retry-failed', is_flag=True, help='Also retry uploads whose processing failed.')
+@with_appcontext
+def process_media_command(retry_failed):
+    """Processes uploads whose background jobs were lost, e.g. by a restart, in this process."""
+    from app import media_processor
+    from app.services.content_service import ContentService
+
+    if not media_processor.enabled:
+        raise click.ClickException("Media processing is off: ffmpeg was not found or MEDIA_PROCESSING_WORKERS is 0.")
+    processed, failed = ContentService.reprocess_media(include_failed=retry_failed)
+    click.echo(f"Processed {processed} files, {failed} failed.")
+
+@click.command('gc-uploads')
+@click.option('--grace-hours', type=float, default=None, help='Keep unreferenced files younger than this (default UPLOAD_GC_GRACE_HOURS).')
+@click.option('--dry-run', is_flag=True, help='List the orphaned files without removing them.')
+@with_appcontext
+def gc_uploads_command(grace_hours, dry_run):
+    """Removes uploaded files that no course content, exercise or course image uses."""
+    from datetime import timedelta
+    from flask import current_app
+    from app import media_cleanup
+
+    if grace_hours is None:
+        grace_hours = current_app.config.get('UPLOAD_GC_GRACE_HOURS', 24)
+    count = total = 0
+    for name, size in media_cleanup.sweep(timedelta(hours=grace_hours), dry_run=dry_run):
+        count += 1
+        total += size
+        if dry_run:
+            click.echo(f"{size:>12}  {name}")
+    verb = 'Found' if dry_run else 'Removed'
+    click.echo(f"{verb} {count} orphaned files ({total / (1024 * 1024):.1f} MiB).")
+
+def register_commands(app):
+    """Registers the app's `flask` CLI commands."""
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(reconcile_enrollment_counts_command)
+    app.cli.add_command(process_media_command)
+    app.cli.add_command(gc_uploads_command)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -24,7 +25,130 @@ class Config:
     JWT_TOKEN_LOCATION = ["headers"]
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ["access"]
+    # Put role and account-status claims in access tokens and authorize role_required
+    # routes from them alone. Role changes and deactivation revoke the user's session.
+    JWT_ROLE_CLAIMS_ENABLED = os.environ.get('JWT_ROLE_CLAIMS_ENABLED', 'false').lower() == 'true'
+
+    # Session validity cache used by the JWT blocklist check.
+    # 'memory' is per-worker; 'redis' shares invalidations across all workers.
+    SESSION_CACHE_BACKEND = os.environ.get('SESSION_CACHE_BACKEND', 'memory')
+    SESSION_CACHE_REDIS_URL = os.environ.get('SESSION_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    SESSION_CACHE_TTL = int(os.environ.get('SESSION_CACHE_TTL', 60)) # seconds
+    SESSION_CACHE_MAX_SIZE = int(os.environ.get('SESSION_CACHE_MAX_SIZE', 10000))
+
+    # Password hashing. The method must include its cost (werkzeug format, e.g.
+    # 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'); hashes made with any other
+    # method are upgraded on the user's next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2)) # 0 hashes inline
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 8))
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT', 10)) # seconds
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1)) # seconds
+
+    # Login rate limiting, as (attempts, window in seconds).
+    # 'redis' shares the windows between workers, falling back to per-worker counting if redis is down.
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    LOGIN_RATE_LIMIT_PER_EMAIL = (10, 300)
+    LOGIN_RATE_LIMIT_PER_IP = (30, 60)
+    # Failed password checks before the account is locked.
+    LOGIN_MAX_FAILED_ATTEMPTS = 5
 
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'static', 'uploads')
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'mp3', 'mp4', 'mov'}
+    # Uploads are streamed to disk in chunks and refused once they pass MAX_UPLOAD_SIZE.
+    MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 200 * 1024 * 1024)) # bytes
+    UPLOAD_CHUNK_SIZE = 1024 * 1024 # bytes
+    # Werkzeug stops reading larger request bodies (413); the margin leaves room for the form fields.
+    MAX_CONTENT_LENGTH = MAX_UPLOAD_SIZE + 1024 * 1024
+
+    # Where uploads are kept: 'local' (UPLOAD_FOLDER) or 's3', any S3-compatible store.
+    # For a local MinIO: S3_ENDPOINT_URL=http://localhost:9000 with its access keys.
+    # Unset S3 credentials come from boto3's usual sources (environment, instance role).
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    S3_BUCKET = os.environ.get('S3_BUCKET')
+    S3_KEY_PREFIX = os.environ.get('S3_KEY_PREFIX', 'uploads/')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')
+    S3_REGION = os.environ.get('S3_REGION')
+    S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID')
+    S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY')
+    # Browsers upload straight to storage (POST /api/courses/<id>/content/upload);
+    # the URL they are handed is valid this long.
+    DIRECT_UPLOAD_EXPIRES = 60 * 60 # seconds
+    # With S3, GET /api/media/<name> redirects to a presigned URL valid this long.
+    MEDIA_URL_EXPIRES = 10 * 60 # seconds
+    # Media links (GET /api/media/<name>/link) carry a token for one file and user. It is
+    # reissued unchanged for this long, so browsers keep their cached copy, and expires
+    # one such period later.
+    MEDIA_LINK_EXPIRES = 60 * 60 # seconds
+
+    # Media delivery (GET /api/media/<name>). Behind nginx, set MEDIA_ACCEL_REDIRECT_PREFIX
+    # to an `internal` location aliased to UPLOAD_FOLDER so nginx streams the file; behind
+    # Apache or lighttpd, set USE_X_SENDFILE instead.
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX') # e.g. '/protected-uploads/'
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+    MEDIA_CACHE_MAX_AGE = 24 * 60 * 60 # seconds browsers keep content-addressed files
+
+    # Background media processing: lower-bitrate renditions, thumbnails and waveform peaks
+    # for video, audio and image uploads. Needs ffmpeg; 0 workers turns it off.
+    MEDIA_PROCESSING_WORKERS = int(os.environ.get('MEDIA_PROCESSING_WORKERS', 1))
+    MEDIA_FFMPEG_PATH = os.environ.get('MEDIA_FFMPEG_PATH') # looked up on PATH if unset
+    MEDIA_PROCESSING_TIMEOUT = 30 * 60 # seconds per ffmpeg run
+    MEDIA_VIDEO_RENDITION_HEIGHT = 480
+    MEDIA_VIDEO_RENDITION_BITRATE = '800k'
+    MEDIA_AUDIO_RENDITION_BITRATE = '64k'
+    MEDIA_THUMBNAIL_WIDTH = 320
+    MEDIA_WAVEFORM_PEAKS = 1000
+    # Files whose last lesson was deleted are removed by a background thread.
+    # A full queue falls back to removing inline; False always removes inline.
+    MEDIA_CLEANUP_ASYNC = os.environ.get('MEDIA_CLEANUP_ASYNC', 'true').lower() == 'true'
+    MEDIA_CLEANUP_QUEUE_SIZE = 100 # pending deletes (one per course or lesson)
+    MEDIA_CLEANUP_BATCH_SIZE = 500 # files checked for other references per query
+    UPLOAD_GC_GRACE_HOURS = 24 # `flask gc-uploads` leaves younger unreferenced files alone
+
+    # Course catalog pagination (GET /api/courses/?limit=)
+    COURSES_PAGE_SIZE = 20
+    COURSES_MAX_PAGE_SIZE = 100
+
+    # Course roster pagination (GET /api/courses/<id>/enrollments?limit=)
+    ROSTER_PAGE_SIZE = 50
+    ROSTER_MAX_PAGE_SIZE = 200
+    # Most users accepted by one bulk enrollment (POST /api/courses/<id>/enrollments)
+    BULK_ENROLL_MAX_USERS = 1000
+
+    # Response cache for the published catalog and /api/courses/meta-info.
+    # Course writes start a new generation; the TTL bounds how stale enrollment counts can get.
+    # 'memory' keeps entries per worker and generations as files in RESPONSE_CACHE_GENERATION_DIR,
+    # which every worker on the machine shares. With more than one host, use 'redis'.
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_GENERATION_DIR = os.environ.get(
+        'RESPONSE_CACHE_GENERATION_DIR', os.path.join(tempfile.gettempdir(), 'lelms-response-cache')
+    )
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60)) # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000))
+
+    # Compiled exercise answer keys kept per worker for grading submissions.
+    GRADING_CACHE_SIZE = 5000
+
+    # Full-text search (GET /api/search/). 'auto' uses SQLite FTS5 or MySQL FULLTEXT
+    # once migration 8b3f61d0e2a4 has created them, else the built-in in-memory index.
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+    SEARCH_INDEX_MAX_AGE = int(os.environ.get('SEARCH_INDEX_MAX_AGE', 300)) # seconds before the in-memory index is reloaded
+    SEARCH_PAGE_SIZE = 20
+    SEARCH_MAX_PAGE_SIZE = 50
+
+    # Bulk user import (admin endpoint and `flask import-users`)
+    USER_IMPORT_BATCH_SIZE = 500 # rows per multi-row INSERT
+    USER_IMPORT_WORKERS = None # hashing processes for `flask import-users`; defaults to the CPU count
+    # The admin endpoint hashes on a small pool, one import at a time, and only takes files
+    # up to USER_IMPORT_MAX_REQUEST_SIZE and USER_IMPORT_MAX_REQUEST_ROWS; larger files go
+    # through `flask import-users`.
+    PASSWORD_HASH_IMPORT_WORKERS = int(os.environ.get('PASSWORD_HASH_IMPORT_WORKERS', 2))
+    USER_IMPORT_MAX_REQUEST_SIZE = 2 * 1024 * 1024 # bytes
+    # Every row is hashed before the response is sent, so the whole import has to finish well
+    # inside the gunicorn worker timeout (30 s by default): at ~0.3 s per PASSWORD_HASH_METHOD
+    # hash on PASSWORD_HASH_IMPORT_WORKERS processes, 100 rows take about 15 s. Raise it together
+    # with the worker timeout or the hashing pool.
+    USER_IMPORT_MAX_REQUEST_ROWS = int(os.environ.get('USER_IMPORT_MAX_REQUEST_ROWS', 100))
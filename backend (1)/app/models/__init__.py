@@ -5,6 +5,7 @@ from .exercise import Exercise, ExerciseType, ExerciseDifficultyLevel
 from .enrollment import Enrollment, EnrollmentStatus
 from .course_content import CourseContent, ContentType
 from .progress import ProgressTracking
+from .media import MediaFile
 # from .feedback import UserFeedback # Assuming UserFeedback model will be defined here
 # Add other models as they are created, e.g.:
 # from .exercise_attempt import ExerciseAttempt
@@ -28,14 +28,28 @@ class Course(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
+    # Child rows are removed by ON DELETE CASCADE foreign keys; passive_deletes keeps
+    # the ORM from loading them (and every exercise's attempts) when a course is deleted.
     creator = db.relationship('User', back_populates='created_courses', lazy='joined')
-    exercises = db.relationship('Exercise', back_populates='course', lazy='dynamic', cascade="all, delete-orphan")
+    exercises = db.relationship('Exercise', back_populates='course', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
     # Relationship to CourseContent
-    contents = db.relationship('CourseContent', back_populates='course', lazy='dynamic', cascade="all, delete-orphan")
+    contents = db.relationship('CourseContent', back_populates='course', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
     # Relationship to Enrollments
-    enrollments = db.relationship('Enrollment', back_populates='course', lazy='dynamic', cascade="all, delete-orphan")
+    enrollments = db.relationship('Enrollment', back_populates='course', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
     # Relationship to ProgressTracking
-    progress_records = db.relationship('ProgressTracking', backref='course', lazy='dynamic', cascade="all, delete-orphan")
+    progress_records = db.relationship('ProgressTracking', backref='course', lazy='dynamic', cascade="all, delete-orphan", passive_deletes=True)
+
+    # Keyset pagination indexes for each catalog sort, with and without the published filter.
+    __table_args__ = (
+        db.Index('ix_courses_published_created', 'is_published', 'created_at', 'id'),
+        db.Index('ix_courses_published_enrollments', 'is_published', 'enrollment_count', 'id'),
+        db.Index('ix_courses_published_title', 'is_published', 'title', 'id'),
+        db.Index('ix_courses_created', 'created_at', 'id'),
+        db.Index('ix_courses_enrollments', 'enrollment_count', 'id'),
+        db.Index('ix_courses_title', 'title', 'id'),
+        db.Index('ix_courses_category', 'category'),
+        db.Index('ix_courses_creator', 'creator_id'),
+    )
 
     def __repr__(self):
         return f'<Course {self.id}: {self.title}>'
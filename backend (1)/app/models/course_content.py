@@ -11,6 +11,12 @@ class ContentType(enum.Enum):
     DOCUMENT = 'document'
     IMAGE = 'image'
 
+class ProcessingStatus(enum.Enum):
+    """State of the background processing of an uploaded video, audio or image."""
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+
 class CourseContent(db.Model):
     """
     CourseContent model to store structured course materials and lessons.
@@ -18,32 +24,47 @@ class CourseContent(db.Model):
     __tablename__ = 'course_contents'
 
     id = db.Column(db.Integer, primary_key=True)
-    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False)
     title = db.Column(db.String(150), nullable=False)
     content_type = db.Column(db.Enum(ContentType), nullable=False)
     content_url = db.Column(db.String(255), nullable=True) # For file-based content
     content_text = db.Column(db.Text, nullable=True)      # For text-based content
     order_index = db.Column(db.Integer, nullable=False, default=0)
+    # Renditions, thumbnail and waveform built from the upload (see utils/media_processing.py).
+    # NULL status means there is nothing to process.
+    processing_status = db.Column(db.Enum(ProcessingStatus), nullable=True)
+    derived_assets = db.Column(db.JSON, nullable=True)
+    processing_error = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationship to Course
     course = db.relationship('Course', back_populates='contents')
 
+    # Lessons are always listed per course in order_index order.
+    # Media requests and reference counting look contents up by file.
+    __table_args__ = (
+        db.Index('ix_course_contents_course_order', 'course_id', 'order_index'),
+        db.Index('ix_course_contents_content_url', 'content_url'),
+    )
+
     def __repr__(self):
         return f'<CourseContent {self.id}: {self.title}>'
 
 class CourseContentSchema(ma.Schema):
     """Marshmallow schema for CourseContent serialization."""
     content_type = fields.Enum(ContentType)
+    processing_status = fields.Enum(ProcessingStatus, dump_only=True)
     # Exclude course for brevity, as these will always be queried in the context of a course.
     
     class Meta:
         fields = (
             'id', 'course_id', 'title', 'content_type',
             'content_url', 'content_text', 'order_index',
+            'processing_status', 'derived_assets', 'processing_error',
             'created_at', 'updated_at'
         )
+        dump_only = ('derived_assets', 'processing_error')
 
 # Initialize schemas
 course_content_schema = CourseContentSchema()
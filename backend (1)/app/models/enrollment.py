@@ -24,7 +24,7 @@ class Enrollment(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False)
     
     enrollment_date = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.Enum(EnrollmentStatus), default=EnrollmentStatus.ENROLLED, nullable=False)
@@ -35,8 +35,13 @@ class Enrollment(db.Model):
     user = db.relationship('User', back_populates='enrollments')
     course = db.relationship('Course', back_populates='enrollments')
 
-    # Ensure a user can only enroll in a course once
-    __table_args__ = (db.UniqueConstraint('user_id', 'course_id', name='_user_course_uc'),)
+    # Ensure a user can only enroll in a course once.
+    # The unique constraint also serves lookups by user_id alone.
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'course_id', name='_user_course_uc'),
+        db.Index('ix_enrollments_user_date', 'user_id', 'enrollment_date'),
+        db.Index('ix_enrollments_course', 'course_id'),
+    )
     
     def __repr__(self):
         return f'<Enrollment user_id={self.user_id} course_id={self.course_id}>'
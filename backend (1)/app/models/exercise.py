@@ -25,7 +25,7 @@ class Exercise(db.Model):
     __tablename__ = 'exercise' # Changed to singular as per plan
 
     exercise_id = db.Column(db.Integer, primary_key=True) # Changed from id to exercise_id
-    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False)
     title = db.Column(db.String(150), nullable=False)
     exercise_type = db.Column(db.Enum(ExerciseType), nullable=False)
     question_text = db.Column(db.Text, nullable=True)
@@ -43,7 +43,13 @@ class Exercise(db.Model):
     # Relationship to Course.
     course = db.relationship('Course', back_populates='exercises')
     # Relationship to ExerciseAttempt
-    attempts = db.relationship('ExerciseAttempt', back_populates='exercise', cascade="all, delete-orphan")
+    attempts = db.relationship('ExerciseAttempt', back_populates='exercise', cascade="all, delete-orphan", passive_deletes=True)
+
+    # Exercises are always listed per course in order_index order.
+    __table_args__ = (
+        db.Index('ix_exercise_course_order', 'course_id', 'order_index'),
+        db.Index('ix_exercise_audio_url', 'audio_url'),
+    )
 
     def __repr__(self):
         return f'<Exercise {self.title}>'
@@ -74,7 +80,7 @@ class ExerciseAttempt(db.Model):
     __tablename__ = 'exercise_attempt'
     attempt_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
-    exercise_id = db.Column(db.Integer, db.ForeignKey('exercise.exercise_id'), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercise.exercise_id', ondelete='CASCADE'), nullable=False)
     user_answer = db.Column(db.Text, nullable=False)
     is_correct = db.Column(db.Boolean)
     score_earned = db.Column(db.Integer)
@@ -87,6 +93,11 @@ class ExerciseAttempt(db.Model):
     user = db.relationship('User', back_populates='attempts')
     exercise = db.relationship('Exercise', back_populates='attempts')
 
+    __table_args__ = (
+        db.Index('ix_exercise_attempt_user_exercise', 'user_id', 'exercise_id'),
+        db.Index('ix_exercise_attempt_exercise', 'exercise_id'),
+    )
+
     def __repr__(self):
         return f"<ExerciseAttempt {self.attempt_id} by User {self.user_id} for Exercise {self.exercise_id}>"
 
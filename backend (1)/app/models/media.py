@@ -0,0 +1,20 @@
+from app import db
+from datetime import datetime
+
+class MediaFile(db.Model):
+    """
+    An uploaded file, stored once under its content hash and shared by every
+    lesson that uses it. `ref_count` is the number of course contents whose
+    content_url points at it; the file is removed when it drops to zero.
+    """
+    __tablename__ = 'media_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(255), unique=True, nullable=False) # 'uploads/<sha256>.<ext>', as stored in content_url
+    content_hash = db.Column(db.String(64), nullable=True) # SHA-256; unknown for uploads from before content addressing
+    size = db.Column(db.BigInteger, nullable=True) # in bytes
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MediaFile {self.url} refs={self.ref_count}>"
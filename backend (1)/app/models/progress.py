@@ -11,7 +11,7 @@ class ProgressTracking(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False) 
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False) 
     
     lessons_completed = db.Column(db.Integer, default=0)
     exercises_completed = db.Column(db.Integer, default=0)
@@ -23,7 +23,10 @@ class ProgressTracking(db.Model):
     last_activity = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    __table_args__ = (db.UniqueConstraint('user_id', 'course_id', name='_user_course_uc'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'course_id', name='_user_course_uc'),
+        db.Index('ix_progress_tracking_course', 'course_id'),
+    )
 
     def __repr__(self):
         return f'<ProgressTracking User {self.user_id} in Course {self.course_id}>'
@@ -1,7 +1,6 @@
 import enum
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
-from app import db, ma
+from app import db, ma, password_hasher
 
 class UserRole(enum.Enum):
     STUDENT = 'student'
@@ -46,11 +45,15 @@ class User(db.Model):
 
     def set_password(self, password):
         """Hashes and sets the user's password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
         """Checks if the provided password matches the stored hash."""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True if the stored hash predates the configured hash method or cost."""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         """Provides a developer-friendly representation of the User object."""
@@ -1,4 +1,10 @@
-from flask import Blueprint, request, jsonify
+import io
+from flask import Blueprint, request, jsonify, current_app
+from app import response_cache
+from app.models.user import UserRole
+from app.services.auth_service import AuthService
+from app.services.user_import_service import UserImportService
+from app.utils.exceptions import ImportTooLarge, ServiceBusy, UserNotFound
 from app.utils.decorators import admin_required # Import the decorator
 
 admin_bp = Blueprint('admin_bp', __name__)
@@ -9,6 +15,71 @@ def test_admin_route():
     # This route is now only accessible to users with the 'admin' role.
     return jsonify(message="Admin blueprint is working! You have admin access."), 200
 
+@admin_bp.route('/users/import', methods=['POST'])
+@admin_required
+def import_users():
+    """
+    Bulk-creates user accounts from an uploaded CSV or NDJSON file.
+    Expects a multipart 'file' with columns email, password, first_name, last_name and optional role.
+    Query params: ?format=csv|ndjson (guessed from the file name if omitted)
+    Returns a report of created rows and per-row errors.
+    Files over USER_IMPORT_MAX_REQUEST_SIZE or USER_IMPORT_MAX_REQUEST_ROWS are refused (413)
+    before any account is created; import those with `flask import-users`.
+    """
+    max_size = current_app.config['USER_IMPORT_MAX_REQUEST_SIZE']
+    if request.content_length and request.content_length > max_size:
+        return jsonify({"message": f"Files over {max_size // 1024} KB must be imported with `flask import-users`."}), 413
+    if 'file' not in request.files or request.files['file'].filename == '':
+        return jsonify({"message": "No file provided"}), 400
+
+    file = request.files['file']
+    fmt = request.args.get('format') or UserImportService.detect_format(file.filename)
+    try:
+        # Read the upload as text incrementally rather than loading it all at once
+        stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+        report = UserImportService.import_users_for_request(stream, fmt)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except ImportTooLarge as e:
+        return jsonify({"message": e.message}), e.status_code
+    except ServiceBusy as e:
+        return jsonify({"message": e.message}), e.status_code, {"Retry-After": str(e.retry_after)}
+    return jsonify(report), 200
+
+@admin_bp.route('/users/<int:user_id>/access', methods=['PATCH'])
+@admin_required
+def update_user_access(user_id):
+    """
+    Changes a user's role and/or active status.
+    Body: {"role": "educator", "is_active": false} (either field may be omitted)
+    The user's current session is revoked so the change applies immediately.
+    """
+    data = request.get_json() or {}
+    if 'role' not in data and 'is_active' not in data:
+        return jsonify({"message": "Provide 'role' and/or 'is_active'"}), 400
+
+    role = None
+    if 'role' in data:
+        try:
+            role = UserRole(str(data['role']).lower())
+        except ValueError:
+            return jsonify({"message": "Invalid role specified"}), 400
+    is_active = data.get('is_active')
+    if is_active is not None and not isinstance(is_active, bool):
+        return jsonify({"message": "'is_active' must be a boolean"}), 400
+
+    try:
+        result = AuthService.update_user_access(user_id, role=role, is_active=is_active)
+        return jsonify(result), 200
+    except UserNotFound as e:
+        return jsonify({"message": e.message}), e.status_code
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Hit and miss counters of the catalog response cache, for the worker serving the request."""
+    return jsonify(response_cache.stats()), 200
+
 # Example of a future admin-only endpoint:
 # @admin_bp.route('/users', methods=['POST'])
 # @admin_required
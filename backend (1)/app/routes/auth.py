@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.services.auth_service import AuthService
-from app.utils.exceptions import AuthError, InvalidCredentials, AccountLocked, UserNotFound
+from app.utils.exceptions import AuthError, InvalidCredentials, AccountLocked, UserNotFound, ServiceBusy, TooManyRequests
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.models.user import UserRole
 
@@ -31,6 +31,9 @@ def register():
             "email": user.email,
             "role": user.role.value # Return the role that was set
         }), 201
+    except ServiceBusy as e:
+        current_app.logger.warning(f"Registration for email {email} rejected, password hasher busy.")
+        return jsonify({"message": e.message}), e.status_code, {"Retry-After": str(e.retry_after)}
     except AuthError as e:
         current_app.logger.warning(f"Registration failed for email {email}: {e.message}")
         return jsonify({"message": e.message}), e.status_code
@@ -48,12 +51,15 @@ def login():
         return jsonify({"message": "Missing email or password"}), 400
 
     try:
-        tokens = AuthService.login_user(email, password)
+        tokens = AuthService.login_user(email, password, ip_address=request.remote_addr)
         current_app.logger.info(f"User '{email}' logged in successfully.")
         return jsonify(tokens), 200
     except (InvalidCredentials, AccountLocked) as e:
         current_app.logger.warning(f"Failed login attempt for email '{email}': {e.message}")
         return jsonify({"message": e.message}), e.status_code
+    except (ServiceBusy, TooManyRequests) as e:
+        current_app.logger.warning(f"Login for email '{email}' rejected: {e.message}")
+        return jsonify({"message": e.message}), e.status_code, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         current_app.logger.error(f"An error occurred during login for email '{email}': {e}", exc_info=True)
         return jsonify({"message": "An internal error occurred during login."}), 500
@@ -1,16 +1,37 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 
-from app.services.course_service import CourseService, enrollments_schema
-from app.services.content_service import ContentService
+from app import db, response_cache
+from app.services.course_service import CourseService, CATALOG_CACHE
+from app.services.content_service import ContentService, OUTLINE_FIELDS
+from app.services.media_service import MediaService
 from app.utils.decorators import educator_or_admin_required
-from app.models.course import course_schema, Course
-from app.models.user import User, UserRole
-from app.models.course_content import CourseContent, course_content_schema
+from app.utils.principal import get_current_principal
+from app.utils.exceptions import EditConflict
+from app.utils.pagination import parse_page_size
+from app.utils.fieldsets import parse_fields
+from app.models.course import course_schema, courses_schema, Course
+from app.models.user import UserRole
+from app.models.course_content import CourseContent, course_content_schema, course_contents_schema
+from app.models.enrollment import enrollments_schema
 
 courses_bp = Blueprint('courses_bp', __name__)
 
+def cached_json_response(name, params, build):
+    """
+    Serves the JSON for `build()` from the catalog response cache.
+    Marks the response with X-Cache: HIT or MISS.
+    """
+    body, hit = response_cache.get_or_build(
+        CATALOG_CACHE, name, params,
+        lambda: current_app.json.dumps(build()).encode()
+    )
+    response = current_app.response_class(body, status=200, mimetype='application/json')
+    response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
 @courses_bp.route('/', methods=['POST'])
 @jwt_required()
 @educator_or_admin_required
@@ -44,13 +65,14 @@ def create_course():
 @jwt_required()
 def get_courses():
     """
-    Get all courses, with optional filtering by difficulty and category.
+    Get a page of courses, with optional filtering by difficulty and category.
     Students see only published courses.
     Educators and Admins see all courses.
-    Query params: ?difficulty=beginner&category=Grammar
+    Query params: ?difficulty=beginner&category=Grammar&sort=newest|popular|title&limit=20&cursor=<next_cursor>
+                  &fields=id,title,... (only these course fields are read and returned)
+    Returns {"courses": [...], "next_cursor": "..."}; next_cursor is null on the last page.
     """
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
 
     # Extract filter criteria from query parameters
     filters = {
@@ -58,10 +80,28 @@ def get_courses():
         'category': request.args.get('category')
     }
 
-    if current_user.role in [UserRole.EDUCATOR, UserRole.ADMIN]:
-        courses = CourseService.get_all_courses_for_authoring(filters)
-    else:
-        courses = CourseService.get_all_courses(filters)
+    try:
+        page_size = parse_page_size(
+            request.args.get('limit'),
+            current_app.config['COURSES_PAGE_SIZE'],
+            current_app.config['COURSES_MAX_PAGE_SIZE']
+        )
+        page_args = {
+            'sort': request.args.get('sort', 'newest'),
+            'cursor': request.args.get('cursor'),
+            'page_size': page_size,
+            'fields': parse_fields(request.args.get('fields'), courses_schema)
+        }
+        if current_user.role in [UserRole.EDUCATOR, UserRole.ADMIN]:
+            courses = CourseService.get_all_courses_for_authoring(filters, **page_args)
+        else:
+            # The published catalog is the same for every student, so it is served from the response cache.
+            return cached_json_response(
+                'courses', {**filters, **page_args},
+                lambda: CourseService.get_all_courses(filters, **page_args)
+            )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
     return jsonify(courses), 200
 
@@ -70,7 +110,7 @@ def get_courses():
 def get_course(course_id):
     """Get a single course by ID."""
     user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
     
     course = CourseService.get_course_by_id(course_id, current_user)
     
@@ -78,6 +118,27 @@ def get_course(course_id):
         return jsonify({'message': 'Course not found'}), 404
     return jsonify(course), 200
 
+@courses_bp.route('/<int:course_id>/bundle', methods=['GET'])
+@jwt_required()
+def get_course_bundle(course_id):
+    """
+    Gets the course, its lesson outline, its exercises and the caller's enrollment
+    and progress in one response, for opening a course page.
+    Supports conditional requests: send the ETag back in If-None-Match to get a 304.
+    """
+    current_user = get_current_principal()
+
+    bundle = CourseService.get_course_bundle(course_id, current_user)
+    if not bundle:
+        return jsonify({'message': 'Course not found'}), 404
+
+    response = jsonify(bundle)
+    # Per-user data: browsers may keep it but must revalidate, and shared caches must not store it.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    response.add_etag()
+    return response.make_conditional(request)
+
 @courses_bp.route('/<int:course_id>', methods=['PUT'])
 @jwt_required()
 @educator_or_admin_required
@@ -97,7 +158,7 @@ def update_course(course_id):
         return jsonify(err.messages), 422
 
     user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
     course_to_update = Course.query.get(course_id)
 
     if not course_to_update:
@@ -114,6 +175,78 @@ def update_course(course_id):
         # Log exception e
         return jsonify({'message': 'An error occurred while updating the course.'}), 500
 
+@courses_bp.route('/<int:course_id>/clone', methods=['POST'])
+@jwt_required()
+@educator_or_admin_required
+def clone_course(course_id):
+    """
+    Copies a course with all of its contents and exercises, e.g. to re-run it next term.
+    Only accessible to the course creator or an admin. The copy is unpublished and owned by the caller.
+    Body (optional): {"title": "Spanish 101 (Spring)"}
+    Returns {"course": {...}, "contents": {old_id: new_id}, "exercises": {old_id: new_id}}.
+    """
+    user_id = get_jwt_identity()
+    current_user = get_current_principal()
+    course = Course.query.get(course_id)
+
+    if not course:
+        return jsonify({'message': 'Course not found'}), 404
+
+    if current_user.role != UserRole.ADMIN and course.creator_id != int(user_id):
+        return jsonify({'message': 'You are not authorized to clone this course'}), 403
+
+    title = (request.get_json(silent=True) or {}).get('title')
+    if title is not None and (not isinstance(title, str) or not title.strip()):
+        return jsonify({'message': "'title' must be a non-empty string"}), 400
+
+    result = CourseService.clone_course(course_id, int(user_id), title=title.strip() if title else None)
+    return jsonify(result), 201
+
+@courses_bp.route('/<int:course_id>/order', methods=['PUT'])
+@jwt_required()
+@educator_or_admin_required
+def reorder_course(course_id):
+    """
+    Reorders a course's contents and/or exercises in one request.
+    Only accessible to the course creator or an admin.
+    Body: {"updated_at": "<course updated_at as last loaded>", "contents": [ids in order], "exercises": [ids in order]}
+    Each list, when given, must contain every id of that kind in the course exactly once.
+    Returns {"updated_at", "contents_moved", "exercises_moved"}; 409 with the current
+    updated_at if the course changed since `updated_at`.
+    """
+    user_id = get_jwt_identity()
+    current_user = get_current_principal()
+    course = Course.query.get(course_id)
+
+    if not course:
+        return jsonify({'message': 'Course not found'}), 404
+
+    if current_user.role != UserRole.ADMIN and course.creator_id != int(user_id):
+        return jsonify({'message': 'You are not authorized to reorder this course'}), 403
+
+    data = request.get_json(silent=True) or {}
+    if 'contents' not in data and 'exercises' not in data:
+        return jsonify({'message': "Provide 'contents' and/or 'exercises'."}), 400
+    try:
+        expected_updated_at = datetime.fromisoformat(data.get('updated_at') or '')
+    except (TypeError, ValueError):
+        return jsonify({'message': "'updated_at' must be the course's updated_at timestamp."}), 400
+    # updated_at is stored as naive UTC; a timestamp with an offset is converted rather than truncated.
+    if expected_updated_at.tzinfo is not None:
+        expected_updated_at = expected_updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    try:
+        result = CourseService.reorder_course(
+            course_id, expected_updated_at,
+            content_ids=data.get('contents'), exercise_ids=data.get('exercises')
+        )
+    except EditConflict as e:
+        db.session.expire(course)
+        return jsonify({'message': e.message, 'updated_at': course.updated_at.isoformat()}), e.status_code
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify(result), 200
+
 @courses_bp.route('/<int:course_id>', methods=['DELETE'])
 @jwt_required()
 @educator_or_admin_required
@@ -123,7 +256,7 @@ def delete_course(course_id):
     Only accessible to the course creator or an admin.
     """
     user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_principal()
     
     course_to_delete = Course.query.get(course_id)
 
@@ -175,18 +308,29 @@ def unenroll_from_course(course_id):
 @courses_bp.route('/my-enrollments', methods=['GET'])
 @jwt_required()
 def get_my_enrollments():
-    """Gets all courses the current user is enrolled in."""
+    """
+    Gets all courses the current user is enrolled in.
+    Query params: ?fields=id,course,... (optional sparse fieldset)
+    """
     user_id = get_jwt_identity()
-    enrollments = CourseService.get_user_enrollments(user_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), enrollments_schema)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    enrollments = CourseService.get_user_enrollments(user_id, fields)
     return jsonify(enrollments), 200
 
 @courses_bp.route('/<int:course_id>/enrollments', methods=['GET'])
 @jwt_required()
 @educator_or_admin_required
 def get_enrollments_for_course(course_id):
-    """(For Educators/Admins) Gets all user enrollments for a specific course."""
+    """
+    (For Educators/Admins) Gets a page of the user enrollments for a specific course.
+    Query params: ?limit=50&cursor=<next_cursor>&fields=id,user,... (fields is optional)
+    Returns {"enrollments": [...], "next_cursor": "..."}; next_cursor is null on the last page.
+    """
     user_id = get_jwt_identity()
-    current_user = User.query.get_or_404(user_id)
+    current_user = get_current_principal()
     course = Course.query.get(course_id)
 
     if not course:
@@ -197,17 +341,59 @@ def get_enrollments_for_course(course_id):
     if current_user.role == UserRole.EDUCATOR and course.creator_id != int(user_id):
         return jsonify({'message': 'You are not authorized to view enrollments for this course'}), 403
     
-    enrollments = enrollments_schema.dump(course.enrollments.all())
+    try:
+        page_size = parse_page_size(
+            request.args.get('limit'),
+            current_app.config['ROSTER_PAGE_SIZE'],
+            current_app.config['ROSTER_MAX_PAGE_SIZE']
+        )
+        fields = parse_fields(request.args.get('fields'), enrollments_schema)
+        enrollments = CourseService.get_course_enrollments(course_id, request.args.get('cursor'), page_size, fields)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     return jsonify(enrollments), 200
 
+@courses_bp.route('/<int:course_id>/enrollments', methods=['POST'])
+@jwt_required()
+@educator_or_admin_required
+def bulk_enroll_in_course(course_id):
+    """
+    (For Educators/Admins) Enrolls a cohort of users in a course at once.
+    Body: {"user_ids": [1, 2], "emails": ["a@example.com"]} (either list may be omitted)
+    Returns which users were newly enrolled, which already were, and which ids/emails matched no user.
+    """
+    user_id = get_jwt_identity()
+    current_user = get_current_principal()
+    course = Course.query.get(course_id)
+
+    if not course:
+        return jsonify({'message': 'Course not found'}), 404
+
+    # Authorization: Educators can only enroll users in courses they created.
+    if current_user.role == UserRole.EDUCATOR and course.creator_id != int(user_id):
+        return jsonify({'message': 'You are not authorized to enroll users in this course'}), 403
+
+    data = request.get_json() or {}
+    user_ids = data.get('user_ids') or []
+    emails = data.get('emails') or []
+    if not isinstance(user_ids, list) or not all(isinstance(i, int) for i in user_ids):
+        return jsonify({'message': "'user_ids' must be a list of integers"}), 400
+    if not isinstance(emails, list) or not all(isinstance(e, str) for e in emails):
+        return jsonify({'message': "'emails' must be a list of strings"}), 400
+
+    try:
+        result = CourseService.bulk_enroll(course_id, user_ids=user_ids, emails=[e.strip() for e in emails])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify(result), 200
+
 @courses_bp.route('/meta-info', methods=['GET'])
 def get_meta_info():
     """
     Returns metadata for courses, such as available categories and difficulty levels.
     This is a public endpoint and does not require authentication.
     """
-    meta_info = CourseService.get_course_meta_info()
-    return jsonify(meta_info), 200
+    return cached_json_response('meta-info', {}, CourseService.get_course_meta_info)
 
 # --- Course Content Endpoints ---
 
@@ -218,7 +404,7 @@ def add_course_content(course_id):
     """Adds a new content item (text or file) to a course."""
     user_id = get_jwt_identity()
     course = Course.query.get_or_404(course_id)
-    current_user = User.query.get_or_404(user_id)
+    current_user = get_current_principal()
 
     # Authorization: Must be course creator or admin
     if current_user.role != UserRole.ADMIN and course.creator_id != int(user_id):
@@ -246,22 +432,98 @@ def add_course_content(course_id):
         except ValueError as e:
             return jsonify({'message': str(e)}), 400
 
+@courses_bp.route('/<int:course_id>/content/upload', methods=['POST'])
+@jwt_required()
+@educator_or_admin_required
+def start_content_upload(course_id):
+    """
+    Starts a direct upload of a lesson file, which goes to storage without passing through the app.
+    Body: {"filename": "lecture.mp4", "content_type": "video/mp4" (optional)}
+    Returns the upload target: {"method": "POST", "url", "fields"} (send a multipart form with
+    the fields, then the file as "file") or {"method": "PUT", "url", "headers"} (send the file
+    as the body), plus "upload_token". Once the upload has finished, add the content with
+    POST /<course_id>/content and {"upload_token": ...} in place of a file.
+    """
+    user_id = get_jwt_identity()
+    course = Course.query.get_or_404(course_id)
+    current_user = get_current_principal()
+
+    # Authorization: Must be course creator or admin
+    if current_user.role != UserRole.ADMIN and course.creator_id != int(user_id):
+        return jsonify({'message': 'Not authorized to add content to this course'}), 403
+
+    data = request.get_json() or {}
+    try:
+        upload = MediaService.start_direct_upload(course_id, data.get('filename'), data.get('content_type'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify(upload), 201
+
 @courses_bp.route('/<int:course_id>/content', methods=['GET'])
 @jwt_required()
 def get_course_content(course_id):
-    """Gets all content items for a specific course."""
+    """
+    Gets all content items for a specific course.
+    Query params: ?fields=id,title,order_index (optional; e.g. skip content_text for a lesson outline)
+                  ?outline=true (optional; the outline fields, never reading lesson bodies;
+                  fetch each body from GET /content/<content_id>)
+    """
     # Authorization to view content is implicitly handled by ability to view the course itself.
     # For now, any logged-in user can see content of a published course.
     user_id = get_jwt_identity()
     course = Course.query.get_or_404(course_id)
-    current_user = User.query.get_or_404(user_id)
+    current_user = get_current_principal()
 
     if current_user.role == UserRole.STUDENT and not course.is_published:
         return jsonify({'message': 'Course not found or not published'}), 404
         
-    contents = ContentService.get_content_for_course(course_id)
+    try:
+        fields = parse_fields(request.args.get('fields'), course_contents_schema)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    if fields is None and request.args.get('outline', '').lower() in ('1', 'true'):
+        fields = OUTLINE_FIELDS
+    contents = ContentService.get_content_for_course(course_id, fields)
     return jsonify(contents), 200
 
+@courses_bp.route('/content/<int:content_id>', methods=['GET'])
+@jwt_required()
+def get_content_item(content_id):
+    """
+    Gets a single content item with its full text, for reading one lesson at a time.
+    Supports conditional requests: the ETag changes whenever the lesson is updated, and a
+    matching If-None-Match gets a 304 without the lesson body being read.
+    """
+    current_user = get_current_principal()
+    version = ContentService.get_content_version(content_id)
+
+    if not version or (current_user.role == UserRole.STUDENT and not version['is_published']):
+        return jsonify({'message': 'Content not found'}), 404
+
+    if request.if_none_match.contains(version['etag']):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(ContentService.get_content_by_id(content_id))
+    response.set_etag(version['etag'])
+    # Browsers may keep lessons but must revalidate; shared caches must not store them.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@courses_bp.route('/content/<int:content_id>/processing', methods=['GET'])
+@jwt_required()
+def get_content_processing(content_id):
+    """
+    Gets the processing state of an uploaded video, audio or image, for polling after an upload.
+    Returns {"id", "processing_status": "PENDING" | "READY" | "FAILED" | null, "processing_error", "derived_assets"}.
+    """
+    content = CourseContent.query.get_or_404(content_id)
+    current_user = get_current_principal()
+
+    if current_user.role == UserRole.STUDENT and not content.course.is_published:
+        return jsonify({'message': 'Course not found or not published'}), 404
+
+    return jsonify(ContentService.get_processing_status(content_id)), 200
+
 @courses_bp.route('/content/<int:content_id>', methods=['DELETE'])
 @jwt_required()
 @educator_or_admin_required
@@ -269,7 +531,7 @@ def delete_course_content(content_id):
     """Deletes a specific content item."""
     user_id = get_jwt_identity()
     content = CourseContent.query.get_or_404(content_id)
-    current_user = User.query.get_or_404(user_id)
+    current_user = get_current_principal()
 
     # Authorization: Must be creator of the course this content belongs to, or an admin.
     if current_user.role != UserRole.ADMIN and content.course.creator_id != int(user_id):
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.exercise import exercises_schema
 from app.services.exercise_service import ExerciseService
+from app.utils.fieldsets import parse_fields
 from app.utils.decorators import educator_or_admin_required, student_required
 from app.utils.exceptions import ForbiddenError
 
@@ -24,8 +26,15 @@ def create_exercise_for_course(course_id):
 @exercises_bp.route('/courses/<int:course_id>/exercises', methods=['GET'])
 @jwt_required()
 def get_exercises_for_course(course_id):
-    """Gets all exercises for a specific course."""
-    exercises = ExerciseService.get_exercises_for_course(course_id)
+    """
+    Gets all exercises for a specific course.
+    Query params: ?fields=exercise_id,title,... (optional sparse fieldset)
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'), exercises_schema)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    exercises = ExerciseService.get_exercises_for_course(course_id, fields)
     return jsonify(exercises), 200
 
 @exercises_bp.route('/exercises/<int:exercise_id>', methods=['GET'])
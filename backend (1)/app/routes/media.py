@@ -0,0 +1,111 @@
+import mimetypes
+
+from flask import Blueprint, jsonify, current_app, redirect, request, send_from_directory
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app import storage
+from app.services.media_service import MediaService
+from app.utils.exceptions import ForbiddenError
+from app.utils.principal import get_current_principal
+
+media_bp = Blueprint('media_bp', __name__)
+
+@media_bp.route('/<filename>/link', methods=['GET'])
+@jwt_required()
+def get_media_link(filename):
+    """
+    A URL for the file that works without the Authorization header, for media elements.
+    Returns {"url": "/api/media/<name>?token=...", "expires_at": <unix time>}; see MediaService.media_link.
+    """
+    try:
+        link = MediaService.media_link(filename, get_current_principal())
+    except ForbiddenError as e:
+        return jsonify({'message': e.message}), 403
+    if link is None:
+        return jsonify({'message': 'File not found'}), 404
+    return jsonify(link), 200
+
+@media_bp.route('/<filename>', methods=['GET'])
+@jwt_required(optional=True)
+def get_media(filename):
+    """
+    Serves an uploaded file: a content_url of 'uploads/<name>' is fetched from /api/media/<name>.
+    Derived files ('<name>.<variant>.<ext>', see utils/media_processing.py) follow their upload's access rules.
+    Authorized by the Authorization header or, for audio and video elements, which cannot
+    send headers, by the ?token= of a link from GET /api/media/<name>/link.
+    Readable by admins, the creators of and students enrolled in a course using the file,
+    and anyone signed in when such a course is published; others get 403.
+
+    Supports Range requests (206) and ETag / Last-Modified revalidation (304).
+    With S3 storage, redirects to a presigned URL valid for MEDIA_URL_EXPIRES seconds.
+    With MEDIA_ACCEL_REDIRECT_PREFIX set, nginx is handed the file through X-Accel-Redirect;
+    with USE_X_SENDFILE, Flask adds an X-Sendfile header for Apache or lighttpd. Otherwise
+    the file goes out through the WSGI server's file wrapper, which gunicorn sends with
+    sendfile() rather than reading it into the worker.
+    """
+    token = request.args.get('token')
+    if token is not None:
+        try:
+            current_user = MediaService.load_media_link(token, filename)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 401
+    elif get_jwt_identity() is not None:
+        current_user = get_current_principal()
+    else:
+        return jsonify({'message': 'Missing Authorization header or media token.'}), 401
+
+    try:
+        media = MediaService.get_accessible(MediaService.source_url(filename), current_user)
+    except ForbiddenError as e:
+        return jsonify({'message': e.message}), 403
+    if media is None:
+        return jsonify({'message': 'File not found'}), 404
+
+    expires = current_app.config['MEDIA_URL_EXPIRES']
+    download_url = storage.download_url(filename, expires)
+    if download_url:
+        # The store serves the bytes, ranges included; browsers may reuse the redirect while it is valid.
+        response = redirect(download_url)
+        response.cache_control.private = True
+        response.cache_control.max_age = expires // 2
+        return response
+
+    accel_prefix = current_app.config.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        # nginx serves the internal location, including ranges and revalidation.
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{filename}"
+    else:
+        # Content-addressed files use their hash as a strong ETag; older uploads
+        # get werkzeug's one, derived from the file's mtime and size.
+        response = send_from_directory(
+            storage.folder,
+            filename,
+            conditional=True,
+            etag=(media.content_hash if media.url == f"uploads/{filename}" else None) or True
+        )
+
+    response.cache_control.private = True
+    if media.content_hash and media.url == f"uploads/{filename}":
+        # The name is the hash of the bytes, so they can never change under it.
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = current_app.config['MEDIA_CACHE_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+@media_bp.route('/uploads/<token>', methods=['PUT'])
+def put_direct_upload(token):
+    """
+    Receives a direct upload when files are stored locally. The token from
+    POST /api/courses/<course_id>/content/upload authorizes it, like a presigned URL,
+    so no Authorization header is needed. The request body is the file.
+    """
+    try:
+        MediaService.receive_direct_upload(token, request.stream)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return '', 204
@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+
+from app.models.user import UserRole
+from app.services.search_service import SearchService
+from app.utils.pagination import parse_page_size
+from app.utils.principal import get_current_principal
+
+search_bp = Blueprint('search_bp', __name__)
+
+@search_bp.route('/', methods=['GET'])
+@jwt_required()
+def search():
+    """
+    Full-text search over course titles and descriptions, lesson text and exercise questions.
+    Students only see published courses and active exercises; educators and admins see everything.
+    Query params: ?q=past tense&type=course,lesson,exercise&limit=20
+    Returns {"results": [{"type", "id", "course_id", "title", "snippet", "score"}]}, best match first.
+    """
+    current_user = get_current_principal()
+
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'message': "Query parameter 'q' is required."}), 400
+
+    doc_types = [doc_type.strip() for doc_type in request.args.get('type', '').split(',') if doc_type.strip()]
+
+    try:
+        limit = parse_page_size(
+            request.args.get('limit'),
+            current_app.config['SEARCH_PAGE_SIZE'],
+            current_app.config['SEARCH_MAX_PAGE_SIZE']
+        )
+        results = SearchService.search(
+            query,
+            doc_types=doc_types,
+            limit=limit,
+            include_unpublished=current_user.role in [UserRole.EDUCATOR, UserRole.ADMIN]
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    return jsonify({'results': results}), 200
@@ -1,16 +1,25 @@
-from app import db
+from app import db, session_cache, rate_limiter
 from app.models.user import User, UserRole, ProficiencyLevel # Import ProficiencyLevel
 from app.models.authentication import Authentication
-from app.utils.exceptions import InvalidCredentials, AccountLocked, UserNotFound, AuthError
+from app.utils.exceptions import InvalidCredentials, AccountLocked, UserNotFound, AuthError, ServiceBusy, TooManyRequests
+from app.utils.principal import Principal, get_user
 from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity, get_jwt, get_jti
 from flask import current_app
 from datetime import datetime, timedelta
+from sqlalchemy import case, update
 
 class AuthService:
     """
     Service layer for handling user authentication operations.
     """
 
+    @staticmethod
+    def _access_token_claims(user):
+        """Role and status claims embedded in access tokens when JWT_ROLE_CLAIMS_ENABLED is set."""
+        if not current_app.config.get('JWT_ROLE_CLAIMS_ENABLED'):
+            return None
+        return Principal.claims_for(user)
+
     @staticmethod
     def register_user(email, password, first_name, last_name, role=UserRole.STUDENT):
         """
@@ -33,11 +42,20 @@ class AuthService:
         return new_user
 
     @staticmethod
-    def login_user(email, password):
+    def login_user(email, password, ip_address=None):
         """
         Authenticates a user and generates JWT tokens.
         Handles account locking for too many failed attempts.
+        Attempts over the per-email or per-IP rate limit are rejected before any
+        database access or password hashing.
         """
+        retry_after = rate_limiter.hit('login_email', email.lower())
+        if not retry_after and ip_address:
+            retry_after = rate_limiter.hit('login_ip', ip_address)
+        if retry_after:
+            current_app.logger.warning(f"Login rate limit exceeded for {email} from {ip_address}")
+            raise TooManyRequests(retry_after=retry_after)
+
         user = User.query.filter_by(email=email).first()
         if not user:
             current_app.logger.warning(f"Login attempt for non-existent user: {email}")
@@ -56,20 +74,47 @@ class AuthService:
             raise AccountLocked()
 
         if not user.check_password(password):
-            auth_entry.login_attempts += 1
-            if auth_entry.login_attempts >= 5: # Example: Lock after 5 failed attempts
-                auth_entry.account_locked = True
-                current_app.logger.warning(f"Account for {email} has been locked due to too many failed login attempts.")
+            # Increment and lock in one UPDATE so concurrent failures can't lose counts.
+            # account_locked is assigned first because MySQL evaluates SET clauses left to right.
+            max_attempts = current_app.config.get('LOGIN_MAX_FAILED_ATTEMPTS', 5)
+            db.session.execute(
+                update(Authentication)
+                .where(Authentication.user_id == user.user_id)
+                .ordered_values(
+                    (Authentication.account_locked, case(
+                        (Authentication.login_attempts + 1 >= max_attempts, True),
+                        else_=Authentication.account_locked,
+                    )),
+                    (Authentication.login_attempts, Authentication.login_attempts + 1),
+                )
+            )
             db.session.commit()
+            if auth_entry.account_locked:
+                current_app.logger.warning(f"Account for {email} has been locked due to too many failed login attempts.")
             current_app.logger.warning(f"Invalid password for user: {email}")
             raise InvalidCredentials()
 
+        if not user.is_active:
+            current_app.logger.warning(f"Login attempt for deactivated account: {email}")
+            raise AccountLocked("This account has been deactivated.")
+
         # Successful login
         auth_entry.login_attempts = 0
         auth_entry.last_login = datetime.utcnow()
+
+        # Transparently upgrade hashes made with older parameters while we have the plaintext.
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+            except ServiceBusy:
+                # Not worth failing a valid login over; the upgrade is retried next time.
+                current_app.logger.info(f"Skipped password rehash for {email}, password hasher busy.")
         
         # Generate tokens
-        access_token = create_access_token(identity=str(user.user_id), expires_delta=timedelta(hours=1))
+        access_token = create_access_token(
+            identity=str(user.user_id), expires_delta=timedelta(hours=1),
+            additional_claims=AuthService._access_token_claims(user)
+        )
         refresh_token = create_refresh_token(identity=str(user.user_id), expires_delta=timedelta(days=30))
         
         # Store the JTI (JWT ID) of the access token. This is used by the blocklist loader
@@ -78,6 +123,7 @@ class AuthService:
         auth_entry.session_token = access_jti 
         
         db.session.commit()
+        session_cache.invalidate(user.user_id)
 
         return {
             "access_token": access_token,
@@ -98,16 +144,31 @@ class AuthService:
             # This case is unlikely if the refresh token is valid but good practice to check
             raise UserNotFound("Authentication entry not found for user.")
 
-        new_access_token = create_access_token(identity=str(user_id), expires_delta=timedelta(hours=1))
+        # Claims are re-read from the database here, so a refreshed token always carries the current role.
+        user = get_user(user_id)
+        if not user or not user.is_active:
+            raise UserNotFound("User not found or deactivated.")
+
+        new_access_token = create_access_token(
+            identity=str(user_id), expires_delta=timedelta(hours=1),
+            additional_claims=AuthService._access_token_claims(user)
+        )
         
         # Update the session_token with the JTI of the new access token.
         # This effectively adds the old access token to the blocklist.
         new_access_jti = get_jti(encoded_token=new_access_token)
         auth_entry.session_token = new_access_jti
         db.session.commit()
+        session_cache.invalidate(user_id)
 
         return {"access_token": new_access_token}
 
+    @staticmethod
+    def get_session_jti(user_id):
+        """The jti of the user's one valid access token, or None when they have no session."""
+        auth_entry = Authentication.query.filter_by(user_id=user_id).first()
+        return auth_entry.session_token if auth_entry else None
+
     @staticmethod
     def logout_user(user_id):
         """
@@ -119,22 +180,49 @@ class AuthService:
             # session to the blocklist, as their JTI will no longer match.
             auth_entry.session_token = None
             db.session.commit()
+            session_cache.invalidate(user_id)
             return True
         return False
 
+    @staticmethod
+    def update_user_access(user_id, role=None, is_active=None):
+        """
+        Changes a user's role and/or active status and revokes their current session,
+        so tokens carrying the old role or status claims stop being accepted immediately.
+        """
+        user = get_user(user_id)
+        if not user:
+            raise UserNotFound()
+
+        if role is not None:
+            user.role = role
+        if is_active is not None:
+            user.is_active = is_active
+
+        auth_entry = Authentication.query.filter_by(user_id=user.user_id).first()
+        if auth_entry:
+            auth_entry.session_token = None
+        db.session.commit()
+        session_cache.invalidate(user.user_id)
+        return {
+            "user_id": user.user_id,
+            "role": user.role.value,
+            "is_active": user.is_active
+        }
+
     @staticmethod
     def get_user_by_id(user_id):
         """
         Retrieves a user by their ID.
         """
-        return User.query.get(user_id)
+        return get_user(user_id)
 
     @staticmethod
     def get_user_profile(user_id):
         """
         Retrieves a user's profile information.
         """
-        user = User.query.get(user_id)
+        user = get_user(user_id)
         if not user:
             raise UserNotFound("User profile not found.")
         return {
@@ -156,7 +244,7 @@ class AuthService:
         """
         Updates a user's profile information.
         """
-        user = User.query.get(user_id)
+        user = get_user(user_id)
         if not user:
             raise UserNotFound("User profile not found.")
 
@@ -177,9 +265,11 @@ class AuthService:
         # Note: Email and role changes might require separate, more secure endpoints
         # For now, disallow direct update of email/role via this endpoint
 
-        db.session.commit()
-        return {
+        # Built before the commit expires `user`, which would cost another users query.
+        result = {
             "message": "Profile updated successfully",
             "user_id": user.user_id,
             "email": user.email
         }
+        db.session.commit()
+        return result
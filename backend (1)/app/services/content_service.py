@@ -1,42 +1,139 @@
-import os
-from app import db
+from app import db, search_index, media_cleanup, media_processor
 from app.models.course import Course
-from app.models.course_content import CourseContent, course_content_schema, course_contents_schema
+from app.models.course_content import CourseContent, ContentType, ProcessingStatus, course_content_schema, course_contents_schema
+from app.services.media_service import MediaService
 from app.utils.helpers import save_file
-from flask import current_app
+from app.utils.fieldsets import load_only_fields, dump_schema
+
+# Upload types the media pipeline builds renditions or previews for.
+PROCESSED_CONTENT_TYPES = {
+    ContentType.VIDEO: 'video',
+    ContentType.AUDIO: 'audio',
+    ContentType.IMAGE: 'image',
+}
+
+# Lesson fields for listing a course without reading any lesson body (GET /<id>/content?outline=true).
+OUTLINE_FIELDS = ('id', 'course_id', 'title', 'content_type', 'content_url', 'order_index', 'processing_status', 'updated_at')
 
 class ContentService:
     @staticmethod
-    def get_content_for_course(course_id):
-        """Get all content for a specific course, ordered by index."""
+    def get_content_for_course(course_id, fields=None):
+        """
+        Get all content for a specific course, ordered by index.
+        `fields` limits the columns read and returned, e.g. ('id', 'title') for an outline.
+        """
         course = Course.query.get_or_404(course_id)
-        contents = course.contents.order_by(CourseContent.order_index).all()
-        return course_contents_schema.dump(contents)
+        query = course.contents
+        if fields is not None:
+            query = query.options(load_only_fields(CourseContent, fields, CourseContent.id))
+        contents = query.order_by(CourseContent.order_index).all()
+        return dump_schema(course_contents_schema, fields).dump(contents)
 
     @staticmethod
     def add_content_to_course(course_id, data, file=None):
-        """Add a new content item (text or file) to a course."""
+        """
+        Add a new content item (text or file) to a course. The file is either uploaded
+        with the request or, given `upload_token` in `data`, already in storage from a
+        direct upload (see MediaService.start_direct_upload).
+        """
         Course.query.get_or_404(course_id) # Ensure course exists
 
+        upload_token = data.get('upload_token')
         # Deserialize metadata
         try:
-            content_data = course_content_schema.load(data)
+            content_data = course_content_schema.load({key: value for key, value in data.items() if key != 'upload_token'})
         except Exception as e:
              raise ValueError(f"Invalid data provided: {e}")
 
         content_data['course_id'] = course_id
+
+        # Stored files are only attached by uploading them, which takes a reference on the
+        # file (see MediaService). A client-supplied 'uploads/' URL would hold no reference,
+        # yet deleting the content would release one, and it would open another course's media.
+        if str(content_data.get('content_url') or '').strip().startswith('uploads/'):
+            raise ValueError("content_url cannot point at an uploaded file; upload the file instead.")
         
         # Handle file upload if present
-        if file:
-            file_url = save_file(file)
-            content_data['content_url'] = file_url
+        if file or upload_token:
+            if file:
+                # The reference is taken before the file is written: a cleanup deleting the
+                # same bytes holds the media_files row until it has removed the file, so the
+                # acquire waits for it and the file written afterwards stays.
+                stored = save_file(file, reserve=MediaService.acquire)
+            else:
+                stored = MediaService.finish_direct_upload(upload_token, course_id)
+                MediaService.acquire(stored)
+            content_data['content_url'] = stored.url
+            if media_processor.enabled and content_data['content_type'] in PROCESSED_CONTENT_TYPES:
+                ContentService._start_processing(content_data)
         
         new_content = CourseContent(**content_data)
         db.session.add(new_content)
+        db.session.flush()
+        search_index.index_content(new_content)
         db.session.commit()
+
+        if new_content.processing_status == ProcessingStatus.PENDING:
+            media_processor.submit(new_content.content_url, PROCESSED_CONTENT_TYPES[new_content.content_type])
         
         return course_content_schema.dump(new_content)
 
+    @staticmethod
+    def _start_processing(content_data):
+        """Marks new content as pending, or reuses the assets already built for the same file."""
+        processed = db.session.query(CourseContent.derived_assets).filter(
+            CourseContent.content_url == content_data['content_url'],
+            CourseContent.content_type == content_data['content_type'],
+            CourseContent.processing_status == ProcessingStatus.READY
+        ).first()
+        if processed:
+            content_data['processing_status'] = ProcessingStatus.READY
+            content_data['derived_assets'] = processed.derived_assets
+        else:
+            content_data['processing_status'] = ProcessingStatus.PENDING
+
+    @staticmethod
+    def get_processing_status(content_id):
+        """The processing state and derived assets of a content item, for polling after an upload."""
+        content = CourseContent.query.get_or_404(content_id)
+        return dump_schema(course_content_schema, ('id', 'processing_status', 'processing_error', 'derived_assets')).dump(content)
+
+    @staticmethod
+    def reprocess_media(include_failed=False):
+        """
+        Processes, in this process, uploads whose jobs were lost (still pending) and,
+        with `include_failed`, those that failed. Returns (processed, failed) file counts.
+        """
+        statuses = [ProcessingStatus.PENDING] + ([ProcessingStatus.FAILED] if include_failed else [])
+        criteria = (
+            CourseContent.processing_status.in_(statuses),
+            CourseContent.content_type.in_(list(PROCESSED_CONTENT_TYPES))
+        )
+        jobs = dict(db.session.query(CourseContent.content_url, CourseContent.content_type).filter(*criteria).distinct())
+        # Results are only recorded on pending rows.
+        CourseContent.query.filter(*criteria).update({'processing_status': ProcessingStatus.PENDING}, synchronize_session=False)
+        db.session.commit()
+
+        failed = 0
+        for content_url, content_type in jobs.items():
+            if not media_processor.process_now(content_url, PROCESSED_CONTENT_TYPES[content_type]):
+                failed += 1
+        return len(jobs) - failed, failed
+
+    @staticmethod
+    def get_content_version(content_id):
+        """
+        The ETag of a content item and whether its course is published, read without
+        the lesson body, or None if it does not exist. The ETag changes with updated_at.
+        """
+        row = db.session.query(CourseContent.updated_at, Course.is_published).join(
+            Course, CourseContent.course_id == Course.id
+        ).filter(CourseContent.id == content_id).first()
+        if row is None:
+            return None
+        version = row.updated_at.strftime('%Y%m%d%H%M%S%f') if row.updated_at else '0'
+        return {'etag': f"{content_id}-{version}", 'is_published': row.is_published}
+
     @staticmethod
     def get_content_by_id(content_id):
         """Get a single course content item by its ID."""
@@ -45,19 +142,15 @@ class ContentService:
 
     @staticmethod
     def delete_content(content_id):
-        """Deletes a content item and its associated file if it exists."""
+        """
+        Deletes a content item and drops its reference to its file.
+        The file itself is removed in the background once nothing else references it.
+        """
         content = CourseContent.query.get_or_404(content_id)
-        
-        if content.content_url:
-            try:
-                # Construct path relative to the app's root
-                file_path = os.path.join(current_app.root_path, 'static', 'uploads', os.path.basename(content.content_url))
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                # Log this error, but don't block deletion of the DB record
-                print(f"Error deleting file {content.content_url}: {e}")
 
+        unreferenced = MediaService.release([content.content_url])
+        search_index.remove('lesson', content.id)
         db.session.delete(content)
         db.session.commit()
+        media_cleanup.schedule(unreferenced)
         return True
@@ -1,16 +1,98 @@
-from app import db
+from app import db, search_index, response_cache, media_cleanup
 from app.models.course import Course, course_schema, courses_schema, DifficultyLevel
 from app.models.user import User, UserRole
-from app.models.enrollment import Enrollment, enrollment_schema, enrollments_schema
+from app.models.enrollment import Enrollment, EnrollmentSchema, enrollment_schema, enrollments_schema
+from app.models.course_content import CourseContent, CourseContentSchema
+from app.models.exercise import Exercise, ExerciseSchema
+from app.models.progress import ProgressTracking, ProgressTrackingSchema
+from app.services.media_service import MediaService
+from app.utils.principal import get_user
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_after
+from app.utils.fieldsets import load_only_fields, dump_schema
+from app.utils.exceptions import EditConflict
+from flask import current_app
+from datetime import datetime, timedelta
+from sqlalchemy import case, delete, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, lazyload
+
+# Catalog sort options: name -> (Course column, descending). Course.id breaks ties,
+# and each has a matching composite index (see migration 5d2e8f1a9c47).
+COURSE_SORTS = {
+    'newest': ('created_at', True),
+    'popular': ('enrollment_count', True),
+    'title': ('title', False),
+}
+
+# Response cache namespace for the published catalog and meta info.
+CATALOG_CACHE = 'catalog'
+
+# Parts of the course bundle (GET /api/courses/<id>/bundle). Lessons are an outline:
+# their text is fetched per lesson, so content_text is never read here.
+bundle_contents_schema = CourseContentSchema(many=True, only=('id', 'title', 'content_type', 'content_url', 'order_index'))
+bundle_exercises_schema = ExerciseSchema(many=True, only=(
+    'exercise_id', 'title', 'exercise_type', 'difficulty_level', 'points', 'time_limit', 'order_index', 'is_active'
+))
+bundle_enrollment_schema = EnrollmentSchema(only=('id', 'status', 'enrollment_date', 'completion_percentage', 'last_accessed'))
+bundle_progress_schema = ProgressTrackingSchema(exclude=('user', 'course'))
+
+def _enrollment_load_options(fields=None):
+    """
+    Eager loads for exactly what EnrollmentSchema's nested `only=` fields read
+    (user, course and the course's creator), so dumping a list of enrollments
+    takes one query instead of one or two per row. With `fields`, only the
+    requested columns and relations are loaded.
+    """
+    options = []
+    if fields is not None:
+        options.append(load_only_fields(Enrollment, fields, Enrollment.id))
+    if fields is None or 'user' in fields:
+        options.append(joinedload(Enrollment.user).load_only(User.user_id, User.first_name, User.email))
+    if fields is None or 'course' in fields:
+        options.append(
+            joinedload(Enrollment.course).load_only(Course.id, Course.title, Course.difficulty)
+                .joinedload(Course.creator).load_only(User.user_id, User.first_name, User.last_name)
+        )
+    return options
+
+def _insert_enrollments(course_id, user_ids):
+    """
+    Enrolls `user_ids` in the course, skipping users who are already enrolled (the
+    _user_course_uc constraint), and returns the set of user ids actually inserted.
+    """
+    table = Enrollment.__table__
+    rows = [{'user_id': user_id, 'course_id': course_id} for user_id in user_ids]
+    dialect = db.session.get_bind().dialect
+    if dialect.name in ('sqlite', 'postgresql') and dialect.insert_returning:
+        stmt = (sqlite if dialect.name == 'sqlite' else postgresql).insert(table).values(rows)
+        return set(db.session.scalars(stmt.on_conflict_do_nothing().returning(table.c.user_id)))
+    if dialect.name == 'mysql':
+        # No RETURNING, so read the rows back. Under REPEATABLE READ (the InnoDB default)
+        # the read uses the snapshot taken by the caller's check for existing enrollments,
+        # in which only this transaction's own inserts are new.
+        db.session.execute(mysql.insert(table).prefix_with('IGNORE').values(rows))
+        return set(db.session.scalars(
+            select(Enrollment.user_id).where(Enrollment.course_id == course_id, Enrollment.user_id.in_(user_ids))
+        ))
+    return _insert_enrollments_one_by_one(rows)
+
+def _insert_enrollments_one_by_one(rows):
+    """Portable fallback for _insert_enrollments: one INSERT per row, each in a SAVEPOINT."""
+    inserted = set()
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Enrollment.__table__).values(row))
+        except IntegrityError:
+            continue
+        inserted.add(row['user_id'])
+    return inserted
 
 class CourseService:
     @staticmethod
-    def get_all_courses(filters=None):
-        """
-        Retrieve all published courses, with optional filtering.
-        `filters` is a dict that can contain 'difficulty' and 'category'.
-        """
-        query = Course.query.filter_by(is_published=True)
+    def _apply_filters(query, filters):
+        """Applies the optional 'difficulty' and 'category' filters to a course query."""
         if filters:
             if 'difficulty' in filters and filters['difficulty']:
                 try:
@@ -21,33 +103,71 @@ class CourseService:
                     # Ignore invalid difficulty values
                     pass
             if 'category' in filters and filters['category']:
-                query = query.filter(Course.category.ilike(f"%{filters['category']}%"))
-        
-        courses = query.order_by(Course.created_at.desc()).all()
-        return courses_schema.dump(courses)
+                # Exact match so ix_courses_category can be used; free-text lookups go through /api/search.
+                query = query.filter(Course.category == filters['category'])
+        return query
 
     @staticmethod
-    def get_all_courses_for_authoring(filters=None):
+    def _paginate(query, sort, cursor, page_size, fields=None):
         """
-        Retrieve all courses (published or not), with optional filtering.
-        For educators/admins.
+        Returns one page of `query` in `sort` order using keyset pagination.
+        `cursor` is the opaque `next_cursor` of the previous page, or None for the first page.
+        `fields` limits the columns loaded and serialized (None for all).
         """
-        # This method is very similar to get_all_courses, but without the is_published filter.
-        # For now, we'll keep them separate for clarity, but they could be consolidated.
-        query = Course.query
-        # The filtering logic is identical, so we just apply it to the base query.
-        if filters:
-            if 'difficulty' in filters and filters['difficulty']:
-                try:
-                    difficulty_enum = DifficultyLevel(filters['difficulty'].lower())
-                    query = query.filter(Course.difficulty == difficulty_enum)
-                except ValueError:
-                    pass
-            if 'category' in filters and filters['category']:
-                query = query.filter(Course.category.ilike(f"%{filters['category']}%"))
+        if sort not in COURSE_SORTS:
+            raise ValueError(f"Invalid sort. Use one of: {', '.join(COURSE_SORTS)}")
+        attribute, descending = COURSE_SORTS[sort]
+        column = getattr(Course, attribute)
+        page_size = page_size or current_app.config.get('COURSES_PAGE_SIZE', 20)
+        if fields is not None:
+            # The sort column is always loaded since the next cursor is built from it.
+            query = query.options(load_only_fields(Course, fields, Course.id, column))
+            if 'creator' not in fields:
+                query = query.options(lazyload(Course.creator))
+
+        if cursor:
+            position = decode_cursor(cursor)
+            if position.get('sort') != sort or 'id' not in position:
+                raise ValueError("Cursor does not match the requested sort.")
+            query = query.filter(keyset_after(column, Course.id, position.get('value'), position['id'], descending))
+
+        if descending:
+            query = query.order_by(column.desc(), Course.id.desc())
+        else:
+            query = query.order_by(column.asc(), Course.id.asc())
+
+        # Fetch one extra row to know whether another page follows.
+        courses = query.limit(page_size + 1).all()
+        next_cursor = None
+        if len(courses) > page_size:
+            courses = courses[:page_size]
+            last = courses[-1]
+            next_cursor = encode_cursor({'sort': sort, 'value': getattr(last, attribute), 'id': last.id})
+
+        return {
+            "courses": dump_schema(courses_schema, fields).dump(courses),
+            "next_cursor": next_cursor
+        }
+
+    @staticmethod
+    def get_all_courses(filters=None, sort='newest', cursor=None, page_size=None, fields=None):
+        """
+        Retrieve a page of published courses, with optional filtering.
+        `filters` is a dict that can contain 'difficulty' and 'category'.
+        `fields` is a sparse fieldset of CourseSchema fields (None for all).
+        Returns {"courses": [...], "next_cursor": str or None}.
+        """
+        query = CourseService._apply_filters(Course.query.filter_by(is_published=True), filters)
+        return CourseService._paginate(query, sort, cursor, page_size, fields)
 
-        courses = query.order_by(Course.created_at.desc()).all()
-        return courses_schema.dump(courses)
+    @staticmethod
+    def get_all_courses_for_authoring(filters=None, sort='newest', cursor=None, page_size=None, fields=None):
+        """
+        Retrieve a page of all courses (published or not), with optional filtering.
+        For educators/admins.
+        """
+        query = CourseService._apply_filters(Course.query, filters)
+        return CourseService._paginate(query, sort, cursor, page_size, fields)
 
     @staticmethod
     def get_course_by_id(course_id, user):
@@ -65,18 +185,129 @@ class CourseService:
             
         return course_schema.dump(course)
 
+    @staticmethod
+    def get_course_bundle(course_id, user):
+        """
+        Everything needed to open a course in one response: the course, its lesson
+        outline and exercise list in order, and the caller's enrollment and progress
+        (None when absent). Five queries regardless of course size.
+        Returns None if the course doesn't exist or is unpublished and `user` is a student.
+        """
+        course = Course.query.get(course_id)
+        if not course or (user.role == UserRole.STUDENT and not course.is_published):
+            return None
+
+        contents = (
+            CourseContent.query.options(load_only_fields(CourseContent, bundle_contents_schema.only, CourseContent.id))
+            .filter_by(course_id=course_id)
+            .order_by(CourseContent.order_index)
+            .all()
+        )
+        exercises = (
+            Exercise.query.options(load_only_fields(Exercise, bundle_exercises_schema.only, Exercise.exercise_id))
+            .filter_by(course_id=course_id)
+            .order_by(Exercise.order_index)
+            .all()
+        )
+        enrollment = Enrollment.query.filter_by(user_id=user.user_id, course_id=course_id).first()
+        progress = ProgressTracking.query.filter_by(user_id=user.user_id, course_id=course_id).first()
+
+        return {
+            "course": course_schema.dump(course),
+            "contents": bundle_contents_schema.dump(contents),
+            "exercises": bundle_exercises_schema.dump(exercises),
+            "enrollment": bundle_enrollment_schema.dump(enrollment) if enrollment else None,
+            "progress": bundle_progress_schema.dump(progress) if progress else None
+        }
+
     @staticmethod
     def create_course(data, creator_id):
         """Create a new course from deserialized data."""
-        if not User.query.get(creator_id):
+        if not get_user(creator_id):
             raise ValueError("Creator user not found.")
 
         new_course = Course(creator_id=creator_id, **data)
         
         db.session.add(new_course)
+        db.session.flush()
+        search_index.index_course(new_course)
         db.session.commit()
+        response_cache.bump(CATALOG_CACHE)
         return course_schema.dump(new_course)
 
+    @staticmethod
+    def _copy_rows(model, id_column, course_id, new_course_id, columns, overrides):
+        """
+        Copies every `model` row of `course_id` to `new_course_id` with one INSERT ... SELECT.
+        `overrides` maps column names to literal values for the copies.
+        Returns {source id: new id}.
+        """
+        table = model.__table__
+        source_ids = [row_id for (row_id,) in db.session.query(id_column).filter_by(course_id=course_id).order_by(id_column)]
+        if not source_ids:
+            return {}
+        names = ['course_id', *columns, *overrides]
+        source = select(
+            literal(new_course_id),
+            *(table.c[name] for name in columns),
+            *(literal(value, table.c[name].type) for name, value in overrides.items())
+        ).where(table.c.course_id == course_id).order_by(table.c[id_column.key])
+        db.session.execute(table.insert().from_select(names, source))
+        # Rows are inserted in source id order, so the new ids line up with the old ones.
+        new_ids = [row_id for (row_id,) in db.session.query(id_column).filter_by(course_id=new_course_id).order_by(id_column)]
+        return dict(zip(source_ids, new_ids))
+
+    @staticmethod
+    def clone_course(course_id, creator_id, title=None):
+        """
+        Copies a course with all its contents and exercises in one transaction.
+        Contents and exercises are copied set-based with INSERT ... SELECT, and
+        uploaded media is shared by URL (one more reference each) rather than duplicated. The copy starts
+        unpublished with no enrollments and belongs to `creator_id`.
+        Returns the new course plus {source id: new id} maps for contents and exercises.
+        """
+        source = Course.query.get_or_404(course_id)
+        now = datetime.utcnow()
+
+        new_course = Course(
+            title=(title or f"{source.title} (copy)")[:Course.title.type.length],
+            description=source.description,
+            creator_id=creator_id,
+            difficulty=source.difficulty,
+            category=source.category,
+            estimated_duration=source.estimated_duration,
+            course_image_url=source.course_image_url,
+            is_published=False,
+            enrollment_count=0
+        )
+        db.session.add(new_course)
+        db.session.flush()
+
+        content_ids = CourseService._copy_rows(
+            CourseContent, CourseContent.id, course_id, new_course.id,
+            ['title', 'content_type', 'content_url', 'content_text', 'order_index',
+             'processing_status', 'derived_assets', 'processing_error'],
+            {'created_at': now, 'updated_at': now}
+        )
+        exercise_ids = CourseService._copy_rows(
+            Exercise, Exercise.exercise_id, course_id, new_course.id,
+            ['title', 'exercise_type', 'question_text', 'audio_url', 'correct_answer', 'options',
+             'difficulty_level', 'points', 'time_limit', 'order_index', 'is_active'],
+            {'created_at': now}
+        )
+        MediaService.acquire_course(new_course.id)
+
+        search_index.index_course(new_course)
+        search_index.index_course_items(new_course.id)
+        db.session.commit()
+        response_cache.bump(CATALOG_CACHE)
+
+        return {
+            "course": course_schema.dump(new_course),
+            "contents": content_ids,
+            "exercises": exercise_ids
+        }
+
     @staticmethod
     def update_course(course_id, data):
         """Update an existing course's data."""
@@ -85,16 +316,96 @@ class CourseService:
         for key, value in data.items():
             setattr(course, key, value)
 
+        search_index.index_course(course)
         db.session.commit()
+        response_cache.bump(CATALOG_CACHE)
         return course_schema.dump(course)
 
+    @staticmethod
+    def _reorder(model, id_column, course_id, ordered_ids, extra_values, label):
+        """
+        Sets order_index of `model` rows of the course to their position in `ordered_ids`,
+        which must list every row of the course exactly once. Only rows that move are
+        written, all with a single UPDATE ... CASE. Returns the number of rows moved.
+        """
+        if not isinstance(ordered_ids, list) or not all(isinstance(row_id, int) for row_id in ordered_ids):
+            raise ValueError(f"The order of {label} must be a list of ids.")
+        current = dict(db.session.query(id_column, model.order_index).filter(model.course_id == course_id))
+        if len(ordered_ids) != len(set(ordered_ids)) or set(ordered_ids) != set(current):
+            raise ValueError(f"The order must list each of the course's {label} exactly once.")
+
+        moved = {row_id: index for index, row_id in enumerate(ordered_ids) if current[row_id] != index}
+        if moved:
+            db.session.execute(
+                update(model)
+                .where(model.course_id == course_id, id_column.in_(list(moved)))
+                .values(order_index=case(moved, value=id_column), **extra_values)
+                .execution_options(synchronize_session=False)
+            )
+        return len(moved)
+
+    @staticmethod
+    def reorder_course(course_id, expected_updated_at, content_ids=None, exercise_ids=None):
+        """
+        Applies the full ordered id lists of a course's contents and/or exercises in one transaction.
+        `expected_updated_at` is the course's updated_at as the editor last saw it; if the course
+        has changed since, nothing is written and EditConflict is raised. A successful reorder
+        moves updated_at on, so the next edit must be based on the returned value.
+        Returns {"updated_at", "contents_moved", "exercises_moved"}.
+        """
+        stored = db.session.query(Course.updated_at).filter(Course.id == course_id).scalar()
+        if stored is None:
+            raise ValueError("Course not found.")
+        # MySQL DATETIME keeps whole (rounded) seconds, so the editor may have seen the fraction that was dropped.
+        if stored != expected_updated_at and (stored.microsecond or abs(stored - expected_updated_at) >= timedelta(seconds=1)):
+            raise EditConflict()
+
+        now = datetime.utcnow()
+        # Compare-and-set on the exact stored value: of two concurrent reorders only one matches.
+        claimed = db.session.execute(
+            update(Course)
+            .where(Course.id == course_id, Course.updated_at == stored)
+            .values(updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            raise EditConflict()
+
+        try:
+            contents_moved = exercises_moved = 0
+            if content_ids is not None:
+                contents_moved = CourseService._reorder(
+                    CourseContent, CourseContent.id, course_id, content_ids, {'updated_at': now}, 'lessons'
+                )
+            if exercise_ids is not None:
+                exercises_moved = CourseService._reorder(Exercise, Exercise.exercise_id, course_id, exercise_ids, {}, 'exercises')
+        except ValueError:
+            db.session.rollback()
+            raise
+        db.session.commit()
+
+        return {
+            "updated_at": db.session.query(Course.updated_at).filter(Course.id == course_id).scalar().isoformat(),
+            "contents_moved": contents_moved,
+            "exercises_moved": exercises_moved
+        }
+
     @staticmethod
     def delete_course(course_id):
-        """Delete a course from the database."""
+        """
+        Delete a course from the database.
+        Contents, exercises, attempts, enrollments and progress go with it through
+        ON DELETE CASCADE, without being loaded; uploaded files are removed in the background.
+        """
         course = Course.query.get_or_404(course_id)
+        unreferenced = MediaService.release_course(course.id)
         
+        search_index.remove_course(course.id)
         db.session.delete(course)
         db.session.commit()
+        response_cache.bump(CATALOG_CACHE)
+        media_cleanup.schedule(unreferenced)
         return True
 
     @staticmethod
@@ -109,35 +420,170 @@ class CourseService:
             raise ValueError("User is already enrolled in this course.")
 
         new_enrollment = Enrollment(user_id=user_id, course_id=course_id)
-        course.enrollment_count = (course.enrollment_count or 0) + 1
-        
         db.session.add(new_enrollment)
+        try:
+            # The unique constraint catches a concurrent enrollment that slipped past the check above.
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            raise ValueError("User is already enrolled in this course.")
+
+        # Increment in SQL rather than read-modify-write, so concurrent enrollments can't lose updates.
+        db.session.execute(
+            update(Course)
+            .where(Course.id == course_id)
+            .values(enrollment_count=Course.enrollment_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        # Serialized before the commit expires it: a concurrent unenroll may delete the row right after.
+        result = enrollment_schema.dump(new_enrollment)
         db.session.commit()
         
-        return enrollment_schema.dump(new_enrollment)
+        return result
 
     @staticmethod
     def unenroll_user(user_id, course_id):
         """Unenroll a user from a course."""
-        enrollment = Enrollment.query.filter_by(user_id=user_id, course_id=course_id).first()
-        
-        if not enrollment:
+        # Only the request whose DELETE actually removed the row decrements the counter.
+        result = db.session.execute(
+            delete(Enrollment)
+            .where(Enrollment.user_id == user_id, Enrollment.course_id == course_id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.session.rollback()
             raise ValueError("User is not enrolled in this course.")
 
-        course = Course.query.get(course_id)
-        if course and course.enrollment_count > 0:
-            course.enrollment_count -= 1
-        
-        db.session.delete(enrollment)
+        db.session.execute(
+            update(Course)
+            .where(Course.id == course_id)
+            .values(enrollment_count=case((Course.enrollment_count > 0, Course.enrollment_count - 1), else_=0))
+            .execution_options(synchronize_session=False)
+        )
         db.session.commit()
         return True
 
     @staticmethod
-    def get_user_enrollments(user_id):
-        """Get all courses a user is enrolled in."""
-        enrollments = Enrollment.query.filter_by(user_id=user_id).order_by(Enrollment.enrollment_date.desc()).all()
+    def bulk_enroll(course_id, user_ids=None, emails=None):
+        """
+        Enrolls a cohort in a course with one multi-row INSERT that skips users
+        already enrolled (via the _user_course_uc constraint), then bumps
+        enrollment_count once by the number of rows actually inserted.
+        `user_ids` and `emails` may be combined.
+        Returns {"enrolled": [...], "already_enrolled": [...], "not_found": [...]},
+        where the first two list {"user_id", "email"} pairs. "enrolled" lists
+        exactly the rows inserted, so it always matches the change in enrollment_count.
+        """
+        user_ids = list(dict.fromkeys(user_ids or []))
+        emails = list(dict.fromkeys(emails or []))
+        if not user_ids and not emails:
+            raise ValueError("Provide 'user_ids' and/or 'emails'.")
+        if len(user_ids) + len(emails) > current_app.config.get('BULK_ENROLL_MAX_USERS', 1000):
+            raise ValueError(f"At most {current_app.config.get('BULK_ENROLL_MAX_USERS', 1000)} users can be enrolled at once.")
+
+        course = Course.query.get(course_id)
+        if not course or not course.is_published:
+            raise ValueError("Course not found or is not published.")
+
+        users = db.session.query(User.user_id, User.email).filter(
+            or_(User.user_id.in_(user_ids), User.email.in_(emails))
+        ).all()
+        found_ids = {user_id for user_id, _ in users}
+        found_emails = {email for _, email in users}
+        not_found = [user_id for user_id in user_ids if user_id not in found_ids]
+        not_found += [email for email in emails if email not in found_emails]
+
+        inserted = set()
+        if users:
+            existing = {
+                user_id for (user_id,) in db.session.query(Enrollment.user_id).filter(
+                    Enrollment.course_id == course_id, Enrollment.user_id.in_(found_ids)
+                )
+            }
+            candidates = [user_id for user_id, _ in users if user_id not in existing]
+            if candidates:
+                # Users who enrolled themselves since the check above are skipped
+                # by the insert and reported as already enrolled.
+                inserted = _insert_enrollments(course_id, candidates)
+        if inserted:
+            db.session.execute(
+                update(Course)
+                .where(Course.id == course_id)
+                .values(enrollment_count=Course.enrollment_count + len(inserted))
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+
+        enrolled, already_enrolled = [], []
+        for user_id, email in users:
+            (enrolled if user_id in inserted else already_enrolled).append({'user_id': user_id, 'email': email})
+
+        return {
+            "enrolled": enrolled,
+            "already_enrolled": already_enrolled,
+            "not_found": not_found
+        }
+
+    @staticmethod
+    def reconcile_enrollment_counts():
+        """
+        Recomputes every course's enrollment_count from the enrollments table and
+        fixes the ones that drifted. Returns the number of courses corrected.
+        """
+        actual = (
+            select(func.count(Enrollment.id))
+            .where(Enrollment.course_id == Course.id)
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            update(Course)
+            .where(Course.enrollment_count != actual)
+            .values(enrollment_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if result.rowcount:
+            response_cache.bump(CATALOG_CACHE)
+        return result.rowcount
+
+    @staticmethod
+    def get_user_enrollments(user_id, fields=None):
+        """Get all courses a user is enrolled in. `fields` is an optional sparse fieldset."""
+        enrollments = (
+            Enrollment.query.options(*_enrollment_load_options(fields))
+            .filter_by(user_id=user_id)
+            .order_by(Enrollment.enrollment_date.desc())
+            .all()
+        )
         # We return the enrollment objects which contain nested course info
-        return enrollments_schema.dump(enrollments)
+        return dump_schema(enrollments_schema, fields).dump(enrollments)
+
+    @staticmethod
+    def get_course_enrollments(course_id, cursor=None, page_size=None, fields=None):
+        """
+        Get a page of a course's roster, oldest enrollment first.
+        `cursor` is the `next_cursor` of the previous page; `fields` is an optional sparse fieldset.
+        Returns {"enrollments": [...], "next_cursor": str or None}.
+        """
+        page_size = page_size or current_app.config.get('ROSTER_PAGE_SIZE', 50)
+        query = Enrollment.query.options(*_enrollment_load_options(fields)).filter_by(course_id=course_id)
+        if cursor:
+            position = decode_cursor(cursor)
+            if not isinstance(position.get('id'), int):
+                raise ValueError("Invalid cursor.")
+            query = query.filter(Enrollment.id > position['id'])
+
+        # Fetch one extra row to know whether another page follows.
+        enrollments = query.order_by(Enrollment.id).limit(page_size + 1).all()
+        next_cursor = None
+        if len(enrollments) > page_size:
+            enrollments = enrollments[:page_size]
+            next_cursor = encode_cursor({'id': enrollments[-1].id})
+
+        return {
+            "enrollments": dump_schema(enrollments_schema, fields).dump(enrollments),
+            "next_cursor": next_cursor
+        }
 
     @staticmethod
     def get_course_meta_info():
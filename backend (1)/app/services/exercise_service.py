@@ -1,12 +1,16 @@
-from app import db
+import json
+from app import db, search_index, answer_keys
 from app.models.course import Course
 from app.models.exercise import (
     Exercise, ExerciseAttempt,
     exercise_schema, exercises_schema, exercise_attempt_schema,
     ExerciseType, ExerciseDifficultyLevel
 )
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.utils.exceptions import ForbiddenError
+from app.utils.principal import get_user
+from app.utils.fieldsets import load_only_fields, dump_schema
+from flask import abort
 from sqlalchemy.exc import IntegrityError
 
 class ExerciseService:
@@ -14,7 +18,9 @@ class ExerciseService:
     def create_exercise(course_id, data, creator_id):
         """Creates a new exercise for a course."""
         course = Course.query.get_or_404(course_id)
-        creator = User.query.get_or_404(creator_id)
+        creator = get_user(creator_id)
+        if not creator:
+            abort(404)
 
         if course.creator_id != creator.user_id and creator.role != UserRole.ADMIN:
             raise ForbiddenError("You are not authorized to add exercises to this course.")
@@ -32,6 +38,8 @@ class ExerciseService:
                 order_index=data.get('order_index')
             )
             db.session.add(new_exercise)
+            db.session.flush()
+            search_index.index_exercise(new_exercise)
             db.session.commit()
             return exercise_schema.dump(new_exercise)
         except (KeyError, ValueError) as e:
@@ -42,11 +50,14 @@ class ExerciseService:
             raise ValueError("Database integrity error, possibly due to invalid foreign key or enum value.")
 
     @staticmethod
-    def get_exercises_for_course(course_id):
-        """Retrieves all exercises for a given course."""
+    def get_exercises_for_course(course_id, fields=None):
+        """Retrieves all exercises for a given course. `fields` is an optional sparse fieldset."""
         course = Course.query.get_or_404(course_id)
-        exercises = course.exercises.order_by(Exercise.order_index).all()
-        return exercises_schema.dump(exercises)
+        query = course.exercises
+        if fields is not None:
+            query = query.options(load_only_fields(Exercise, fields, Exercise.exercise_id))
+        exercises = query.order_by(Exercise.order_index).all()
+        return dump_schema(exercises_schema, fields).dump(exercises)
 
     @staticmethod
     def get_exercise_by_id(exercise_id):
@@ -59,28 +70,33 @@ class ExerciseService:
     def submit_attempt(exercise_id, user_id, submission_data):
         """Processes a user's attempt at an exercise, scores it, and records it."""
         exercise = Exercise.query.get_or_404(exercise_id)
-        user = User.query.get_or_404(user_id)
+        user = get_user(user_id)
+        if not user:
+            abort(404)
         user_answer = submission_data.get('answer')
 
         if user_answer is None:
             raise ValueError("Submission must include an 'answer'.")
 
-        # Basic scoring logic
-        is_correct = (str(user_answer).strip().lower() == str(exercise.correct_answer).strip().lower())
-        score_earned = exercise.points if is_correct else 0
-        feedback = "Correct!" if is_correct else f"Incorrect. The correct answer is: {exercise.correct_answer}"
+        # Graded by exercise type against the compiled answer key (see utils/grading.py).
+        # Answers to several blanks or pairs earn their share of the points.
+        grade = answer_keys.grade(exercise, user_answer)
 
         attempt = ExerciseAttempt(
             user_id=user.user_id,
             exercise_id=exercise.exercise_id,
-            user_answer=str(user_answer),
-            is_correct=is_correct,
-            score_earned=score_earned,
-            feedback_given=feedback,
+            user_answer=user_answer if isinstance(user_answer, str) else json.dumps(user_answer, ensure_ascii=False),
+            is_correct=grade.is_correct,
+            score_earned=round((exercise.points or 0) * grade.fraction),
+            feedback_given=grade.feedback,
             time_taken=submission_data.get('time_taken')
         )
 
         db.session.add(attempt)
+        db.session.flush()
+        # Serialize before committing: the commit expires `user`, and dumping the
+        # nested user afterwards would reload the row the principal already holds.
+        result = exercise_attempt_schema.dump(attempt)
         db.session.commit()
         
-        return exercise_attempt_schema.dump(attempt)
+        return result
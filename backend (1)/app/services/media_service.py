@@ -0,0 +1,231 @@
+import mimetypes
+import time
+import uuid
+from collections import Counter, defaultdict
+from flask import current_app, url_for
+from itsdangerous import BadSignature, SignatureExpired, URLSafeSerializer, URLSafeTimedSerializer
+from sqlalchemy import case, exists, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from app import db, storage
+from app.models.media import MediaFile
+from app.models.course import Course
+from app.models.course_content import CourseContent
+from app.models.enrollment import Enrollment
+from app.models.user import UserRole
+from app.utils.exceptions import ForbiddenError
+from app.utils.helpers import StoredFile, save_stream_as, upload_extension
+from app.utils.principal import get_user
+
+class MediaService:
+    """
+    Reference counts for uploaded files. Every course content whose content_url
+    points at a file holds one reference. Call these inside the transaction
+    that adds or removes the content rows, so the counts commit with them.
+    Also hands out direct uploads, which go to storage without passing through the app.
+    """
+
+    @staticmethod
+    def get_accessible(url, user):
+        """
+        The MediaFile stored at `url`, or None if there is none. Raises ForbiddenError unless
+        `user` may read it: admins read everything; others need a course using the file that
+        is published, created by them or that they are enrolled in.
+        """
+        media = MediaFile.query.filter_by(url=url).first()
+        if media is None:
+            return None
+        if user is None:
+            raise ForbiddenError("You do not have access to this file.")
+        if user.role == UserRole.ADMIN:
+            return media
+
+        enrolled = exists().where(Enrollment.course_id == Course.id, Enrollment.user_id == user.user_id)
+        visible = db.session.query(CourseContent.id).join(Course, CourseContent.course_id == Course.id).filter(
+            CourseContent.content_url == url,
+            or_(Course.is_published.is_(True), Course.creator_id == user.user_id, enrolled)
+        ).first()
+        if not visible:
+            raise ForbiddenError("You do not have access to this file.")
+        return media
+
+    @staticmethod
+    def source_url(filename):
+        """The content URL a served file belongs to: derived files ('<name>.<variant>.<ext>') belong to their upload."""
+        return f"uploads/{'.'.join(filename.split('.')[:2])}"
+
+    @staticmethod
+    def media_link(filename, user):
+        """
+        A URL for GET /api/media/<filename> that needs no Authorization header, for
+        <audio>, <video> and <img> elements, which cannot send one. Its token is signed
+        for this one file and user. Within a MEDIA_LINK_EXPIRES period every call returns
+        the same URL, so browsers keep serving the file from their cache; it expires one
+        period after that. Returns None or raises ForbiddenError as get_accessible does.
+        """
+        if MediaService.get_accessible(MediaService.source_url(filename), user) is None:
+            return None
+        period = current_app.config['MEDIA_LINK_EXPIRES']
+        expires_at = (int(time.time()) // period + 2) * period
+        token = MediaService._link_serializer().dumps({'name': filename, 'user_id': user.user_id, 'expires_at': expires_at})
+        return {
+            'url': url_for('media_bp.get_media', filename=filename, token=token, _external=True),
+            'expires_at': expires_at,
+        }
+
+    @staticmethod
+    def load_media_link(token, filename):
+        """The active User a media link token for `filename` was issued to. Raises ValueError if it is not valid."""
+        try:
+            payload = MediaService._link_serializer().loads(token)
+        except BadSignature:
+            raise ValueError("Invalid media token.")
+        if payload.get('name') != filename:
+            raise ValueError("The media token is for another file.")
+        if payload.get('expires_at', 0) < time.time():
+            raise ValueError("The media token has expired.")
+        user = get_user(payload['user_id'])
+        if user is None or not user.is_active:
+            raise ValueError("Invalid media token.")
+        return user
+
+    @staticmethod
+    def _link_serializer():
+        # Untimed, so the same payload always signs to the same token; expires_at is checked instead.
+        return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='media-link')
+
+    @staticmethod
+    def start_direct_upload(course_id, filename, content_type=None):
+        """
+        Reserves a storage name for a file a browser uploads itself, so large files do
+        not pass through the app: a presigned POST with S3 storage, a signed PUT to
+        /api/media/uploads/<token> with local storage. Record the finished upload by
+        sending `upload_token` with the new content of `course_id`.
+        """
+        name = f"{uuid.uuid4().hex}.{upload_extension(filename)}"
+        content_type = content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        expires = current_app.config['DIRECT_UPLOAD_EXPIRES']
+        max_size = current_app.config['MAX_UPLOAD_SIZE']
+        token = MediaService._upload_serializer().dumps({'name': name, 'course_id': course_id})
+
+        target = storage.direct_upload(name, content_type, max_size, expires)
+        if target is None:
+            target = {
+                'method': 'PUT',
+                'url': url_for('media_bp.put_direct_upload', token=token, _external=True),
+                'headers': {'Content-Type': content_type},
+            }
+        return {'upload_token': token, 'expires_in': expires, 'max_size': max_size, **target}
+
+    @staticmethod
+    def receive_direct_upload(token, stream):
+        """Stores the body of a PUT to the URL start_direct_upload handed out with local storage."""
+        if not storage.is_local:
+            raise ValueError("Uploads go straight to storage.")
+        name = MediaService._load_upload_token(token, current_app.config['DIRECT_UPLOAD_EXPIRES'])['name']
+        save_stream_as(stream, name)
+
+    @staticmethod
+    def finish_direct_upload(token, course_id):
+        """
+        The StoredFile of a direct upload for `course_id` once it is in storage.
+        Raises ValueError if the token is invalid or the upload has not finished.
+        """
+        # Unrecorded uploads are collected by `flask gc-uploads` after the grace period.
+        max_age = int(current_app.config.get('UPLOAD_GC_GRACE_HOURS', 24) * 60 * 60)
+        payload = MediaService._load_upload_token(token, max_age)
+        if payload['course_id'] != course_id:
+            raise ValueError("The upload belongs to another course.")
+        name = payload['name']
+        size = storage.size(name)
+        if size is None:
+            raise ValueError("The file has not been uploaded yet.")
+        if size > current_app.config['MAX_UPLOAD_SIZE']:
+            storage.delete(name)
+            raise ValueError("File is too large.")
+        return StoredFile(f"uploads/{name}", None, size)
+
+    @staticmethod
+    def _upload_serializer():
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='direct-upload')
+
+    @staticmethod
+    def _load_upload_token(token, max_age):
+        try:
+            return MediaService._upload_serializer().loads(token, max_age=max_age)
+        except SignatureExpired:
+            raise ValueError("The upload has expired.")
+        except BadSignature:
+            raise ValueError("Invalid upload token.")
+
+    @staticmethod
+    def acquire(stored):
+        """
+        Adds a reference to a file returned by save_file, registering it on first use.
+        The change is flushed, so the media_files row stays locked until the transaction ends.
+        """
+        if MediaService._adjust({stored.url: 1}):
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(MediaFile(url=stored.url, content_hash=stored.content_hash, size=stored.size, ref_count=1))
+        except IntegrityError:
+            # A concurrent upload of the same bytes registered it first.
+            MediaService._adjust({stored.url: 1})
+
+    @staticmethod
+    def acquire_course(course_id):
+        """Adds a reference for every content of `course_id` with a file, e.g. after the contents were copied."""
+        MediaService._adjust(MediaService._course_counts(course_id))
+
+    @staticmethod
+    def release(urls):
+        """
+        Drops one reference per entry of `urls` (repeats drop several).
+        Returns the URLs nothing references any more; pass them to
+        media_cleanup.schedule() once the transaction has been committed.
+        """
+        counts = Counter(url for url in urls if url)
+        return MediaService._release_counts(counts)
+
+    @staticmethod
+    def release_course(course_id):
+        """Drops the references held by the contents of `course_id`. Call before deleting them."""
+        return MediaService._release_counts(MediaService._course_counts(course_id))
+
+    @staticmethod
+    def _course_counts(course_id):
+        rows = db.session.query(CourseContent.content_url, func.count()).filter(
+            CourseContent.course_id == course_id, CourseContent.content_url.isnot(None)
+        ).group_by(CourseContent.content_url)
+        return dict(rows)
+
+    @staticmethod
+    def _release_counts(counts):
+        if not counts:
+            return []
+        MediaService._adjust({url: -amount for url, amount in counts.items()})
+        return [url for (url,) in db.session.query(MediaFile.url).filter(
+            MediaFile.url.in_(list(counts)), MediaFile.ref_count <= 0
+        )]
+
+    @staticmethod
+    def _adjust(deltas):
+        """
+        Adds deltas ({url: amount}) to the reference counts atomically, one UPDATE
+        per distinct amount, never going below zero. Returns the number of rows changed.
+        """
+        by_amount = defaultdict(list)
+        for url, amount in deltas.items():
+            by_amount[amount].append(url)
+
+        changed = 0
+        for amount, urls in by_amount.items():
+            new_count = MediaFile.ref_count + amount
+            result = db.session.execute(
+                update(MediaFile)
+                .where(MediaFile.url.in_(urls))
+                .values(ref_count=case((new_count < 0, 0), else_=new_count))
+                .execution_options(synchronize_session=False)
+            )
+            changed += result.rowcount
+        return changed
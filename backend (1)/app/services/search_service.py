@@ -0,0 +1,78 @@
+from app import db, search_index
+from app.models.course import Course
+from app.models.course_content import CourseContent
+from app.models.exercise import Exercise
+from app.utils.search_index import DOC_TYPES, tokenize
+
+SNIPPET_LENGTH = 160
+
+class SearchService:
+    # doc_type -> (id, course id, title, body) columns used to build results
+    SOURCES = {
+        'course': (Course.id, Course.id, Course.title, Course.description),
+        'lesson': (CourseContent.id, CourseContent.course_id, CourseContent.title, CourseContent.content_text),
+        'exercise': (Exercise.exercise_id, Exercise.course_id, Exercise.title, Exercise.question_text),
+    }
+
+    @staticmethod
+    def _snippet(body, terms):
+        """Cuts a window of `body` around the first occurrence of a search term."""
+        if not body:
+            return ''
+        lowered = body.lower()
+        positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+        start = max(0, min(positions) - SNIPPET_LENGTH // 4) if positions else 0
+        if start:
+            # Back up to the start of the word instead of cutting it in half.
+            start = body.rfind(' ', 0, start) + 1
+        snippet = body[start:start + SNIPPET_LENGTH].strip()
+        if start > 0:
+            snippet = '…' + snippet
+        if start + SNIPPET_LENGTH < len(body):
+            snippet += '…'
+        return snippet
+
+    @staticmethod
+    def search(query, doc_types=None, limit=20, include_unpublished=False):
+        """
+        Ranked full-text search over courses, lessons and exercises.
+        `doc_types` limits the result to some of 'course', 'lesson' and 'exercise'.
+        Students only see published courses and active exercises; the index
+        filters those before applying `limit`.
+        Returns a list of {type, id, course_id, title, snippet, score}, best match first.
+        Scores are the backend's raw relevance, only comparable within one result list.
+        """
+        doc_types = doc_types or list(DOC_TYPES)
+        unknown = [doc_type for doc_type in doc_types if doc_type not in DOC_TYPES]
+        if unknown:
+            raise ValueError(f"Invalid type. Use any of: {', '.join(DOC_TYPES)}")
+
+        hits = search_index.search(query, doc_types, limit, published_only=not include_unpublished)
+
+        # Load titles and text for the hits with one query per document type.
+        ids_by_type = {}
+        for doc_type, doc_id, _ in hits:
+            ids_by_type.setdefault(doc_type, []).append(doc_id)
+        rows = {}
+        for doc_type, ids in ids_by_type.items():
+            id_column, course_column, title_column, body_column = SearchService.SOURCES[doc_type]
+            query_rows = db.session.query(id_column, course_column, title_column, body_column).filter(id_column.in_(ids))
+            for doc_id, course_id, title, body in query_rows:
+                rows[(doc_type, doc_id)] = (course_id, title, body)
+
+        terms = tokenize(query)
+        results = []
+        for doc_type, doc_id, score in hits:
+            row = rows.get((doc_type, doc_id))
+            if row is None:
+                continue
+            course_id, title, body = row
+            results.append({
+                'type': doc_type,
+                'id': doc_id,
+                'course_id': course_id,
+                'title': title,
+                'snippet': SearchService._snippet(body, terms),
+                'score': score,
+            })
+        return results
@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+import threading
+from datetime import datetime
+from itertools import islice
+from app import db, password_hasher
+from app.models.user import User, UserRole
+from app.models.authentication import Authentication
+from app.utils.exceptions import ImportTooLarge, ServiceBusy
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+REQUIRED_FIELDS = ('email', 'password', 'first_name', 'last_name')
+
+# One import from the admin endpoint at a time per worker process; bigger jobs belong to `flask import-users`.
+_request_import_lock = threading.Lock()
+
+def _text(row, field):
+    """A field as text: NDJSON numbers are accepted as their digits, other non-strings are refused."""
+    value = row.get(field)
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Field '{field}' must be text.")
+
+class UserImportService:
+    """
+    Bulk creation of user accounts from a CSV or NDJSON stream, e.g. when
+    onboarding a whole school cohort at once.
+    """
+
+    @staticmethod
+    def detect_format(filename):
+        """Guesses the import format from a file name, defaulting to CSV."""
+        if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+            return 'ndjson'
+        return 'csv'
+
+    @staticmethod
+    def _iter_rows(stream, fmt):
+        """Yields (row_number, dict) pairs from a text stream without reading it all into memory."""
+        if fmt == 'csv':
+            # Row 1 is the header, so data rows start at 2 to match what a spreadsheet shows.
+            for row_number, row in enumerate(csv.DictReader(stream), start=2):
+                yield row_number, row
+        elif fmt == 'ndjson':
+            for row_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield row_number, row
+        else:
+            raise ValueError(f"Unsupported import format: {fmt}")
+
+    @staticmethod
+    def _validate(row):
+        """Returns a cleaned row dict, or raises ValueError describing what is wrong with it."""
+        if not isinstance(row, dict):
+            raise ValueError("Row is not a valid record.")
+        values = {field: _text(row, field) for field in (*REQUIRED_FIELDS, 'role')}
+        missing = [field for field in REQUIRED_FIELDS if not values[field].strip()]
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+        email = values['email'].strip()
+        if '@' not in email:
+            raise ValueError("Invalid email address.")
+        try:
+            role = UserRole((values['role'] or UserRole.STUDENT.value).strip().lower())
+        except ValueError:
+            raise ValueError(f"Invalid role: {values['role']}")
+        return {
+            'email': email,
+            'password': values['password'],
+            'first_name': values['first_name'].strip(),
+            'last_name': values['last_name'].strip(),
+            'role': role,
+        }
+
+    @staticmethod
+    def import_users(stream, fmt='csv', batch_size=None, workers=None):
+        """
+        Creates users (and their Authentication entries) from the text `stream`.
+        Rows are validated, hashed in parallel and inserted in multi-row batches;
+        a bad row is reported and skipped instead of aborting the import.
+        Returns a report with the created count and per-row errors.
+        """
+        batch_size = batch_size or current_app.config.get('USER_IMPORT_BATCH_SIZE', 500)
+        workers = workers or current_app.config.get('USER_IMPORT_WORKERS') or os.cpu_count()
+
+        report = {'created': 0, 'failed': 0, 'errors': []}
+        seen_emails = set()
+
+        def fail(row_number, email, message):
+            report['failed'] += 1
+            report['errors'].append({'row': row_number, 'email': email, 'message': message})
+
+        rows = UserImportService._iter_rows(stream, fmt)
+        with password_hasher.create_pool(workers) as executor:
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+
+                batch = []
+                for row_number, row in chunk:
+                    try:
+                        cleaned = UserImportService._validate(row)
+                    except ValueError as e:
+                        email = row.get('email') if isinstance(row, dict) else None
+                        fail(row_number, email if isinstance(email, str) else None, str(e))
+                        continue
+                    if cleaned['email'] in seen_emails:
+                        fail(row_number, cleaned['email'], "Duplicate email in import file.")
+                        continue
+                    seen_emails.add(cleaned['email'])
+                    batch.append((row_number, cleaned))
+
+                # One query per batch to find accounts that already exist.
+                emails = [cleaned['email'] for _, cleaned in batch]
+                existing = {email for (email,) in db.session.query(User.email).filter(User.email.in_(emails))} if emails else set()
+                pending = []
+                for row_number, cleaned in batch:
+                    if cleaned['email'] in existing:
+                        fail(row_number, cleaned['email'], "User with this email already exists.")
+                    else:
+                        pending.append((row_number, cleaned))
+                if not pending:
+                    continue
+
+                hashes = password_hasher.hash_many([cleaned['password'] for _, cleaned in pending], executor)
+                UserImportService._insert_batch(pending, hashes, report, fail)
+
+        report['errors'].sort(key=lambda error: error['row'])
+        return report
+
+    @staticmethod
+    def import_users_for_request(stream, fmt='csv'):
+        """
+        import_users for the admin endpoint: hashing uses at most PASSWORD_HASH_IMPORT_WORKERS
+        processes and one import runs at a time per worker process, so a request never takes
+        every core. The rows are counted before anything is created, and files over
+        USER_IMPORT_MAX_REQUEST_ROWS raise ImportTooLarge, so an import never outlives the
+        worker timeout half-way through a cohort. `stream` must be seekable.
+        Raises ServiceBusy while another import is running.
+        """
+        max_rows = current_app.config.get('USER_IMPORT_MAX_REQUEST_ROWS', 100)
+        rows = sum(1 for _ in islice(UserImportService._iter_rows(stream, fmt), max_rows + 1))
+        if rows > max_rows:
+            raise ImportTooLarge(f"Files over {max_rows} rows must be imported with `flask import-users`.")
+        stream.seek(0)
+
+        if not _request_import_lock.acquire(blocking=False):
+            raise ServiceBusy("Another user import is running. Please try again shortly.", retry_after=10)
+        try:
+            workers = current_app.config.get('PASSWORD_HASH_IMPORT_WORKERS', 2)
+            return UserImportService.import_users(stream, fmt, workers=workers)
+        finally:
+            _request_import_lock.release()
+
+    @staticmethod
+    def _user_values(cleaned, password_hash, now):
+        return {
+            'email': cleaned['email'],
+            'password_hash': password_hash,
+            'first_name': cleaned['first_name'],
+            'last_name': cleaned['last_name'],
+            'role': cleaned['role'],
+            'created_at': now,
+            'updated_at': now,
+        }
+
+    @staticmethod
+    def _insert_batch(pending, hashes, report, fail):
+        """Inserts a validated batch with one multi-row INSERT per table, falling back to row by row on conflicts."""
+        now = datetime.utcnow()
+        user_rows = [UserImportService._user_values(cleaned, pw_hash, now) for (_, cleaned), pw_hash in zip(pending, hashes)]
+        try:
+            db.session.execute(User.__table__.insert(), user_rows)
+            emails = [row['email'] for row in user_rows]
+            ids = db.session.query(User.user_id).filter(User.email.in_(emails)).all()
+            db.session.execute(Authentication.__table__.insert(), [
+                {'user_id': user_id, 'last_login': now} for (user_id,) in ids
+            ])
+            db.session.commit()
+            report['created'] += len(user_rows)
+            return
+        except IntegrityError:
+            # Someone created one of these accounts concurrently; retry each row on its own
+            # so the rest of the batch still goes in.
+            db.session.rollback()
+
+        for (row_number, cleaned), values in zip(pending, user_rows):
+            try:
+                with db.session.begin_nested():
+                    result = db.session.execute(User.__table__.insert(), values)
+                    user_id = result.inserted_primary_key[0]
+                    db.session.execute(Authentication.__table__.insert(), {'user_id': user_id, 'last_login': now})
+                report['created'] += 1
+            except IntegrityError:
+                fail(row_number, cleaned['email'], "User with this email already exists.")
+        db.session.commit()
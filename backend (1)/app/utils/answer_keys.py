@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+
+class AnswerKeyCache:
+    """
+    Compiled answer keys (see utils/grading.py) by exercise_id, so a submission never
+    re-parses `correct_answer` or `options`. Each worker keeps an LRU of its own
+    (GRADING_CACHE_SIZE entries). An entry remembers the key it was compiled from and is
+    recompiled once the exercise's key no longer equals it, so an edit made through any
+    worker takes effect on the next submission.
+    """
+
+    def __init__(self, app=None):
+        self.max_size = 5000
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.get('GRADING_CACHE_SIZE', self.max_size)
+
+    def compiled(self, exercise):
+        """The compiled answer key of `exercise`, compiling it on first use or after an edit."""
+        source = (exercise.exercise_type, exercise.correct_answer, exercise.options)
+        with self._lock:
+            entry = self._entries.get(exercise.exercise_id)
+            if entry is not None and entry[0] == source:
+                self._entries.move_to_end(exercise.exercise_id)
+                return entry[1]
+
+        from app.utils.grading import GRADERS
+
+        key = GRADERS[exercise.exercise_type].compile(exercise.correct_answer, exercise.options)
+        with self._lock:
+            self._entries[exercise.exercise_id] = (source, key)
+            self._entries.move_to_end(exercise.exercise_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return key
+
+    def grade(self, exercise, answer):
+        """Grades `answer` against `exercise`'s key. Raises ValueError if the answer has the wrong shape."""
+        from app.utils.grading import GRADERS
+
+        return GRADERS[exercise.exercise_type].grade(self.compiled(exercise), answer)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,8 +1,8 @@
 from functools import wraps
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 from flask import jsonify
-from app.models.user import User, UserRole # Ensure UserRole is imported
+from app.models.user import UserRole # Ensure UserRole is imported
 from app.utils.exceptions import ForbiddenError # Import the new exception
+from app.utils.principal import get_current_principal
 
 def role_required(required_roles):
     """
@@ -15,17 +15,20 @@ def role_required(required_roles):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request() # Ensure JWT is present and valid
-            user_id = get_jwt_identity()
-            current_user = User.query.get(user_id)
+            # Ensures the JWT is present and valid, and reuses the user loaded for this request
+            principal = get_current_principal()
 
-            if not current_user:
+            if not principal:
                 # This case should ideally be rare if JWT identity is valid
                 # and user_lookup_loader is working correctly.
                 return jsonify({"message": "User not found for the provided token."}), 404
             
-            # Check if the current user's role is in the list of required roles
-            if current_user.role not in required_roles:
+            if not principal.is_active:
+                raise ForbiddenError("This account has been deactivated.")
+
+            # Check if the current user's role is in the list of required roles.
+            # In JWT_ROLE_CLAIMS_ENABLED mode the role comes from the token, with no database access.
+            if principal.role not in required_roles:
                 raise ForbiddenError("You do not have the necessary permissions to access this resource.")
             
             return fn(*args, **kwargs)
@@ -39,3 +39,25 @@ class ForbiddenError(AuthError):
     """Exception raised when a user does not have the necessary permissions."""
     def __init__(self, message="You do not have permission to access this resource."):
         super().__init__(message, status_code=403)
+
+class ServiceBusy(AuthError):
+    """Exception raised when a bounded worker pool is saturated and the request should be retried later."""
+    def __init__(self, message="The server is busy. Please try again shortly.", retry_after=1):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=503)
+
+class ImportTooLarge(AuthError):
+    """Exception raised when an upload is too big to be processed within one request."""
+    def __init__(self, message="This file is too large to import here."):
+        super().__init__(message, status_code=413)
+
+class EditConflict(AuthError):
+    """Exception raised when a write was based on a version of a resource that has since changed."""
+    def __init__(self, message="The course was changed by someone else. Reload it and try again."):
+        super().__init__(message, status_code=409)
+
+class TooManyRequests(AuthError):
+    """Exception raised when a client exceeds a rate limit."""
+    def __init__(self, message="Too many attempts. Please try again later.", retry_after=60):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=429)
@@ -0,0 +1,34 @@
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+def parse_fields(value, schema):
+    """
+    Parses a `?fields=a,b,c` query value against the fields `schema` can dump.
+    Returns a tuple of field names, or None when all fields are wanted.
+    Raises ValueError naming any unknown field.
+    """
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    if not fields:
+        return None
+    unknown = [name for name in fields if name not in schema.fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(schema.fields)}")
+    return fields
+
+def load_only_fields(model, fields, *required):
+    """
+    A `load_only` option for the columns of `model` behind the requested `fields`
+    plus any `required` column attributes, so every other column is deferred and
+    never read from the database. Relationship fields are left to the caller.
+    """
+    columns = inspect(model).column_attrs
+    attributes = [getattr(model, name) for name in fields if name in columns]
+    return load_only(*attributes, *required)
+
+def dump_schema(schema, fields):
+    """`schema` itself, or a copy of it restricted to `fields`."""
+    if fields is None:
+        return schema
+    return type(schema)(many=schema.many, only=fields)
@@ -0,0 +1,177 @@
+import json
+import unicodedata
+from collections import namedtuple
+
+from app.models.exercise import ExerciseType
+
+# Outcome of grading one answer: `fraction` (0-1) of the points earned, and the feedback shown.
+Grade = namedtuple('Grade', ['is_correct', 'fraction', 'feedback'])
+
+# Typographic quotes and dashes that NFKC leaves alone but students type either way.
+_TYPOGRAPHY = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201b': "'", '\u2032': "'",
+    '\u201c': '"', '\u201d': '"', '\u2033': '"',
+    '\u2013': '-', '\u2014': '-', '\u2212': '-',
+})
+
+# Separates blanks when a multi-blank answer is submitted as one string: "went; had".
+BLANK_SEPARATOR = ';'
+
+def normalize(text):
+    """NFKC, plain quotes and dashes, case-folded, whitespace collapsed."""
+    text = unicodedata.normalize('NFKC', str(text)).translate(_TYPOGRAPHY)
+    return ' '.join(text.casefold().split())
+
+def normalize_loose(text):
+    """normalize(), ignoring punctuation too; for transcribed speech."""
+    text = ''.join(' ' if unicodedata.category(ch).startswith('P') else ch for ch in normalize(text))
+    return ' '.join(text.split())
+
+def _parse(correct_answer):
+    """The answer key as JSON if it is a JSON list or object, else the text itself."""
+    if isinstance(correct_answer, str) and correct_answer.strip()[:1] in ('[', '{'):
+        try:
+            return json.loads(correct_answer)
+        except ValueError:
+            pass
+    return correct_answer
+
+def _alternatives(value, norm):
+    """
+    The normalized accepted answers in one key entry: a single answer, or a JSON list of
+    alternatives (["colour", "color"]). Text is never split, so keys written before
+    alternatives existed keep grading as they did.
+    """
+    values = value if isinstance(value, list) else [value]
+    return frozenset(norm(item) for item in values if item is not None and norm(item))
+
+def _display(value):
+    """The first accepted answer, as written by the author, for feedback."""
+    first = value[0] if isinstance(value, list) and value else value
+    return str(first).strip() if first is not None else ''
+
+def _feedback(correct, total, display):
+    if correct == total:
+        return "Correct!"
+    verdict = f"Partly correct ({correct} of {total})." if correct else "Incorrect."
+    return f"{verdict} The correct answer is: {display}" if display else verdict
+
+def _is_text(answer):
+    return isinstance(answer, (str, int, float)) and not isinstance(answer, bool)
+
+# Compiled keys. `display` is the expected answer as shown in feedback.
+TextKey = namedtuple('TextKey', ['accepted', 'display'])
+BlanksKey = namedtuple('BlanksKey', ['blanks', 'display'])
+PairsKey = namedtuple('PairsKey', ['pairs', 'display'])
+
+class TextGrader:
+    """
+    One answer; a JSON list key ('["colour", "color"]') accepts any of its entries.
+    `loose` also ignores punctuation, for transcriptions.
+    """
+
+    def __init__(self, loose=False):
+        self.norm = normalize_loose if loose else normalize
+
+    def compile(self, correct_answer, options):
+        key = _parse(correct_answer)
+        return TextKey(_alternatives(key, self.norm), _display(key))
+
+    def grade(self, key, answer):
+        if not _is_text(answer):
+            raise ValueError("The answer must be text.")
+        correct = int(self.norm(answer) in key.accepted)
+        return Grade(bool(correct), float(correct), _feedback(correct, 1, key.display))
+
+class ChoiceGrader(TextGrader):
+    """
+    Multiple choice, `options` mapping labels to choices ({"A": "run", "B": "ran"}). The key
+    may name the label or the choice; either is accepted in the answer.
+    """
+
+    def compile(self, correct_answer, options):
+        key = super().compile(correct_answer, options)
+        if not isinstance(options, dict):
+            return key
+        accepted = set(key.accepted)
+        display = key.display
+        for label, choice in options.items():
+            if normalize(label) in key.accepted or normalize(choice) in key.accepted:
+                accepted.update((normalize(label), normalize(choice)))
+                if normalize(label) == normalize(key.display):
+                    display = str(choice)
+        return TextKey(frozenset(accepted), display)
+
+class BlanksGrader:
+    """
+    One or more blanks. A JSON list key has one entry per blank ('["went", ["had", "\'d"]]'),
+    each an answer or a list of alternatives; any other key is a single blank. Answers are a list
+    with one entry per blank, or one string with blanks separated by ';'. Each blank
+    earns its share of the points.
+    """
+
+    def compile(self, correct_answer, options):
+        key = _parse(correct_answer)
+        entries = key if isinstance(key, list) and key else [key]
+        blanks = tuple(_alternatives(entry, normalize) for entry in entries)
+        return BlanksKey(blanks, ', '.join(_display(entry) for entry in entries))
+
+    def grade(self, key, answer):
+        if _is_text(answer):
+            answer = str(answer).split(BLANK_SEPARATOR) if len(key.blanks) > 1 else [answer]
+        if not isinstance(answer, list) or not all(_is_text(item) or item is None for item in answer):
+            raise ValueError("The answer must be text or a list with one answer per blank.")
+        correct = sum(
+            1 for accepted, given in zip(key.blanks, answer)
+            if given is not None and normalize(given) in accepted
+        )
+        total = len(key.blanks)
+        return Grade(correct == total, correct / total, _feedback(correct, total, key.display))
+
+class PairsGrader:
+    """
+    Matching and vocabulary items: each prompt maps to its answer or a list of
+    alternatives ({"dog": "perro", "cat": ["gato", "minino"]}). The pairs come from a
+    JSON object key, else from `options["pairs"]`; any other `options` are the choices
+    shown to students ({"A": "dog", "B": "cat"}), never pairs. Without pairs the
+    exercise is a single answer, graded like multiple choice. Answers map prompts to answers, as an object or
+    a list of [prompt, answer] pairs. Each pair earns its share of the points.
+    """
+
+    def __init__(self):
+        self.text = ChoiceGrader()
+
+    def compile(self, correct_answer, options):
+        key = _parse(correct_answer)
+        if not isinstance(key, dict):
+            key = options.get('pairs') if isinstance(options, dict) else None
+        if not isinstance(key, dict) or not key:
+            return self.text.compile(correct_answer, options)
+        pairs = {normalize(prompt): _alternatives(value, normalize) for prompt, value in key.items()}
+        display = ', '.join(f"{prompt} = {_display(value)}" for prompt, value in key.items())
+        return PairsKey(pairs, display)
+
+    def grade(self, key, answer):
+        if isinstance(key, TextKey):
+            return self.text.grade(key, answer)
+        if isinstance(answer, list) and all(isinstance(pair, list) and len(pair) == 2 for pair in answer):
+            answer = dict((str(prompt), value) for prompt, value in answer)
+        if not isinstance(answer, dict) or not all(_is_text(value) or value is None for value in answer.values()):
+            raise ValueError("The answer must map each item to its match.")
+        given = {normalize(prompt): value for prompt, value in answer.items()}
+        correct = sum(
+            1 for prompt, accepted in key.pairs.items()
+            if given.get(prompt) is not None and normalize(given[prompt]) in accepted
+        )
+        total = len(key.pairs)
+        return Grade(correct == total, correct / total, _feedback(correct, total, key.display))
+
+GRADERS = {
+    ExerciseType.MULTIPLE_CHOICE: ChoiceGrader(),
+    ExerciseType.FILL_IN_THE_BLANKS: BlanksGrader(),
+    ExerciseType.GRAMMAR_DRILL: BlanksGrader(),
+    ExerciseType.MATCHING: PairsGrader(),
+    ExerciseType.VOCABULARY_GAME: PairsGrader(),
+    ExerciseType.LISTENING: TextGrader(loose=True),
+    ExerciseType.SPEAKING: TextGrader(loose=True),
+}
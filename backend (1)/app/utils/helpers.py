@@ -1,31 +1,81 @@
+import hashlib
 import os
-import uuid
+import tempfile
+from collections import namedtuple
 from werkzeug.utils import secure_filename
 from flask import current_app
 
-def save_file(file):
-    """
-    Saves an uploaded file to the UPLOAD_FOLDER with a secure, unique name.
-    Returns the relative URL path to the saved file.
-    """
-    # Check if the file has an allowed extension
-    filename = secure_filename(file.filename)
+# Result of save_file: `url` as stored in content_url, the SHA-256 hex digest and the size in bytes.
+StoredFile = namedtuple('StoredFile', ['url', 'content_hash', 'size'])
+
+def upload_extension(filename):
+    """The lower-cased extension of an upload's file name. Raises ValueError unless it is in ALLOWED_EXTENSIONS."""
+    filename = secure_filename(filename or '')
     if '.' not in filename or \
        filename.rsplit('.', 1)[1].lower() not in current_app.config['ALLOWED_EXTENSIONS']:
         raise ValueError("File type not allowed.")
+    return filename.rsplit('.', 1)[1].lower()
+
+def _stream_to_storage(stream, name_for, before_store=None):
+    """
+    Copies `stream` in UPLOAD_CHUNK_SIZE chunks to a temporary file, hashing it and
+    enforcing MAX_UPLOAD_SIZE, then stores it as `name_for(content_hash)`. With
+    `before_store`, calls it with (name, content_hash, size) just before storing.
+    Returns (name, content_hash, size).
+    """
+    from app import storage
 
-    # Generate a unique filename to prevent overwrites and conflicts
-    # Format: <uuid>.<extension>
-    extension = filename.rsplit('.', 1)[1].lower()
-    unique_filename = f"{uuid.uuid4()}.{extension}"
+    max_size = current_app.config['MAX_UPLOAD_SIZE']
+    chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+    digest = hashlib.sha256()
+    size = 0
 
-    # Ensure the upload directory exists
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    os.makedirs(upload_folder, exist_ok=True)
+    # Stream into a temporary file; for local storage it sits next to the final location, so storing is a rename.
+    os.makedirs(storage.scratch_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=storage.scratch_dir, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(f"File is too large. The limit is {max_size // (1024 * 1024)} MB.")
+                digest.update(chunk)
+                temp_file.write(chunk)
 
-    # Save the file
-    file_path = os.path.join(upload_folder, unique_filename)
-    file.save(file_path)
+        content_hash = digest.hexdigest()
+        name = name_for(content_hash)
+        if before_store is not None:
+            before_store(name, content_hash, size)
+        # Replacing an existing copy is harmless (same bytes) and makes sure the file
+        # exists even if a cleanup removed the previous copy meanwhile.
+        storage.put_file(temp_path, name)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return name, content_hash, size
+
+def save_file(file, reserve=None):
+    """
+    Streams an uploaded file into storage (see utils/storage.py) in chunks, hashing it
+    on the way, and stores it under its content hash so identical uploads share one file.
+    The MAX_UPLOAD_SIZE cap is enforced while streaming.
+    Returns a StoredFile; reference counting is up to the caller (see MediaService).
+    `reserve`, if given, is called with the StoredFile before the file is written, so
+    the caller can take its reference first (see ContentService.add_content_to_course).
+    """
+    extension = upload_extension(file.filename)
+    before_store = None
+    if reserve is not None:
+        before_store = lambda name, content_hash, size: reserve(StoredFile(f"uploads/{name}", content_hash, size))
+    name, content_hash, size = _stream_to_storage(file.stream, lambda digest: f"{digest}.{extension}", before_store)
 
     # Return the URL path for storage in the database
-    return f"uploads/{unique_filename}"
+    return StoredFile(f"uploads/{name}", content_hash, size)
+
+def save_stream_as(stream, name):
+    """Streams a request body into storage as `name`, under the same size cap as save_file. Returns its size."""
+    return _stream_to_storage(stream, lambda digest: name)[2]
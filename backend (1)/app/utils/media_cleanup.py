@@ -0,0 +1,175 @@
+import os
+import queue
+import threading
+import time
+
+class MediaCleanup:
+    """
+    Deletes uploaded files on a background thread once their reference count
+    (see MediaService) has dropped to zero, so removing a course with many
+    lessons does not wait on the disk. Callers queue the URLs MediaService.release
+    returned once the delete is committed. The worker re-checks each count, so a
+    file that was uploaded again in the meantime is kept.
+
+    The worker is per process and started lazily, so it is never shared across a
+    gunicorn fork. With MEDIA_CLEANUP_ASYNC = False, or when the queue is full,
+    files are removed inline. Files still queued when the process exits are left
+    on disk.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.run_async = True
+        self.batch_size = 500
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.run_async = app.config.get('MEDIA_CLEANUP_ASYNC', self.run_async)
+        self.batch_size = app.config.get('MEDIA_CLEANUP_BATCH_SIZE', self.batch_size)
+        self._queue = queue.Queue(maxsize=app.config.get('MEDIA_CLEANUP_QUEUE_SIZE', 100))
+
+    def schedule(self, urls):
+        """Queues the files behind `urls` for removal. Call after the delete has been committed."""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return
+        if self.run_async:
+            self._ensure_worker()
+            try:
+                self._queue.put_nowait(urls)
+                return
+            except queue.Full:
+                self.app.logger.warning("Media cleanup queue is full; removing %d files inline.", len(urls))
+        self.remove_unreferenced(urls)
+
+    def join(self):
+        """Blocks until every queued file has been handled."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._thread = threading.Thread(target=self._work, name='media-cleanup', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _work(self):
+        while True:
+            urls = self._queue.get()
+            try:
+                with self.app.app_context():
+                    self.remove_unreferenced(urls)
+            except Exception as e:
+                self.app.logger.error(f"Media cleanup failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def remove_unreferenced(self, urls):
+        """
+        Removes the uploaded files behind `urls` whose reference count is zero,
+        together with their media_files rows, committing every MEDIA_CLEANUP_BATCH_SIZE
+        files. Returns the number of files removed.
+        """
+        from app import db, storage
+        from app.models.media import MediaFile
+
+        removed = 0
+        for start in range(0, len(urls), self.batch_size):
+            batch = urls[start:start + self.batch_size]
+            # The row is deleted only while nothing references it, and the delete stays
+            # uncommitted until the file is gone. A concurrent upload of the same bytes
+            # takes its reference (MediaService.acquire) before writing the file, so it
+            # either keeps the row, and the file, or waits on the deleted row and writes
+            # the file again after it has been removed here.
+            unreferenced = [url for url in batch if MediaFile.query.filter(
+                MediaFile.url == url, MediaFile.ref_count <= 0
+            ).delete(synchronize_session=False)]
+            for url in unreferenced:
+                # Derived renditions and thumbnails are named '<file>.<variant>.<ext>'.
+                try:
+                    removed += storage.delete(url, derived=True)
+                except Exception as e:
+                    self.app.logger.warning(f"Error deleting file {url}: {e}")
+            db.session.commit()
+        return removed
+
+    def sweep(self, grace_period, dry_run=False):
+        """
+        Mark-and-sweep over the stored uploads, for files the reference counts lost track
+        of: uploads whose request failed, files left by crashes or by older releases.
+        Yields (name, size) for every file no course content, exercise or course image
+        uses and that is older than `grace_period` (a timedelta), removing it unless
+        `dry_run`. Storage is listed lazily and checked MEDIA_CLEANUP_BATCH_SIZE files
+        per query, so memory does not grow with the number of uploads.
+
+        The grace period covers uploads whose content row has not been committed yet;
+        re-uploading a file refreshes its mtime.
+        """
+        from app import storage
+
+        cutoff = time.time() - grace_period.total_seconds()
+        batch = []
+        for name, size, mtime in storage.scan():
+            if mtime > cutoff:
+                continue
+            batch.append((name, size))
+            if len(batch) >= self.batch_size:
+                yield from self._sweep_batch(batch, dry_run)
+                batch = []
+        if batch:
+            yield from self._sweep_batch(batch, dry_run)
+
+    def _sweep_batch(self, batch, dry_run):
+        from app import db, storage
+        from app.models.course import Course
+        from app.models.course_content import CourseContent
+        from app.models.exercise import Exercise
+        from app.models.media import MediaFile
+
+        # Derived files ('<file>.<variant>.<ext>') live as long as their source. Temporary
+        # '.upload-*' and '.processing-*' files are never referenced, so they always go.
+        # A name is checked as-is too, in case an older upload had dots of its own.
+        candidates = {
+            name: {f"uploads/{name}", f"uploads/{'.'.join(name.split('.')[:2])}"}
+            for name, _ in batch if not name.startswith('.')
+        }
+        urls = list(set().union(*candidates.values()))
+        referenced = set()
+        for column in (CourseContent.content_url, Exercise.audio_url, Course.course_image_url):
+            referenced.update(url for (url,) in db.session.query(column).filter(column.in_(urls)).distinct())
+        orphans = [(name, size) for name, size in batch if not candidates.get(name, set()) & referenced]
+        if dry_run or not orphans:
+            db.session.rollback()
+            return orphans
+
+        # As in remove_unreferenced, rows go only while nothing references them, and the
+        # delete is committed after the files are gone. A row left after the delete means
+        # an upload of the same bytes took a reference after the listing, before its content
+        # row was committed: that file stays. Reading the rows with a lock makes any later
+        # upload wait for the commit, and so write its file again after it was removed.
+        orphan_urls = [f"uploads/{name}" for name, _ in orphans]
+        MediaFile.query.filter(
+            MediaFile.url.in_(orphan_urls), MediaFile.ref_count <= 0
+        ).delete(synchronize_session=False)
+        in_use = {
+            url for (url,) in db.session.query(MediaFile.url).filter(MediaFile.url.in_(orphan_urls)).with_for_update()
+        }
+        removed = []
+        for name, size in orphans:
+            if f"uploads/{name}" in in_use:
+                continue
+            try:
+                if storage.delete(name):
+                    removed.append((name, size))
+            except Exception as e:
+                self.app.logger.warning(f"Error deleting file {name}: {e}")
+        db.session.commit()
+        return removed
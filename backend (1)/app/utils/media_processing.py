@@ -0,0 +1,240 @@
+import array
+import multiprocessing
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from app.utils.storage import make_driver, storage_settings
+
+# Samples per second decoded for waveform peaks, and samples folded into each raw peak.
+WAVEFORM_SAMPLE_RATE = 8000
+WAVEFORM_WINDOW = 80
+
+def _ffmpeg(settings, *args, **kwargs):
+    command = [settings['ffmpeg'], '-hide_banner', '-loglevel', 'error', '-nostdin', '-y', *args]
+    return subprocess.run(command, check=True, capture_output=True, timeout=settings['timeout'], **kwargs)
+
+def _derive(source, variant, extension, build):
+    """
+    Stores the derived file `<name>.<variant>.<extension>` built by `build(output_path)`
+    unless it already exists (identical uploads share their derived files). Returns its name.
+    """
+    target = f"{source.name}.{variant}.{extension}"
+    if not source.store.exists(target):
+        # Temporary name keeps the extension, which ffmpeg uses to pick the output format.
+        temp_path = os.path.join(source.store.scratch_dir, f".processing-{os.getpid()}-{target}")
+        try:
+            build(temp_path)
+            source.store.put_file(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return target
+
+class _Source:
+    """An upload being processed: its name, the storage driver holding it and a local copy to read."""
+
+    def __init__(self, name, store, path):
+        self.name = name
+        self.store = store
+        self.path = path
+
+def _video_assets(source, settings):
+    source_path = source.path
+    height = settings['video_height']
+    rendition = _derive(source, f"{height}p", 'mp4', lambda out: _ffmpeg(
+        settings, '-i', source_path,
+        '-vf', f"scale=-2:'min({height},ih)'",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-b:v', settings['video_bitrate'],
+        '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart', out
+    ))
+
+    def thumbnail(out):
+        # One second in skips black lead-in frames; very short clips fall back to the first frame.
+        _ffmpeg(settings, '-ss', '1', '-i', source_path, '-frames:v', '1', '-vf', f"scale={settings['thumbnail_width']}:-2", out)
+        if not os.path.exists(out):
+            _ffmpeg(settings, '-i', source_path, '-frames:v', '1', '-vf', f"scale={settings['thumbnail_width']}:-2", out)
+
+    return {
+        'renditions': [{'name': rendition, 'height': height, 'bitrate': settings['video_bitrate']}],
+        'thumbnail': _derive(source, 'thumb', 'jpg', thumbnail),
+    }
+
+def _waveform(source_path, settings):
+    """Peak amplitude (0-1) of `waveform_peaks` equal slices of the audio, plus its duration in seconds."""
+    process = subprocess.Popen(
+        [settings['ffmpeg'], '-hide_banner', '-loglevel', 'error', '-nostdin', '-i', source_path,
+         '-ac', '1', '-ar', str(WAVEFORM_SAMPLE_RATE), '-f', 's16le', '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    # Decode in chunks, keeping one peak per window so memory grows with duration / WAVEFORM_WINDOW.
+    window_peaks = array.array('H')
+    total_samples = 0
+    leftover = b''
+    try:
+        while True:
+            chunk = process.stdout.read(WAVEFORM_WINDOW * 2 * 512)
+            if not chunk:
+                break
+            chunk = leftover + chunk
+            usable = len(chunk) - len(chunk) % (WAVEFORM_WINDOW * 2)
+            leftover = chunk[usable:]
+            samples = array.array('h', chunk[:usable])
+            total_samples += len(samples)
+            for start in range(0, len(samples), WAVEFORM_WINDOW):
+                window = samples[start:start + WAVEFORM_WINDOW]
+                window_peaks.append(max(max(window), -min(window)))
+        process.wait(timeout=settings['timeout'])
+    finally:
+        if process.poll() is None:
+            process.kill()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {os.path.basename(source_path)}")
+
+    count = settings['waveform_peaks']
+    if len(window_peaks) > count:
+        step = len(window_peaks) / count
+        window_peaks = [max(window_peaks[int(i * step):int((i + 1) * step)] or [0]) for i in range(count)]
+    return {
+        'peaks': [round(min(peak, 32767) / 32767, 3) for peak in window_peaks],
+        'duration': round(total_samples / WAVEFORM_SAMPLE_RATE, 2),
+    }
+
+def _audio_assets(source, settings):
+    bitrate = settings['audio_bitrate']
+    rendition = _derive(source, bitrate, 'mp3', lambda out: _ffmpeg(
+        settings, '-i', source.path, '-vn', '-ac', '1', '-c:a', 'libmp3lame', '-b:a', bitrate, out
+    ))
+    return {
+        'renditions': [{'name': rendition, 'bitrate': bitrate}],
+        'waveform': _waveform(source.path, settings),
+    }
+
+def _image_assets(source, settings):
+    width = settings['thumbnail_width']
+    return {
+        'thumbnail': _derive(source, 'thumb', 'jpg', lambda out: _ffmpeg(
+            settings, '-i', source.path, '-frames:v', '1', '-vf', f"scale='min({width},iw)':-2", out
+        )),
+    }
+
+BUILDERS = {
+    'video': _video_assets,
+    'audio': _audio_assets,
+    'image': _image_assets,
+}
+
+def process_media(kind, name, settings):
+    """
+    Builds the derived assets of the uploaded file `name`. Runs in a pool worker, so it
+    only touches storage, through a driver of its own. Names in the result are storage names.
+    """
+    store = make_driver(settings['storage'])
+    with store.fetch(name) as path:
+        return BUILDERS[kind](_Source(name, store, path), settings)
+
+def _to_urls(assets):
+    """Turns derived file names into content URLs ('uploads/<name>')."""
+    for rendition in assets.get('renditions', []):
+        rendition['url'] = f"uploads/{rendition.pop('name')}"
+    if 'thumbnail' in assets:
+        assets['thumbnail'] = f"uploads/{assets['thumbnail']}"
+    return assets
+
+class MediaProcessor:
+    """
+    Builds lower-bitrate renditions, thumbnails and waveform peaks for uploaded
+    video, audio and image lessons on a process pool, after the upload has been
+    committed. Results are recorded on every CourseContent row using the file.
+
+    Needs ffmpeg; without it, or with MEDIA_PROCESSING_WORKERS = 0, uploads are
+    stored as they are. The pool is per worker process and created lazily, so it
+    is never shared across a gunicorn fork. Jobs still queued when the process
+    exits stay pending; `flask process-media` picks them up.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.workers = 0
+        self.settings = {}
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        ffmpeg = app.config.get('MEDIA_FFMPEG_PATH') or shutil.which('ffmpeg')
+        self.workers = app.config.get('MEDIA_PROCESSING_WORKERS', 1) if ffmpeg else 0
+        self.settings = {
+            'ffmpeg': ffmpeg,
+            'timeout': app.config.get('MEDIA_PROCESSING_TIMEOUT', 1800),
+            'video_height': app.config.get('MEDIA_VIDEO_RENDITION_HEIGHT', 480),
+            'video_bitrate': app.config.get('MEDIA_VIDEO_RENDITION_BITRATE', '800k'),
+            'audio_bitrate': app.config.get('MEDIA_AUDIO_RENDITION_BITRATE', '64k'),
+            'thumbnail_width': app.config.get('MEDIA_THUMBNAIL_WIDTH', 320),
+            'waveform_peaks': app.config.get('MEDIA_WAVEFORM_PEAKS', 1000),
+            'storage': storage_settings(app.config),
+        }
+
+    @property
+    def enabled(self):
+        return bool(self.workers)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Workers come from a forkserver so they are never forked from a multi-threaded request worker.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('forkserver')
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, content_url, kind):
+        """Queues processing of the file at `content_url`. Call after the content row has been committed."""
+        future = self._get_executor().submit(process_media, kind, os.path.basename(content_url), self.settings)
+        future.add_done_callback(lambda done: self._record_result(content_url, done))
+
+    def process_now(self, content_url, kind):
+        """Processes the file at `content_url` in this process and records the result."""
+        try:
+            assets, error = process_media(kind, os.path.basename(content_url), self.settings), None
+        except Exception as e:
+            assets, error = None, e
+        self.record(content_url, assets, error)
+        return error is None
+
+    def _record_result(self, content_url, future):
+        # Runs on the pool's result thread, outside any request.
+        error = future.exception()
+        with self.app.app_context():
+            self.record(content_url, None if error else future.result(), error)
+
+    def record(self, content_url, assets, error):
+        """Stores the outcome on every pending content row using the file."""
+        from app import db
+        from app.models.course_content import CourseContent, ProcessingStatus
+
+        if error is not None:
+            self.app.logger.error(f"Media processing failed for {content_url}: {error}")
+            if isinstance(error, subprocess.CalledProcessError):
+                message = (error.stderr or b'').decode(errors='replace').strip() or str(error)
+            else:
+                message = str(error)
+            values = {'processing_status': ProcessingStatus.FAILED, 'processing_error': message[:1000]}
+        else:
+            values = {'processing_status': ProcessingStatus.READY, 'processing_error': None, 'derived_assets': _to_urls(assets)}
+
+        try:
+            CourseContent.query.filter(
+                CourseContent.content_url == content_url,
+                CourseContent.processing_status == ProcessingStatus.PENDING
+            ).update(values, synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+def encode_cursor(data):
+    """Encodes a dict of keyset values into an opaque, URL-safe cursor string."""
+    def default(value):
+        if isinstance(value, datetime):
+            return {'$dt': value.isoformat()}
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+    raw = json.dumps(data, default=default, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodes a cursor produced by `encode_cursor`. Raises ValueError if it is malformed."""
+    def object_hook(obj):
+        if set(obj) == {'$dt'}:
+            return datetime.fromisoformat(obj['$dt'])
+        return obj
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw, object_hook=object_hook)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor.")
+    return data
+
+def parse_page_size(value, default, maximum):
+    """Parses a `?limit=` query value, clamping it to [1, maximum]."""
+    if value in (None, ''):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer.")
+    return max(1, min(size, maximum))
+
+def keyset_after(column, tie_column, value, tie_value, descending):
+    """
+    Filter selecting rows strictly after (value, tie_value) in (column, tie_column) order.
+    Written as OR/AND rather than a row-value comparison so every backend can use
+    a composite index on (column, tie_column).
+    """
+    if descending:
+        return or_(column < value, and_(column == value, tie_column < tie_value))
+    return or_(column > value, and_(column == value, tie_column > tie_value))
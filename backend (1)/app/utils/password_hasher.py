@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.exceptions import ServiceBusy
+
+def _hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+def _check_password(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+class PasswordHasher:
+    """
+    Runs password hashing on a small, bounded process pool so CPU-heavy hashes
+    do not compete with request handling. When every slot (running + queued) is
+    taken, callers get a ServiceBusy (503) instead of waiting in line.
+
+    The pool is per worker process and created lazily, so it is never shared
+    across a gunicorn fork. With PASSWORD_HASH_WORKERS = 0 hashing runs inline.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'pbkdf2:sha256:600000'
+        self.workers = 0
+        self.timeout = 10
+        self.retry_after = 1
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', self.retry_after)
+        queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', 8)
+        # Slots bound the number of hashes running or waiting on the pool at once.
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size) if self.workers else None
+
+    @staticmethod
+    def create_pool(max_workers):
+        """
+        Creates a process pool for hashing. Workers come from a forkserver so they are never
+        forked from a multi-threaded request worker, which can deadlock on inherited locks.
+        """
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('forkserver'))
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = self.create_pool(self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise ServiceBusy(retry_after=self.retry_after)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is freed when the job finishes, not when this caller stops waiting:
+        # a hash still running after a timeout keeps its process busy, so it keeps its slot.
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServiceBusy(retry_after=self.retry_after)
+
+    def hash(self, password):
+        """Hashes `password` with the configured method and cost."""
+        return self._run(_hash_password, password, self.method)
+
+    def verify(self, pwhash, password):
+        """Checks `password` against a stored hash of any supported method."""
+        return self._run(_check_password, pwhash, password)
+
+    def hash_many(self, passwords, executor=None):
+        """
+        Hashes a batch of passwords, in parallel when `executor` is given.
+        Bulk jobs pass their own executor so they never take the request pool's slots.
+        """
+        methods = [self.method] * len(passwords)
+        if executor is None:
+            return list(map(_hash_password, passwords, methods))
+        return list(executor.map(_hash_password, passwords, methods, chunksize=16))
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` was not produced with the currently configured method and cost."""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,61 @@
+from flask import g, has_request_context
+from flask_jwt_extended import verify_jwt_in_request
+from app.models.user import User, UserRole
+
+class Principal:
+    """
+    The authenticated caller of the current request.
+    Resolved once per request and stored on `flask.g` so decorators, routes and
+    services share a single User lookup.
+    """
+
+    def __init__(self, user_id, role, is_active=True, user=None):
+        self.user_id = int(user_id)
+        self.role = role
+        self.is_active = is_active
+        self._user = user
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.user_id, user.role, is_active=user.is_active, user=user)
+
+    @classmethod
+    def from_claims(cls, jwt_data):
+        """Builds a principal from the role and status claims of a verified access token."""
+        return cls(jwt_data['sub'], UserRole(jwt_data['role']), is_active=jwt_data.get('active', True))
+
+    @staticmethod
+    def claims_for(user):
+        """The additional access-token claims that `from_claims` reads back."""
+        return {'role': user.role.value, 'active': user.is_active}
+
+    @property
+    def user(self):
+        """The full User row, loaded on first access if it was not already."""
+        if self._user is None:
+            self._user = User.query.get(self.user_id)
+        return self._user
+
+    def __repr__(self):
+        return f'<Principal {self.user_id} ({self.role.value})>'
+
+def get_current_principal():
+    """
+    Returns the Principal for the current request, or None if the token's user no longer exists.
+    The JWT is verified and the principal resolved by `user_lookup_loader` only on the first call.
+    """
+    if 'principal' not in g:
+        # Not behind @jwt_required yet; verify once, which runs the loader that sets g.principal.
+        verify_jwt_in_request()
+    return g.principal
+
+def get_user(user_id):
+    """
+    Returns the User for `user_id`, reusing the request's principal when it refers
+    to the same user instead of querying the users table again.
+    """
+    # Only reuse a principal this request has already resolved; never verify a token here.
+    principal = g.get('principal') if has_request_context() else None
+    if principal is not None and principal.user_id == int(user_id):
+        return principal.user
+    return User.query.get(user_id)
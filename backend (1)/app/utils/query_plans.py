@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from sqlalchemy import event
+from werkzeug.exceptions import HTTPException
+
+from app import db
+from app.models.course import Course
+from app.models.course_content import ContentType, CourseContent
+from app.models.enrollment import Enrollment
+from app.models.exercise import Exercise, ExerciseType
+from app.models.media import MediaFile
+from app.models.progress import ProgressTracking
+from app.models.user import User, UserRole
+from app.utils.exceptions import AuthError
+from app.utils.pagination import encode_cursor
+
+def _add_placeholders():
+    """
+    Adds (without committing) one course with a lesson, an exercise, a media file and an
+    enrolled student, so every lookup in hot_queries gets past its first query.
+    """
+    educator = User(email='query-plans-educator@example.invalid', password_hash='-', first_name='Query',
+                    last_name='Plans', role=UserRole.EDUCATOR)
+    student = User(email='query-plans-student@example.invalid', password_hash='-', first_name='Query',
+                   last_name='Plans', role=UserRole.STUDENT)
+    db.session.add_all([educator, student])
+    db.session.flush()
+    course = Course(title='Query plans', creator_id=educator.user_id, category='Grammar', is_published=True)
+    db.session.add(course)
+    db.session.flush()
+    media_url = 'uploads/query-plans.mp3'
+    content = CourseContent(course_id=course.id, title='Lesson', content_type=ContentType.AUDIO, content_url=media_url)
+    exercise = Exercise(course_id=course.id, title='Exercise', exercise_type=ExerciseType.LISTENING, correct_answer='-')
+    db.session.add_all([
+        content, exercise, MediaFile(url=media_url, ref_count=1),
+        Enrollment(user_id=student.user_id, course_id=course.id),
+        ProgressTracking(user_id=student.user_id, course_id=course.id),
+    ])
+    db.session.flush()
+    # Detached, so the services query for these rows instead of finding them in the session.
+    db.session.expunge_all()
+    return student, course, exercise, media_url
+
+def hot_queries(student, course, exercise, media_url):
+    """
+    The service calls behind the busiest endpoints, as (name, call) pairs. The arguments
+    are the placeholder rows from _add_placeholders.
+    """
+    from app.services.auth_service import AuthService
+    from app.services.content_service import ContentService
+    from app.services.course_service import CourseService
+    from app.services.exercise_service import ExerciseService
+    from app.services.media_service import MediaService
+
+    newest = encode_cursor({'sort': 'newest', 'value': datetime(2024, 1, 1), 'id': course.id})
+    return [
+        ('login', lambda: AuthService.login_user('query-plans-nobody@example.invalid', '-')),
+        ('session check', lambda: AuthService.get_session_jti(student.user_id)),
+        ('catalog newest', lambda: CourseService.get_all_courses()),
+        ('catalog newest, next page', lambda: CourseService.get_all_courses(cursor=newest)),
+        ('catalog popular', lambda: CourseService.get_all_courses(sort='popular')),
+        ('catalog by title', lambda: CourseService.get_all_courses(sort='title')),
+        ('catalog by category', lambda: CourseService.get_all_courses(filters={'category': 'Grammar'})),
+        ('authoring catalog, next page', lambda: CourseService.get_all_courses_for_authoring(cursor=newest)),
+        ('course bundle', lambda: CourseService.get_course_bundle(course.id, student)),
+        ('course contents', lambda: ContentService.get_content_for_course(course.id)),
+        ('course exercises', lambda: ExerciseService.get_exercises_for_course(course.id)),
+        ('exercise', lambda: ExerciseService.get_exercise_by_id(exercise.exercise_id)),
+        ('my enrollments', lambda: CourseService.get_user_enrollments(student.user_id)),
+        ('course roster', lambda: CourseService.get_course_enrollments(course.id)),
+        ('media access', lambda: MediaService.get_accessible(media_url, student)),
+    ]
+
+def capture(call):
+    """
+    Runs `call` and returns the SELECT statements it sent, with their parameters.
+    A lookup that ends in an error still reports the queries it made.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        call()
+    except (ValueError, AuthError, HTTPException):
+        pass
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+def explain(statement, parameters=()):
+    """Returns SQLite's EXPLAIN QUERY PLAN detail lines for a statement."""
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[-1] for row in rows]
+
+def service_plans():
+    """
+    Yields (name, statement, plan) for every SELECT the hot_queries calls send. They run
+    against placeholder rows that are rolled back afterwards, so the database is unchanged.
+    """
+    try:
+        placeholders = _add_placeholders()
+        for name, call in hot_queries(*placeholders):
+            for statement, parameters in capture(call):
+                yield name, statement, explain(statement, parameters)
+    finally:
+        db.session.rollback()
+
+def full_scans(plan):
+    """Plan lines that read a whole table instead of searching an index."""
+    return [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line]
@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+class MemoryRateLimitBackend:
+    """
+    In-process sliding-window log. Each worker counts separately, so the
+    effective limit is multiplied by the number of workers; it is meant as a
+    fallback when the shared store is not configured or unavailable.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        """
+        Records an attempt for `key` and returns 0 if it is within `limit` attempts
+        per `window` seconds, otherwise the number of seconds until a slot frees up.
+        Rejected attempts are not recorded.
+        """
+        now = time.monotonic()
+        with self._lock:
+            hits = self._windows.get(key)
+            if hits is None:
+                hits = self._windows[key] = deque()
+            self._windows.move_to_end(key)
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) >= limit:
+                return max(1, math.ceil(hits[0] + window - now))
+            hits.append(now)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+            return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._windows.pop(key, None)
+
+class RedisRateLimitBackend:
+    """
+    Sliding-window log kept in a redis sorted set per key, shared by all workers.
+    Falls back to an in-process window if redis cannot be reached.
+    """
+
+    def __init__(self, url, prefix='lelms:ratelimit:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND is 'redis' but the redis package is not installed.")
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.fallback = MemoryRateLimitBackend()
+
+    def hit(self, key, limit, window):
+        redis_key = f"{self.prefix}{key}"
+        now = time.time()
+        member = f"{now}:{uuid.uuid4().hex}"
+        try:
+            pipe = self._client.pipeline()
+            pipe.zremrangebyscore(redis_key, 0, now - window)
+            pipe.zadd(redis_key, {member: now})
+            pipe.zcard(redis_key)
+            pipe.zrange(redis_key, 0, 0, withscores=True)
+            pipe.expire(redis_key, math.ceil(window))
+            _, _, count, oldest, _ = pipe.execute()
+            if count > limit:
+                # Over the limit: drop this attempt again so rejected requests don't extend the window.
+                self._client.zrem(redis_key, member)
+                return max(1, math.ceil(oldest[0][1] + window - now))
+            return 0
+        except self._errors:
+            return self.fallback.hit(key, limit, window)
+
+    def reset(self, key):
+        try:
+            self._client.delete(f"{self.prefix}{key}")
+        except self._errors:
+            pass
+        self.fallback.reset(key)
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter used to reject login attempts before any
+    password hashing or database access takes place.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.limits = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'redis':
+            self.backend = RedisRateLimitBackend(app.config['RATE_LIMIT_REDIS_URL'])
+        elif backend == 'memory':
+            self.backend = MemoryRateLimitBackend()
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+        # (attempts, window in seconds) per scope
+        self.limits = {
+            'login_email': app.config.get('LOGIN_RATE_LIMIT_PER_EMAIL', (10, 300)),
+            'login_ip': app.config.get('LOGIN_RATE_LIMIT_PER_IP', (30, 60)),
+        }
+
+    def hit(self, scope, identifier):
+        """
+        Counts one attempt for `identifier` under `scope`.
+        Returns 0 if allowed, otherwise the number of seconds to wait.
+        """
+        limit, window = self.limits[scope]
+        return self.backend.hit(f"{scope}:{identifier}", limit, window)
+
+    def reset(self, scope, identifier):
+        self.backend.reset(f"{scope}:{identifier}")
@@ -0,0 +1,196 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+class MemoryResponseBackend:
+    """
+    In-process LRU of serialized responses with a per-entry TTL.
+
+    Entries are per worker, but generations are files in `generation_dir`, so a
+    bump in one worker reaches every worker on the machine on its next read.
+    Workers on other machines do not see the file: run more than one host on
+    the redis backend. If the folder cannot be used, responses are served
+    uncached.
+    """
+
+    def __init__(self, generation_dir, max_entries=1000, ttl=300):
+        self.generation_dir = generation_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _generation_path(self, namespace):
+        return os.path.join(self.generation_dir, f"{namespace}.gen")
+
+    def generation(self, namespace):
+        try:
+            with open(self._generation_path(namespace)) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError):
+            return None
+
+    def bump(self, namespace):
+        # The new generation is a timestamp, never below the old one plus one, so
+        # concurrent bumps may write the same value but never one seen before.
+        # Written to a temporary file and renamed in, so readers never see half a value.
+        try:
+            os.makedirs(self.generation_dir, exist_ok=True)
+            generation = max(time.time_ns(), (self.generation(namespace) or 0) + 1)
+            fd, tmp_path = tempfile.mkstemp(dir=self.generation_dir, prefix=f".{namespace}-")
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(generation))
+            os.replace(tmp_path, self._generation_path(namespace))
+            return generation
+        except OSError:
+            return None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        with self._lock:
+            self._entries[key] = (body, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisResponseBackend:
+    """
+    Redis-backed response cache shared by every worker. Generations are
+    redis counters, so a bump is seen by all workers on their next read.
+    If redis is unreachable, reads miss and writes are dropped.
+    """
+
+    def __init__(self, url, ttl=300, prefix='lelms:response:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND is 'redis' but the redis package is not installed.")
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def generation(self, namespace):
+        try:
+            return int(self._client.get(f"{self.prefix}gen:{namespace}") or 0)
+        except self._errors:
+            return None
+
+    def bump(self, namespace):
+        try:
+            return self._client.incr(f"{self.prefix}gen:{namespace}")
+        except self._errors:
+            return None
+
+    def get(self, key):
+        try:
+            return self._client.get(f"{self.prefix}{key}")
+        except self._errors:
+            return None
+
+    def set(self, key, body):
+        try:
+            self._client.set(f"{self.prefix}{key}", body, ex=self.ttl)
+        except self._errors:
+            pass
+
+    def clear(self):
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            if not key.startswith(f"{self.prefix}gen:".encode()):
+                self._client.delete(key)
+
+class ResponseCache:
+    """
+    Caches serialized JSON response bodies for read-mostly endpoints.
+    Entries are keyed by the namespace's current generation, so bumping the
+    generation after a write makes every older entry unreachable at once.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        ttl = app.config.get('RESPONSE_CACHE_TTL', 300)
+        if backend == 'redis':
+            self.backend = RedisResponseBackend(app.config['RESPONSE_CACHE_REDIS_URL'], ttl=ttl)
+        elif backend == 'memory':
+            self.backend = MemoryResponseBackend(
+                app.config['RESPONSE_CACHE_GENERATION_DIR'],
+                max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1000), ttl=ttl
+            )
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+
+    def _count(self, hit):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_build(self, namespace, name, params, build):
+        """
+        Returns (body, hit) for the response identified by `name` and the `params`
+        dict in `namespace`. On a miss, `build()` must return the JSON bytes to
+        serve; they are stored under the current generation.
+        """
+        generation = self.backend.generation(namespace)
+        if generation is None:
+            # Cache store unavailable: serve uncached.
+            self._count(False)
+            return build(), False
+
+        key = f"{namespace}:{generation}:{name}:{json.dumps(params, sort_keys=True, separators=(',', ':'))}"
+        body = self.backend.get(key)
+        if body is not None:
+            self._count(True)
+            return body, True
+
+        self._count(False)
+        body = build()
+        self.backend.set(key, body)
+        return body, False
+
+    def bump(self, namespace):
+        """Starts a new generation for `namespace`. Call after the write has been committed."""
+        self.backend.bump(namespace)
+
+    def stats(self):
+        """Hit and miss counters of this worker."""
+        with self._counter_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+
+    def clear(self):
+        self.backend.clear()
@@ -0,0 +1,399 @@
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from sqlalchemy import event, inspect, text
+
+# Searchable document types. The code is folded into the FTS5 rowid
+# (rowid = doc_id * 4 + code) so a document can be replaced or removed by key.
+DOC_TYPES = {'course': 1, 'lesson': 2, 'exercise': 3}
+DOC_TYPE_NAMES = {code: name for name, code in DOC_TYPES.items()}
+
+# Title matches count this many times more than body matches when ranking.
+TITLE_WEIGHT = 10.0
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def tokenize(value):
+    """Splits text into lowercase, accent-free terms, the same way the FTS5 unicode61 tokenizer does."""
+    if not value:
+        return []
+    folded = unicodedata.normalize('NFKD', value.lower())
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return [token for token in _TOKEN_RE.findall(folded) if token != '_']
+
+class Fts5SearchBackend:
+    """
+    SQLite FTS5 virtual table holding one row per course, lesson and exercise
+    (created by migration 8b3f61d0e2a4). Writes go through the caller's session
+    so they commit or roll back together with the change that caused them.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def upsert(self, doc_type, doc_id, course_id, title, body):
+        rowid = doc_id * 4 + DOC_TYPES[doc_type]
+        self.db.session.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {'rowid': rowid})
+        self.db.session.execute(
+            text("INSERT INTO search_index (rowid, course_id, title, body) VALUES (:rowid, :course_id, :title, :body)"),
+            {'rowid': rowid, 'course_id': course_id, 'title': title or '', 'body': body or ''}
+        )
+
+    def remove(self, doc_type, doc_id):
+        self.db.session.execute(
+            text("DELETE FROM search_index WHERE rowid = :rowid"),
+            {'rowid': doc_id * 4 + DOC_TYPES[doc_type]}
+        )
+
+    def search(self, terms, doc_types, limit, published_only):
+        # Each term is quoted so user input can never be read as FTS5 query syntax.
+        match = ' '.join(f'"{term}"' for term in terms)
+        codes = ', '.join(str(DOC_TYPES[doc_type]) for doc_type in doc_types)
+        visible = f"""
+            AND c.is_published = 1
+            AND NOT EXISTS (
+                SELECT 1 FROM exercise e
+                WHERE s.rowid % 4 = {DOC_TYPES['exercise']} AND e.exercise_id = s.rowid / 4 AND e.is_active = 0
+            )
+        """ if published_only else ""
+        rows = self.db.session.execute(text(f"""
+            SELECT s.rowid, bm25(search_index, 0.0, {TITLE_WEIGHT}, 1.0) AS rank
+            FROM search_index s
+            JOIN courses c ON c.id = s.course_id
+            WHERE search_index MATCH :match AND s.rowid % 4 IN ({codes}) {visible}
+            ORDER BY rank
+            LIMIT :limit
+        """), {'match': match, 'limit': limit})
+        # bm25() is lower-is-better; flip it so every backend reports higher-is-better.
+        return [(DOC_TYPE_NAMES[rowid % 4], rowid // 4, -rank) for rowid, rank in rows]
+
+    def rebuild(self):
+        session = self.db.session
+        session.execute(text("DELETE FROM search_index"))
+        session.execute(text("""
+            INSERT INTO search_index (rowid, course_id, title, body)
+            SELECT id * 4 + 1, id, title, COALESCE(description, '') || ' ' || COALESCE(category, '') FROM courses
+        """))
+        session.execute(text("""
+            INSERT INTO search_index (rowid, course_id, title, body)
+            SELECT id * 4 + 2, course_id, title, COALESCE(content_text, '') FROM course_contents
+        """))
+        session.execute(text("""
+            INSERT INTO search_index (rowid, course_id, title, body)
+            SELECT exercise_id * 4 + 3, course_id, title, COALESCE(question_text, '') FROM exercise
+        """))
+        session.commit()
+
+class MySQLFullTextBackend:
+    """
+    InnoDB FULLTEXT indexes on the source tables (created by migration 8b3f61d0e2a4).
+    MySQL maintains them itself, so the write hooks have nothing to do.
+    """
+
+    # doc_type -> (table, id column, course id column, FULLTEXT columns)
+    SOURCES = {
+        'course': ('courses', 'id', 'id', 'title, description'),
+        'lesson': ('course_contents', 'id', 'course_id', 'title, content_text'),
+        'exercise': ('exercise', 'exercise_id', 'course_id', 'title, question_text'),
+    }
+    # doc_type -> condition a document must meet for students, besides its course being published
+    VISIBLE = {
+        'exercise': 'd.is_active IS NOT FALSE',
+    }
+
+    def __init__(self, db):
+        self.db = db
+
+    def upsert(self, doc_type, doc_id, course_id, title, body):
+        pass
+
+    def remove(self, doc_type, doc_id):
+        pass
+
+    def search(self, terms, doc_types, limit, published_only):
+        # Boolean mode with a '+' on every term, so all terms must match as with the other backends.
+        against = ' '.join(f'+{term}' for term in terms)
+        selects = []
+        for doc_type in doc_types:
+            table, id_column, course_column, columns = self.SOURCES[doc_type]
+            match = f"MATCH(d.{columns.replace(', ', ', d.')}) AGAINST (:against IN BOOLEAN MODE)"
+            visible = ""
+            if published_only:
+                visible = "AND c.is_published = 1"
+                if doc_type in self.VISIBLE:
+                    visible += f" AND {self.VISIBLE[doc_type]}"
+            selects.append(f"""
+                SELECT '{doc_type}' AS doc_type, d.{id_column} AS doc_id, {match} AS score
+                FROM {table} d JOIN courses c ON c.id = d.{course_column}
+                WHERE {match} {visible}
+            """)
+        rows = self.db.session.execute(
+            text(' UNION ALL '.join(selects) + " ORDER BY score DESC LIMIT :limit"),
+            {'against': against, 'limit': limit}
+        )
+        return [(doc_type, doc_id, float(score)) for doc_type, doc_id, score in rows]
+
+    def rebuild(self):
+        pass
+
+class MemorySearchBackend:
+    """
+    Built-in inverted index with BM25 ranking, used when the database has no
+    full-text support. It is loaded from the database on first use and then
+    kept current by the write hooks, applied once their transaction commits.
+    Each worker holds its own copy, so changes made through another worker
+    only show up here when the index is reloaded after `max_age` seconds.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, db, max_age=300):
+        self.db = db
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._postings = defaultdict(dict)  # term -> {(doc_type, doc_id): weighted term frequency}
+        self._docs = {}  # (doc_type, doc_id) -> (course_id, weighted length, terms)
+        self._total_length = 0.0
+
+    def _add(self, key, course_id, title, body):
+        frequencies = defaultdict(float)
+        for term in tokenize(title):
+            frequencies[term] += TITLE_WEIGHT
+        for term in tokenize(body):
+            frequencies[term] += 1.0
+        length = sum(frequencies.values())
+        for term, frequency in frequencies.items():
+            self._postings[term][key] = frequency
+        self._docs[key] = (course_id, length, tuple(frequencies))
+        self._total_length += length
+
+    def _discard(self, key):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        _, length, terms = doc
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= length
+
+    def _is_fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age
+
+    def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+        with self._lock:
+            if not self._is_fresh():
+                self._load()
+
+    def _load(self):
+        from app.models.course import Course
+        from app.models.course_content import CourseContent
+        from app.models.exercise import Exercise
+
+        self._postings.clear()
+        self._docs.clear()
+        self._total_length = 0.0
+        session = self.db.session
+        for doc_id, title, description, category in session.query(Course.id, Course.title, Course.description, Course.category):
+            self._add(('course', doc_id), doc_id, title, f"{description or ''} {category or ''}")
+        for doc_id, course_id, title, body in session.query(CourseContent.id, CourseContent.course_id, CourseContent.title, CourseContent.content_text):
+            self._add(('lesson', doc_id), course_id, title, body)
+        for doc_id, course_id, title, body in session.query(Exercise.exercise_id, Exercise.course_id, Exercise.title, Exercise.question_text):
+            self._add(('exercise', doc_id), course_id, title, body)
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, doc_type, doc_id, course_id, title, body):
+        with self._lock:
+            # Not loaded yet: the first search reads the committed rows anyway.
+            if self._loaded_at is not None:
+                key = (doc_type, doc_id)
+                self._discard(key)
+                self._add(key, course_id, title, body)
+
+    def remove(self, doc_type, doc_id):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._discard((doc_type, doc_id))
+
+    def search(self, terms, doc_types, limit, published_only):
+        self._ensure_loaded()
+        published = None
+        hidden = set()
+        if published_only:
+            from app.models.course import Course
+            from app.models.exercise import Exercise
+            published = {course_id for (course_id,) in self.db.session.query(Course.id).filter_by(is_published=True)}
+            if 'exercise' in doc_types:
+                hidden = {
+                    ('exercise', exercise_id)
+                    for (exercise_id,) in self.db.session.query(Exercise.exercise_id).filter(Exercise.is_active.is_(False))
+                }
+
+        with self._lock:
+            if not self._docs:
+                return []
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            total = len(self._docs)
+            average_length = self._total_length / total
+            # Walk the rarest term's postings and require every other term to match too.
+            postings.sort(key=len)
+            scores = {}
+            for key in postings[0]:
+                if key[0] not in doc_types:
+                    continue
+                course_id, length, _ = self._docs[key]
+                if (published is not None and course_id not in published) or key in hidden:
+                    continue
+                score = 0.0
+                for term_postings in postings:
+                    frequency = term_postings.get(key)
+                    if frequency is None:
+                        break
+                    idf = math.log(1 + (total - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                    norm = self.K1 * (1 - self.B + self.B * length / average_length)
+                    score += idf * frequency * (self.K1 + 1) / (frequency + norm)
+                else:
+                    scores[key] = score
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(doc_type, doc_id, score) for (doc_type, doc_id), score in ranked]
+
+    def rebuild(self):
+        with self._lock:
+            self._load()
+
+class SearchIndex:
+    """
+    Full-text search over courses, lessons and exercises.
+    SEARCH_BACKEND 'auto' uses SQLite FTS5 or MySQL FULLTEXT when their
+    migration has been applied and otherwise falls back to the built-in
+    inverted index. Services call the index_* / remove* hooks from their
+    write paths, before committing and once new rows have their ids.
+    """
+
+    def __init__(self, db=None, app=None):
+        self.db = db
+        self.setting = 'auto'
+        self.max_age = 300
+        self._backend = None
+        self._listening = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.setting = app.config.get('SEARCH_BACKEND', 'auto')
+        if self.setting not in ('auto', 'fts5', 'mysql', 'memory'):
+            raise ValueError(f"Unknown SEARCH_BACKEND: {self.setting}")
+        self.max_age = app.config.get('SEARCH_INDEX_MAX_AGE', 300)
+        self._backend = None
+        if not self._listening:
+            # The in-memory index only learns about changes once they are committed.
+            event.listen(self.db.session, 'after_commit', self._after_commit)
+            event.listen(self.db.session, 'after_soft_rollback', self._after_soft_rollback)
+            self._listening = True
+
+    @property
+    def backend(self):
+        """The active backend, chosen on first use since detection needs a database connection."""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._create_backend()
+        return self._backend
+
+    def _create_backend(self):
+        setting = self.setting
+        if setting == 'auto':
+            engine = self.db.engine
+            if engine.dialect.name == 'sqlite' and inspect(engine).has_table('search_index'):
+                setting = 'fts5'
+            elif engine.dialect.name == 'mysql' and 'ft_courses_search' in {index['name'] for index in inspect(engine).get_indexes('courses')}:
+                setting = 'mysql'
+            else:
+                setting = 'memory'
+        if setting == 'fts5':
+            return Fts5SearchBackend(self.db)
+        if setting == 'mysql':
+            return MySQLFullTextBackend(self.db)
+        return MemorySearchBackend(self.db, self.max_age)
+
+    def _write(self, method, *args):
+        backend = self.backend
+        if isinstance(backend, MemorySearchBackend):
+            self.db.session.info.setdefault('search_changes', []).append((method, args))
+        else:
+            getattr(backend, method)(*args)
+
+    def _after_commit(self, session):
+        changes = session.info.pop('search_changes', None)
+        if changes and isinstance(self._backend, MemorySearchBackend):
+            for method, args in changes:
+                getattr(self._backend, method)(*args)
+
+    def _after_soft_rollback(self, session, previous_transaction):
+        if not previous_transaction.nested:
+            session.info.pop('search_changes', None)
+
+    def index_course(self, course):
+        self._write('upsert', 'course', course.id, course.id, course.title,
+                    f"{course.description or ''} {course.category or ''}")
+
+    def index_content(self, content):
+        self._write('upsert', 'lesson', content.id, content.course_id, content.title, content.content_text)
+
+    def index_exercise(self, exercise):
+        self._write('upsert', 'exercise', exercise.exercise_id, exercise.course_id, exercise.title, exercise.question_text)
+
+    def remove(self, doc_type, doc_id):
+        self._write('remove', doc_type, doc_id)
+
+    def index_course_items(self, course_id):
+        """Indexes all lessons and exercises of a course, e.g. after they were copied in bulk."""
+        from app.models.course_content import CourseContent
+        from app.models.exercise import Exercise
+
+        session = self.db.session
+        for row in session.query(CourseContent.id, CourseContent.course_id, CourseContent.title, CourseContent.content_text).filter_by(course_id=course_id):
+            self._write('upsert', 'lesson', *row)
+        for row in session.query(Exercise.exercise_id, Exercise.course_id, Exercise.title, Exercise.question_text).filter_by(course_id=course_id):
+            self._write('upsert', 'exercise', *row)
+
+    def remove_course(self, course_id):
+        """Removes a course and all of its lessons and exercises. Call before deleting the course."""
+        from app.models.course_content import CourseContent
+        from app.models.exercise import Exercise
+
+        session = self.db.session
+        for (content_id,) in session.query(CourseContent.id).filter_by(course_id=course_id):
+            self.remove('lesson', content_id)
+        for (exercise_id,) in session.query(Exercise.exercise_id).filter_by(course_id=course_id):
+            self.remove('exercise', exercise_id)
+        self.remove('course', course_id)
+
+    def search(self, query, doc_types=None, limit=20, published_only=True):
+        """
+        Returns up to `limit` (doc_type, doc_id, score) tuples matching every term
+        of `query`, best first. `published_only` hides what students may not see:
+        everything in unpublished courses, and inactive exercises. It is applied
+        before the limit, so hidden documents never crowd out visible ones.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        return self.backend.search(terms, doc_types or list(DOC_TYPES), limit, published_only)
+
+    def rebuild(self):
+        """Rebuilds the index from the source tables."""
+        self.backend.rebuild()
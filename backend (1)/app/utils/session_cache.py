@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel returned by backends on a cache miss, so that a cached "no active
+# session" (None) can be told apart from "not cached".
+MISS = object()
+
+# Backends keep a generation per user that every invalidation bumps. A loader
+# reads the generation before it queries the database, and its result is only
+# stored while the generation is unchanged, so a jti read just before a logout
+# cannot be written back over the invalidation.
+
+class MemorySessionBackend:
+    """
+    In-process LRU cache with a per-entry TTL.
+    Each worker keeps its own copy, so an invalidation made by one worker only
+    reaches the others once their entry expires. Use the redis backend when
+    revocation must take effect immediately across all workers.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # user_id -> generation of their last invalidation, bounded like the entries.
+        # Generations come from one counter; `_floor` is the newest one forgotten,
+        # so loads that began before it are refused rather than trusted.
+        self._invalidations = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return MISS
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return MISS
+            self._entries.move_to_end(user_id)
+            return value
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._counter
+
+    def set(self, user_id, jti, generation):
+        with self._lock:
+            if generation < max(self._invalidations.get(user_id, 0), self._floor):
+                return
+            self._entries[user_id] = (jti, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._counter += 1
+            self._invalidations[user_id] = self._counter
+            self._invalidations.move_to_end(user_id)
+            while len(self._invalidations) > self.max_size:
+                _, forgotten = self._invalidations.popitem(last=False)
+                self._floor = max(self._floor, forgotten)
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisSessionBackend:
+    """
+    Redis-backed cache shared by every worker, so invalidations are seen
+    by all of them immediately. Size is bounded by the TTL and by the
+    server's own eviction policy.
+    """
+    # Stored in place of a jti when the user has no active session.
+    NO_SESSION = '-'
+
+    def __init__(self, url, ttl=60, prefix='lelms:session:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_CACHE_BACKEND is 'redis' but the redis package is not installed.")
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+
+    def _key(self, user_id):
+        return f"{self.prefix}{user_id}"
+
+    def _generation_key(self, user_id):
+        return f"{self.prefix}generation:{user_id}"
+
+    def get(self, user_id):
+        value = self._client.get(self._key(user_id))
+        if value is None:
+            return MISS
+        return None if value == self.NO_SESSION else value
+
+    def generation(self, user_id):
+        return self._client.get(self._generation_key(user_id))
+
+    def set(self, user_id, jti, generation):
+        # WATCH makes the write fail if an invalidation bumps the generation in between.
+        generation_key = self._generation_key(user_id)
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(generation_key)
+                if pipe.get(generation_key) != generation:
+                    return
+                pipe.multi()
+                pipe.set(self._key(user_id), jti or self.NO_SESSION, ex=self.ttl)
+                pipe.execute()
+            except self._watch_error:
+                pass
+
+    def invalidate(self, user_id):
+        # The generation outlives any load by far; it only has to expire eventually.
+        generation_key = self._generation_key(user_id)
+        pipe = self._client.pipeline()
+        pipe.incr(generation_key)
+        pipe.expire(generation_key, 24 * 60 * 60)
+        pipe.delete(self._key(user_id))
+        pipe.execute()
+
+    def clear(self):
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+class SessionCache:
+    """
+    Caches the currently valid access-token jti of each user so the JWT
+    blocklist check does not have to query the authentication table on
+    every request.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('SESSION_CACHE_BACKEND', 'memory')
+        ttl = app.config.get('SESSION_CACHE_TTL', 60)
+        if backend == 'redis':
+            self.backend = RedisSessionBackend(app.config['SESSION_CACHE_REDIS_URL'], ttl=ttl)
+        elif backend == 'memory':
+            self.backend = MemorySessionBackend(max_size=app.config.get('SESSION_CACHE_MAX_SIZE', 10000), ttl=ttl)
+        else:
+            raise ValueError(f"Unknown SESSION_CACHE_BACKEND: {backend}")
+
+    def get_session_jti(self, user_id, loader):
+        """
+        Returns the active session jti for `user_id` (None if the user has no
+        active session). `loader` is called on a cache miss to read the value
+        from the database.
+        """
+        user_id = str(user_id)
+        jti = self.backend.get(user_id)
+        if jti is MISS:
+            generation = self.backend.generation(user_id)
+            jti = loader()
+            # Not stored if the session was invalidated while the loader ran.
+            self.backend.set(user_id, jti, generation)
+        return jti
+
+    def invalidate(self, user_id):
+        """
+        Drops the cached session for a user, e.g. after login, refresh or logout, and
+        refuses the result of any load that started before it.
+        """
+        self.backend.invalidate(str(user_id))
+
+    def clear(self):
+        self.backend.clear()
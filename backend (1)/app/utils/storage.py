@@ -0,0 +1,237 @@
+import glob
+import mimetypes
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+class LocalStorage:
+    """Uploads kept in a folder on this machine (UPLOAD_FOLDER)."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        # Temporary files go next to the uploads so storing them is a rename.
+        self.scratch_dir = folder
+
+    def path(self, name):
+        # Stored URLs look like 'uploads/<name>'; only the name is trusted.
+        return os.path.join(self.folder, os.path.basename(name))
+
+    def put_file(self, local_path, name):
+        """Moves the file at `local_path` into storage as `name`, replacing any existing copy."""
+        os.makedirs(self.folder, exist_ok=True)
+        os.replace(local_path, self.path(name))
+
+    def size(self, name):
+        """The size of `name` in bytes, or None if it is not stored."""
+        try:
+            return os.path.getsize(self.path(name))
+        except FileNotFoundError:
+            return None
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def delete(self, name, derived=False):
+        """Removes `name`, and with `derived` its '<name>.<variant>.<ext>' files. Returns the number removed."""
+        path = self.path(name)
+        removed = 0
+        for target in [path, *(glob.glob(f"{glob.escape(path)}.*") if derived else [])]:
+            try:
+                os.remove(target)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def scan(self):
+        """Yields (name, size, mtime) for every stored file, reading the folder lazily."""
+        if not os.path.isdir(self.folder):
+            return
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield entry.name, stat.st_size, stat.st_mtime
+
+    @contextmanager
+    def fetch(self, name):
+        """A local path to read `name` from while the block runs."""
+        yield self.path(name)
+
+    def direct_upload(self, name, content_type, max_size, expires):
+        # No presigned URLs: clients PUT the file to the app (see routes/media.py).
+        return None
+
+    def download_url(self, name, expires):
+        # Served by the app, or nginx, from the folder.
+        return None
+
+class S3Storage:
+    """
+    Uploads kept in an S3-compatible bucket (AWS S3, MinIO, ...) under `prefix`.
+    Needs boto3. Credentials left unset come from boto3's usual sources
+    (environment, shared config, instance role).
+
+    The client is created lazily per process, so it is never shared across a gunicorn fork.
+    """
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, access_key=None, secret_key=None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND = 's3' needs the boto3 package.")
+        self._boto3 = boto3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client_options = {
+            'endpoint_url': endpoint_url,
+            'region_name': region,
+            'aws_access_key_id': access_key,
+            'aws_secret_access_key': secret_key,
+        }
+        self.scratch_dir = tempfile.gettempdir()
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                self._client = self._boto3.client('s3', **self.client_options)
+                self._pid = os.getpid()
+            return self._client
+
+    def _key(self, name):
+        return f"{self.prefix}{os.path.basename(name)}"
+
+    def put_file(self, local_path, name):
+        """Uploads the file at `local_path` as `name` (multipart for large files) and removes the local copy."""
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        try:
+            self.client.upload_file(local_path, self.bucket, self._key(name), ExtraArgs={'ContentType': content_type})
+        finally:
+            os.remove(local_path)
+
+    def size(self, name):
+        """The size of `name` in bytes, or None if it is not stored."""
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(name))['ContentLength']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def exists(self, name):
+        return self.size(name) is not None
+
+    def delete(self, name, derived=False):
+        """Removes `name`, and with `derived` its '<name>.<variant>.<ext>' objects. Returns the number removed."""
+        keys = [self._key(name)]
+        if derived:
+            keys += [key for key, _, _ in self._list(f"{self._key(name)}.")]
+        removed = 0
+        # DeleteObjects takes at most 1000 keys.
+        for start in range(0, len(keys), 1000):
+            result = self.client.delete_objects(Bucket=self.bucket, Delete={
+                'Objects': [{'Key': key} for key in keys[start:start + 1000]], 'Quiet': False
+            })
+            removed += len(result.get('Deleted', []))
+        return removed
+
+    def _list(self, prefix):
+        for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get('Contents', []):
+                yield item['Key'], item['Size'], item['LastModified'].timestamp()
+
+    def scan(self):
+        """Yields (name, size, mtime) for every stored object, a listing page at a time."""
+        for key, size, mtime in self._list(self.prefix):
+            name = key[len(self.prefix):]
+            if name and '/' not in name:
+                yield name, size, mtime
+
+    @contextmanager
+    def fetch(self, name):
+        """Downloads `name` to a temporary file that exists while the block runs."""
+        fd, path = tempfile.mkstemp(dir=self.scratch_dir, suffix=f"-{os.path.basename(name)}")
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._key(name), path)
+            yield path
+        finally:
+            os.remove(path)
+
+    def direct_upload(self, name, content_type, max_size, expires):
+        """A presigned POST letting a browser upload `name` straight to the bucket, capped at `max_size` bytes."""
+        post = self.client.generate_presigned_post(
+            self.bucket, self._key(name),
+            Fields={'Content-Type': content_type},
+            Conditions=[{'Content-Type': content_type}, ['content-length-range', 1, max_size]],
+            ExpiresIn=expires
+        )
+        return {'method': 'POST', 'url': post['url'], 'fields': post['fields']}
+
+    def download_url(self, name, expires):
+        """A presigned GET for `name`, valid for `expires` seconds."""
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': self._key(name)}, ExpiresIn=expires
+        )
+
+DRIVERS = {
+    'local': LocalStorage,
+    's3': S3Storage,
+}
+
+def storage_settings(config):
+    """The driver settings for an app config. Plain values, so they can be passed to pool workers."""
+    backend = config.get('STORAGE_BACKEND', 'local')
+    if backend == 's3':
+        return {
+            'backend': 's3',
+            'bucket': config['S3_BUCKET'],
+            'prefix': config.get('S3_KEY_PREFIX', ''),
+            'endpoint_url': config.get('S3_ENDPOINT_URL'),
+            'region': config.get('S3_REGION'),
+            'access_key': config.get('S3_ACCESS_KEY_ID'),
+            'secret_key': config.get('S3_SECRET_ACCESS_KEY'),
+        }
+    if backend != 'local':
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'.")
+    return {'backend': 'local', 'folder': config['UPLOAD_FOLDER']}
+
+def make_driver(settings):
+    options = dict(settings)
+    return DRIVERS[options.pop('backend')](**options)
+
+class Storage:
+    """
+    Where uploaded files live, chosen by STORAGE_BACKEND: 'local' (UPLOAD_FOLDER)
+    or 's3' (an S3-compatible bucket, see the S3_* settings). Files are addressed
+    by name; content URLs are 'uploads/<name>' whichever backend holds them.
+    Attribute access is passed on to the driver.
+    """
+
+    def __init__(self, app=None):
+        self.settings = {}
+        self.driver = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.settings = storage_settings(app.config)
+        self.driver = make_driver(self.settings)
+
+    @property
+    def is_local(self):
+        return self.settings.get('backend') == 'local'
+
+    def __getattr__(self, name):
+        # Only called for names Storage itself does not define.
+        driver = self.__dict__.get('driver')
+        if driver is None:
+            raise AttributeError(name)
+        return getattr(driver, name)
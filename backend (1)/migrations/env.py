@@ -90,13 +90,27 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # The FTS5 search index and its shadow tables are managed by hand
+    # (migration 8b3f61d0e2a4), so keep autogenerate from dropping them.
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (type_ == 'table' and reflected and name.startswith('search_index'))
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # The app turns SQLite foreign keys on for every connection. Batch migrations
+        # rebuild tables by copy-and-drop, which would fire ON DELETE CASCADE on the
+        # dropped table's children, so turn them off again while migrating.
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -0,0 +1,62 @@
+"""Add full-text search index
+
+Revision ID: 8b3f61d0e2a4
+Revises: 5d2e8f1a9c47
+Create Date: 2026-10-18 14:05:52.731940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3f61d0e2a4'
+down_revision = '5d2e8f1a9c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index('ix_courses_category', ['category'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # One FTS5 row per document; rowid = id * 4 + type (1 course, 2 lesson, 3 exercise).
+        # Skipped when SQLite was built without FTS5; the app then uses its in-memory index.
+        try:
+            op.execute(
+                "CREATE VIRTUAL TABLE search_index USING fts5("
+                "course_id UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except sa.exc.OperationalError:
+            return
+        op.execute(
+            "INSERT INTO search_index (rowid, course_id, title, body) "
+            "SELECT id * 4 + 1, id, title, COALESCE(description, '') || ' ' || COALESCE(category, '') FROM courses"
+        )
+        op.execute(
+            "INSERT INTO search_index (rowid, course_id, title, body) "
+            "SELECT id * 4 + 2, course_id, title, COALESCE(content_text, '') FROM course_contents"
+        )
+        op.execute(
+            "INSERT INTO search_index (rowid, course_id, title, body) "
+            "SELECT exercise_id * 4 + 3, course_id, title, COALESCE(question_text, '') FROM exercise"
+        )
+    elif dialect == 'mysql':
+        op.create_index('ft_courses_search', 'courses', ['title', 'description'], mysql_prefix='FULLTEXT')
+        op.create_index('ft_course_contents_search', 'course_contents', ['title', 'content_text'], mysql_prefix='FULLTEXT')
+        op.create_index('ft_exercise_search', 'exercise', ['title', 'question_text'], mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_index")
+    elif dialect == 'mysql':
+        op.drop_index('ft_exercise_search', table_name='exercise')
+        op.drop_index('ft_course_contents_search', table_name='course_contents')
+        op.drop_index('ft_courses_search', table_name='courses')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_category')
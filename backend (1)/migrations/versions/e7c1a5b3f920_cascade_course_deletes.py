@@ -0,0 +1,51 @@
+"""Cascade course deletes
+
+Revision ID: e7c1a5b3f920
+Revises: a4e9c2d7b815
+Create Date: 2026-10-18 17:42:19.503817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c1a5b3f920'
+down_revision = 'a4e9c2d7b815'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, referred table, referred column) of the foreign keys that cascade.
+CASCADES = [
+    ('course_contents', 'course_id', 'courses', 'id'),
+    ('exercise', 'course_id', 'courses', 'id'),
+    ('enrollments', 'course_id', 'courses', 'id'),
+    ('progress_tracking', 'course_id', 'courses', 'id'),
+    ('exercise_attempt', 'exercise_id', 'exercise', 'exercise_id'),
+]
+
+# The original foreign keys were created unnamed. MySQL named them itself; on SQLite
+# batch mode needs a naming convention to find them.
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _replace_foreign_key(table, column, referred_table, referred_column, ondelete):
+    name = f'fk_{table}_{column}_{referred_table}'
+    existing = next(
+        fk['name'] for fk in sa.inspect(op.get_bind()).get_foreign_keys(table)
+        if fk['constrained_columns'] == [column]
+    )
+    with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(existing or name, type_='foreignkey')
+        batch_op.create_foreign_key(name, referred_table, [column], [referred_column], ondelete=ondelete)
+
+
+def upgrade():
+    for table, column, referred_table, referred_column in CASCADES:
+        _replace_foreign_key(table, column, referred_table, referred_column, 'CASCADE')
+
+
+def downgrade():
+    for table, column, referred_table, referred_column in reversed(CASCADES):
+        _replace_foreign_key(table, column, referred_table, referred_column, None)
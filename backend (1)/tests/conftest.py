@@ -0,0 +1,107 @@
+import os
+import sys
+
+import flask_migrate
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, answer_keys  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Settings every test app starts from: a database file of its own, inline password
+# hashing at a low cost, and no background threads or process pools.
+TEST_SETTINGS = {
+    'TESTING': True,
+    'PASSWORD_HASH_WORKERS': 0,
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'MEDIA_PROCESSING_WORKERS': 0,
+    'MEDIA_CLEANUP_ASYNC': False,
+    'SEARCH_BACKEND': 'memory',
+}
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Builds an app on a fresh SQLite file in tmp_path, with `overrides` applied to Config first."""
+    # Logs go to ./logs outside debug and testing mode; keep them out of the tree.
+    monkeypatch.chdir(tmp_path)
+
+    def make(create_tables=True, **overrides):
+        settings = {
+            **TEST_SETTINGS,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'RESPONSE_CACHE_GENERATION_DIR': str(tmp_path / 'response-cache'),
+            **overrides,
+        }
+        for name, value in settings.items():
+            monkeypatch.setattr(Config, name, value, raising=False)
+        app = create_app()
+        answer_keys.clear()
+        if create_tables:
+            with app.app_context():
+                db.create_all()
+        return app
+
+    return make
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def migrated_app(make_app):
+    """An app whose schema comes from the migrations, as in production, rather than create_all()."""
+    app = make_app(create_tables=False)
+    with app.app_context():
+        flask_migrate.upgrade(directory=MIGRATIONS)
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def login(client):
+    """Registers a user and returns the Authorization headers of a fresh login."""
+    def login(email, role=UserRole.STUDENT, password='pw'):
+        AuthService.register_user(email, password, 'First', 'Last', role=role)
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        assert response.status_code == 200, response.json
+        return {'Authorization': f"Bearer {response.json['access_token']}"}
+    return login
+
+class QueryCounter:
+    """Counts the SQL statements sent to the database while it is active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+@pytest.fixture
+def count_queries(app):
+    """`with count_queries() as counter:` records the statements run inside the block."""
+    return lambda: QueryCounter(db.engine)
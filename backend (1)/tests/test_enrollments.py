@@ -0,0 +1,109 @@
+import threading
+
+from sqlalchemy import func, update
+
+from app import db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import UserRole
+from app.services.auth_service import AuthService
+from app.services.course_service import CourseService, _insert_enrollments, _insert_enrollments_one_by_one
+
+
+def create_course(client, headers, **fields):
+    response = client.post('/api/courses/', json={
+        'title': 'Course', 'difficulty': 'BEGINNER', 'is_published': True, **fields
+    }, headers=headers)
+    assert response.status_code == 201, response.json
+    return response.json['id']
+
+def create_students(count, prefix='student'):
+    return [
+        AuthService.register_user(f'{prefix}{i}@example.com', 'pw', 'First', 'Last').user_id
+        for i in range(count)
+    ]
+
+def assert_count_matches(course_id):
+    """Asserts the course's enrollment_count equals its COUNT of enrollments, and returns it."""
+    db.session.expire_all()
+    actual = db.session.query(func.count(Enrollment.id)).filter_by(course_id=course_id).scalar()
+    assert Course.query.get(course_id).enrollment_count == actual
+    return actual
+
+
+def test_bulk_enroll_reports_the_rows_it_inserted(client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    first, second, third = create_students(3)
+    db.session.add(Enrollment(user_id=first, course_id=course_id))
+    db.session.commit()
+
+    response = client.post(f'/api/courses/{course_id}/enrollments', json={
+        'user_ids': [first, second, 999], 'emails': ['student2@example.com', 'nobody@example.com']
+    }, headers=educator)
+
+    assert response.status_code == 200, response.json
+    assert sorted(user['user_id'] for user in response.json['enrolled']) == [second, third]
+    assert [user['user_id'] for user in response.json['already_enrolled']] == [first]
+    assert response.json['not_found'] == [999, 'nobody@example.com']
+    # The manual insert above skipped the counter; only the bulk insert's rows are counted.
+    assert Course.query.get(course_id).enrollment_count == 2
+
+
+def test_insert_enrollments_skips_users_already_enrolled(client, login):
+    course_id = create_course(client, login('educator@example.com', UserRole.EDUCATOR))
+    students = create_students(4)
+    db.session.add(Enrollment(user_id=students[0], course_id=course_id))
+    db.session.commit()
+
+    assert _insert_enrollments(course_id, students[:3]) == set(students[1:3])
+    assert _insert_enrollments_one_by_one([
+        {'user_id': user_id, 'course_id': course_id} for user_id in students
+    ]) == {students[3]}
+    db.session.commit()
+    assert Enrollment.query.filter_by(course_id=course_id).count() == 4
+
+
+def test_parallel_enroll_and_unenroll_keep_the_count_exact(app, client, login):
+    course_id = create_course(client, login('educator@example.com', UserRole.EDUCATOR))
+    students = [login(f'student{i}@example.com') for i in range(6)]
+    barrier = threading.Barrier(len(students) * 2)
+    statuses = []
+
+    def churn(headers):
+        # Two threads per student, so every enroll and unenroll races a duplicate.
+        with app.app_context():
+            worker = app.test_client()
+            barrier.wait()
+            for _ in range(3):
+                statuses.append(worker.post(f'/api/courses/{course_id}/enroll', headers=headers).status_code)
+                statuses.append(worker.delete(f'/api/courses/{course_id}/enroll', headers=headers).status_code)
+            statuses.append(worker.post(f'/api/courses/{course_id}/enroll', headers=headers).status_code)
+            db.session.remove()
+
+    threads = [threading.Thread(target=churn, args=(headers,)) for headers in students * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(statuses) <= {200, 201, 400}
+    assert 201 in statuses
+    assert_count_matches(course_id)
+
+
+def test_reconcile_enrollment_counts_fixes_drifted_courses(app, client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    drifted, exact = create_course(client, educator), create_course(client, educator)
+    response = client.post(f'/api/courses/{drifted}/enrollments', json={'user_ids': create_students(3)}, headers=educator)
+    assert response.status_code == 200
+    db.session.execute(update(Course).where(Course.id == drifted).values(enrollment_count=7))
+    db.session.commit()
+
+    assert CourseService.reconcile_enrollment_counts() == 1
+    assert assert_count_matches(drifted) == 3
+    assert assert_count_matches(exact) == 0
+    assert CourseService.reconcile_enrollment_counts() == 0
+
+    result = app.test_cli_runner().invoke(args=['reconcile-enrollment-counts'])
+    assert result.exit_code == 0 and 'Corrected the enrollment count of 0 courses' in result.output
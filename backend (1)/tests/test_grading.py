@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app import answer_keys, db
+from app.models.exercise import Exercise, ExerciseType
+from app.models.user import UserRole
+from app.utils.grading import GRADERS
+from tests.test_media import create_course
+
+
+def grade(exercise_type, correct_answer, answer, options=None):
+    grader = GRADERS[exercise_type]
+    return grader.grade(grader.compile(correct_answer, options), answer)
+
+
+def test_text_answers_are_normalized():
+    assert grade(ExerciseType.LISTENING, 'Hello, world!', '  hello   WORLD ').is_correct
+    assert grade(ExerciseType.SPEAKING, "It’s late.", "it's late").is_correct
+    assert not grade(ExerciseType.LISTENING, 'Hello', 'Goodbye').is_correct
+
+
+def test_text_keys_are_never_split():
+    # A '|' in an existing key is part of the answer, not a list of alternatives.
+    assert grade(ExerciseType.MULTIPLE_CHOICE, 'a|b', 'a|b').is_correct
+    assert not grade(ExerciseType.MULTIPLE_CHOICE, 'a|b', 'a').is_correct
+    assert grade(ExerciseType.MULTIPLE_CHOICE, '["colour", "color"]', 'color').is_correct
+
+
+def test_multiple_choice_accepts_the_label_or_the_choice():
+    options = {'A': 'run', 'B': 'ran'}
+    assert grade(ExerciseType.MULTIPLE_CHOICE, 'B', 'ran', options).is_correct
+    assert grade(ExerciseType.MULTIPLE_CHOICE, 'ran', 'b', options).is_correct
+    result = grade(ExerciseType.MULTIPLE_CHOICE, 'B', 'A', options)
+    assert not result.is_correct and result.feedback == 'Incorrect. The correct answer is: ran'
+
+
+def test_blanks_earn_partial_credit():
+    key = json.dumps(['went', ['had', "'d"]])
+    result = grade(ExerciseType.FILL_IN_THE_BLANKS, key, ['went', 'has'])
+    assert (result.is_correct, result.fraction) == (False, 0.5)
+    assert result.feedback.startswith('Partly correct (1 of 2).')
+    assert grade(ExerciseType.FILL_IN_THE_BLANKS, key, "went; 'd").fraction == 1.0
+    with pytest.raises(ValueError):
+        grade(ExerciseType.FILL_IN_THE_BLANKS, key, {'a': 'b'})
+
+
+def test_pairs_come_from_the_key_or_options_pairs():
+    key = json.dumps({'dog': 'perro', 'cat': ['gato', 'minino']})
+    result = grade(ExerciseType.MATCHING, key, [['dog', 'perro'], ['cat', 'minino']])
+    assert (result.is_correct, result.fraction) == (True, 1.0)
+    assert grade(ExerciseType.MATCHING, key, {'dog': 'perro', 'cat': 'perro'}).fraction == 0.5
+
+    options = {'pairs': {'dog': 'perro'}}
+    assert grade(ExerciseType.VOCABULARY_GAME, '', {'Dog': 'Perro'}, options).is_correct
+
+
+def test_choice_options_are_not_read_as_pairs():
+    # Stored like a multiple-choice question: options are choices, the key a single answer.
+    options = {'A': 'dog', 'B': 'cat'}
+    for exercise_type in (ExerciseType.VOCABULARY_GAME, ExerciseType.MATCHING):
+        assert grade(exercise_type, 'B', 'b', options).is_correct
+        assert not grade(exercise_type, 'B', 'dog', options).is_correct
+
+
+def test_submissions_are_graded_against_the_edited_key(app, client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator, is_published=True)
+    student = login('student@example.com')
+    assert client.post(f'/api/courses/{course_id}/enroll', headers=student).status_code == 201
+    exercise = Exercise(
+        course_id=course_id, title='Animals', exercise_type=ExerciseType.VOCABULARY_GAME,
+        correct_answer='B', options={'A': 'dog', 'B': 'cat'}, points=10
+    )
+    db.session.add(exercise)
+    db.session.commit()
+    exercise_id = exercise.exercise_id
+
+    def submit(answer):
+        response = client.post(f'/api/exercises/{exercise_id}/submit', json={'answer': answer}, headers=student)
+        assert response.status_code == 200, response.json
+        return response.json
+
+    assert submit('B')['is_correct']
+    assert answer_keys.compiled(exercise).accepted == frozenset({'b', 'cat'})
+
+    exercise.correct_answer = json.dumps({'dog': 'perro', 'cat': 'gato'})
+    exercise.options = None
+    db.session.commit()
+
+    attempt = submit({'dog': 'perro', 'cat': 'chat'})
+    assert (attempt['is_correct'], attempt['score_earned']) == (False, 5)
+    assert answer_keys.compiled(exercise).pairs == {'dog': frozenset({'perro'}), 'cat': frozenset({'gato'})}
@@ -0,0 +1,176 @@
+import io
+import threading
+import time
+
+from app import db, media_cleanup, storage
+from app.models.media import MediaFile
+from app.models.user import UserRole
+
+
+def create_course(client, headers, **fields):
+    response = client.post('/api/courses/', json={'title': 'Course', 'difficulty': 'BEGINNER', **fields}, headers=headers)
+    assert response.status_code == 201, response.json
+    return response.json['id']
+
+def upload(client, headers, course_id, data=b'video bytes', name='lesson.mp4'):
+    response = client.post(
+        f'/api/courses/{course_id}/content',
+        data={'title': 'Lesson', 'content_type': 'VIDEO', 'file': (io.BytesIO(data), name)},
+        headers=headers, content_type='multipart/form-data'
+    )
+    assert response.status_code == 201, response.json
+    return response.json
+
+
+def test_content_url_cannot_point_at_an_uploaded_file(app, client, login):
+    owner = login('owner@example.com', UserRole.EDUCATOR)
+    other = login('other@example.com', UserRole.EDUCATOR)
+    lesson = upload(client, owner, create_course(client, owner))
+    other_course = create_course(client, other)
+
+    response = client.post(f'/api/courses/{other_course}/content', json={
+        'title': 'Borrowed', 'content_type': 'VIDEO', 'content_url': lesson['content_url']
+    }, headers=other)
+
+    assert response.status_code == 400
+    assert MediaFile.query.filter_by(url=lesson['content_url']).one().ref_count == 1
+
+
+def test_external_content_urls_are_still_accepted(client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+
+    response = client.post(f'/api/courses/{course_id}/content', json={
+        'title': 'Talk', 'content_type': 'VIDEO', 'content_url': 'https://videos.example.com/talk.mp4'
+    }, headers=educator)
+
+    assert response.status_code == 201
+
+
+def test_deleting_a_lesson_keeps_files_other_lessons_use(app, client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    first = upload(client, educator, course_id)
+    second = upload(client, educator, course_id)
+    assert first['content_url'] == second['content_url']
+
+    assert client.delete(f"/api/courses/content/{first['id']}", headers=educator).status_code == 200
+
+    media = MediaFile.query.filter_by(url=second['content_url']).one()
+    assert media.ref_count == 1
+    name = second['content_url'].split('/', 1)[1]
+    assert client.get(f'/api/media/{name}', headers=educator).status_code == 200
+
+
+def test_media_of_unpublished_course_is_forbidden_to_others(client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    student = login('student@example.com')
+    outsider = login('outsider@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    name = upload(client, educator, course_id)['content_url'].split('/', 1)[1]
+
+    assert client.get(f'/api/media/{name}', headers=educator).status_code == 200
+    assert client.get(f'/api/media/{name}', headers=student).status_code == 403
+    assert client.get(f'/api/media/{name}', headers=outsider).status_code == 403
+    assert client.get('/api/media/missing.mp4', headers=educator).status_code == 404
+
+
+def test_media_of_unpublished_course_is_readable_by_enrolled_students(client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    enrolled = login('enrolled@example.com')
+    outsider = login('outsider@example.com')
+    course_id = create_course(client, educator, is_published=True)
+    name = upload(client, educator, course_id)['content_url'].split('/', 1)[1]
+    assert client.post(f'/api/courses/{course_id}/enroll', headers=enrolled).status_code == 201
+    client.put(f'/api/courses/{course_id}', json={'is_published': False}, headers=educator)
+
+    assert client.get(f'/api/media/{name}', headers=enrolled).status_code == 200
+    assert client.get(f'/api/media/{name}', headers=outsider).status_code == 403
+
+
+def test_deleting_the_last_lesson_removes_the_file(client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    lesson = upload(client, educator, create_course(client, educator))
+    name = lesson['content_url'].split('/', 1)[1]
+    assert storage.exists(name)
+
+    assert client.delete(f"/api/courses/content/{lesson['id']}", headers=educator).status_code == 200
+
+    assert not storage.exists(name)
+    assert MediaFile.query.filter_by(url=lesson['content_url']).first() is None
+
+
+def test_reupload_during_cleanup_keeps_the_file(app, client, login, monkeypatch):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    lesson = upload(client, educator, course_id)
+    released = []
+    monkeypatch.setattr(media_cleanup, 'schedule', released.extend)
+    assert client.delete(f"/api/courses/content/{lesson['id']}", headers=educator).status_code == 200
+    assert released == [lesson['content_url']]
+
+    # Hold the cleanup between deleting the row and removing the file, long enough
+    # for the re-upload below to finish unless the row lock makes it wait.
+    in_delete, uploaded = threading.Event(), threading.Event()
+    delete_file = storage.driver.delete
+    def slow_delete(name, derived=False):
+        in_delete.set()
+        uploaded.wait(1)
+        return delete_file(name, derived)
+    monkeypatch.setattr(storage.driver, 'delete', slow_delete)
+
+    def cleanup():
+        with app.app_context():
+            media_cleanup.remove_unreferenced(released)
+            db.session.remove()
+    thread = threading.Thread(target=cleanup)
+    thread.start()
+    assert in_delete.wait(5)
+    with app.app_context():
+        again = upload(client, educator, course_id)
+        uploaded.set()
+        db.session.remove()
+    thread.join()
+
+    assert again['content_url'] == lesson['content_url']
+    assert MediaFile.query.filter_by(url=again['content_url']).one().ref_count == 1
+    name = again['content_url'].split('/', 1)[1]
+    assert storage.exists(name)
+    assert client.get(f'/api/media/{name}', headers=educator).status_code == 200
+
+
+def test_media_links_authorize_one_file_without_the_access_token(client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator, is_published=True)
+    name = upload(client, educator, course_id)['content_url'].split('/', 1)[1]
+    other = upload(client, educator, course_id, data=b'other bytes')['content_url'].split('/', 1)[1]
+    student = login('student@example.com')
+    access_token = student['Authorization'].split(' ', 1)[1]
+
+    link = client.get(f'/api/media/{name}/link', headers=student).json
+    # The same URL within the period, so the browser cache keeps working.
+    assert client.get(f'/api/media/{name}/link', headers=student).json == link
+    assert access_token not in link['url']
+
+    token = link['url'].split('?token=', 1)[1]
+    response = client.get(f'/api/media/{name}?token={token}')
+    assert response.status_code == 200 and response.data == b'video bytes'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert client.get(f'/api/media/{other}?token={token}').status_code == 401
+    assert client.get(f'/api/media/{name}?jwt={access_token}').status_code == 401
+    assert client.get(f'/api/media/{name}').status_code == 401
+
+
+def test_media_links_expire_and_follow_access_rules(app, client, login, monkeypatch):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    outsider = login('outsider@example.com', UserRole.EDUCATOR)
+    name = upload(client, educator, create_course(client, educator))['content_url'].split('/', 1)[1]
+
+    assert client.get(f'/api/media/{name}/link', headers=outsider).status_code == 403
+    assert client.get('/api/media/missing.mp4/link', headers=educator).status_code == 404
+
+    token = client.get(f'/api/media/{name}/link', headers=educator).json['url'].split('?token=', 1)[1]
+    assert client.get(f'/api/media/{name}?token={token}').status_code == 200
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 2 * app.config['MEDIA_LINK_EXPIRES'] + 1)
+    assert client.get(f'/api/media/{name}?token={token}').status_code == 401
@@ -0,0 +1,72 @@
+import os
+import time
+
+from app import db, storage
+from app.models.media import MediaFile
+from app.models.user import UserRole
+from tests.test_media import create_course, upload
+
+DAY = 24 * 60 * 60
+
+
+def stored_file(name, age=0, data=b'bytes'):
+    """Writes `name` into storage with an mtime `age` seconds in the past."""
+    path = storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return name
+
+def gc_uploads(app, *args):
+    result = app.test_cli_runner().invoke(args=['gc-uploads', *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_sweep_removes_old_orphans_only(app, client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    used = upload(client, educator, create_course(client, educator))['content_url'].split('/', 1)[1]
+    os.utime(storage.path(used), (time.time() - 2 * DAY,) * 2)
+    old = stored_file('old.mp4', age=2 * DAY)
+    old_rendition = stored_file(f'{used}.720p.mp4', age=2 * DAY)
+    young = stored_file('young.mp4', age=60 * 60)
+    leftover = stored_file('.upload-abc', age=2 * DAY)
+
+    output = gc_uploads(app, '--grace-hours', '24')
+
+    assert 'Removed 2 orphaned files' in output
+    assert not storage.exists(old) and not storage.exists(leftover)
+    assert storage.exists(used) and storage.exists(old_rendition) and storage.exists(young)
+
+    # A shorter grace period reaches the younger file too.
+    assert 'Removed 1 orphaned files' in gc_uploads(app, '--grace-hours', '0.5')
+    assert not storage.exists(young)
+
+
+def test_dry_run_lists_orphans_without_removing_them(app):
+    old = stored_file('old.mp4', age=2 * DAY, data=b'12345')
+    db.session.add(MediaFile(url=f'uploads/{old}', size=5, ref_count=0))
+    db.session.commit()
+
+    output = gc_uploads(app, '--dry-run')
+
+    assert f'5  {old}' in output and 'Found 1 orphaned files' in output
+    assert storage.exists(old)
+    assert MediaFile.query.filter_by(url=f'uploads/{old}').count() == 1
+
+    assert 'Removed 1 orphaned files' in gc_uploads(app)
+    assert not storage.exists(old)
+    assert MediaFile.query.filter_by(url=f'uploads/{old}').count() == 0
+
+
+def test_sweep_keeps_files_acquired_after_the_listing(app):
+    # An upload of the same bytes has taken its reference, but its lesson is not committed yet.
+    acquired = stored_file('acquired.mp4', age=2 * DAY)
+    db.session.add(MediaFile(url=f'uploads/{acquired}', ref_count=1))
+    db.session.commit()
+
+    assert 'Removed 0 orphaned files' in gc_uploads(app)
+    assert storage.exists(acquired)
+    assert MediaFile.query.filter_by(url=f'uploads/{acquired}').one().ref_count == 1
@@ -0,0 +1,49 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.exceptions import ServiceBusy
+from app.utils.password_hasher import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    """A hasher with one slot and a short timeout, on a thread pool with room for more jobs than slots."""
+    hasher = PasswordHasher()
+    hasher.workers = 1
+    hasher.timeout = 0.05
+    hasher._slots = threading.BoundedSemaphore(1)
+    hasher._executor = ThreadPoolExecutor(max_workers=2)
+    hasher._get_executor = lambda: hasher._executor
+    yield hasher
+    hasher.shutdown()
+
+
+def test_a_job_still_running_after_a_timeout_keeps_its_slot(hasher):
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return 'slow'
+
+    with pytest.raises(ServiceBusy):
+        hasher._run(slow)
+    # The first job is still running, so its slot is still taken.
+    with pytest.raises(ServiceBusy):
+        hasher._run(lambda: 'fast')
+
+    release.set()
+    # Freed once the first job finishes.
+    assert hasher._slots.acquire(timeout=5)
+    hasher._slots.release()
+    assert hasher._run(lambda: 'fast') == 'fast'
+
+
+def test_a_failed_job_frees_its_slot(hasher):
+    def broken():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        hasher._run(broken)
+    assert hasher._run(lambda: 'ok') == 'ok'
@@ -0,0 +1,99 @@
+import re
+
+import pytest
+
+from app import db
+from app.models.user import User, UserRole
+from app.services.auth_service import AuthService
+from app.services.course_service import CourseService
+from tests.conftest import QueryCounter
+
+
+def create_course(client, headers):
+    response = client.post('/api/courses/', json={
+        'title': 'Course', 'difficulty': 'BEGINNER', 'is_published': True
+    }, headers=headers)
+    assert response.status_code == 201, response.json
+    return response.json['id']
+
+def queries_for(client, count_queries, url, headers):
+    """The statements one GET of `url` runs once the session cache holds the caller."""
+    client.get(url, headers=headers)
+    # Requests share the test's session; start from an empty one so nothing comes from its identity map.
+    db.session.remove()
+    with count_queries() as counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.json
+    return counter.count
+
+# A full users row fetched by primary key, as the principal loader and get_user() do.
+USER_LOOKUP = re.compile(r'FROM users\s+WHERE users\.user_id = \?')
+
+def user_lookups(counter):
+    return sum(1 for statement in counter.statements if USER_LOOKUP.search(statement))
+
+
+def test_my_enrollments_takes_a_constant_number_of_queries(client, login, count_queries):
+    student = login('student@example.com')
+    student_id = User.query.filter_by(email='student@example.com').one().user_id
+    counts = []
+    for i in range(6):
+        # Each course has its own creator, so creators cannot be served from the identity map.
+        course_id = create_course(client, login(f'educator{i}@example.com', UserRole.EDUCATOR))
+        CourseService.bulk_enroll(course_id, user_ids=[student_id])
+        if i in (0, 5):
+            counts.append([
+                queries_for(client, count_queries, '/api/courses/my-enrollments', student),
+                queries_for(client, count_queries, '/api/courses/my-enrollments?fields=id,course', student),
+            ])
+
+    assert counts[0] == counts[1]
+
+
+def test_course_roster_takes_a_constant_number_of_queries(client, login, count_queries):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    counts = []
+    for i in range(6):
+        login(f'student{i}@example.com')
+        CourseService.bulk_enroll(course_id, emails=[f'student{i}@example.com'])
+        if i in (0, 5):
+            counts.append([
+                queries_for(client, count_queries, f'/api/courses/{course_id}/enrollments', educator),
+                queries_for(client, count_queries, f'/api/courses/{course_id}/enrollments?fields=id,user', educator),
+            ])
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize('role_claims', [False, True])
+def test_authenticated_requests_look_up_the_user_at_most_once(make_app, role_claims):
+    app = make_app(JWT_ROLE_CLAIMS_ENABLED=role_claims)
+    client = app.test_client()
+    with app.app_context():
+        headers = {}
+        for email, role in [('admin@example.com', UserRole.ADMIN), ('educator@example.com', UserRole.EDUCATOR)]:
+            AuthService.register_user(email, 'pw', 'First', 'Last', role=role)
+            token = client.post('/api/auth/login', json={'email': email, 'password': 'pw'}).json['access_token']
+            headers[role] = {'Authorization': f'Bearer {token}'}
+        educator = headers[UserRole.EDUCATOR]
+        course_id = create_course(client, educator)
+
+        requests = [
+            ('get', '/api/auth/profile', educator, None),
+            ('put', '/api/auth/profile', educator, {'first_name': 'Renamed'}),
+            ('put', f'/api/courses/{course_id}', educator, {'title': 'Renamed'}),
+            ('get', f'/api/courses/{course_id}/enrollments', educator, None),
+            ('post', f'/api/courses/{course_id}/enrollments', educator, {'emails': ['admin@example.com']}),
+            ('post', f'/api/courses/{course_id}/exercises', educator, {
+                'title': 'Exercise', 'exercise_type': 'MULTIPLE_CHOICE', 'difficulty_level': 'EASY', 'correct_answer': 'A'
+            }),
+            ('get', f'/api/courses/{course_id}/enrollments', headers[UserRole.ADMIN], None),
+            ('get', '/api/admin/test', headers[UserRole.ADMIN], None),
+        ]
+        for method, url, auth, body in requests:
+            db.session.remove()
+            with QueryCounter(db.engine) as counter:
+                response = getattr(client, method)(url, headers=auth, json=body)
+            assert response.status_code < 400, (url, response.json)
+            assert user_lookups(counter) <= 1, (url, counter.statements)
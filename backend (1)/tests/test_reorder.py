@@ -0,0 +1,122 @@
+import threading
+from datetime import datetime
+
+from sqlalchemy import event, update
+
+from app import db
+from app.models.course import Course
+from app.models.course_content import ContentType, CourseContent
+from app.models.exercise import Exercise, ExerciseType
+from app.models.user import UserRole
+from tests.test_media import create_course
+
+
+def course_with_rows(client, login):
+    """A course with three lessons and two exercises, and the educator's headers."""
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    contents = [CourseContent(course_id=course_id, title=f'Lesson {n}', content_type=ContentType.TEXT, order_index=n)
+                for n in range(3)]
+    exercises = [Exercise(course_id=course_id, title=f'Exercise {n}', exercise_type=ExerciseType.LISTENING,
+                          correct_answer='-', order_index=n) for n in range(2)]
+    db.session.add_all(contents + exercises)
+    db.session.commit()
+    return course_id, [c.id for c in contents], [e.exercise_id for e in exercises], educator
+
+def set_updated_at(course_id, value):
+    db.session.execute(update(Course).where(Course.id == course_id).values(updated_at=value))
+    db.session.commit()
+
+def stored_updated_at(course_id):
+    db.session.remove()
+    return db.session.query(Course.updated_at).filter(Course.id == course_id).scalar()
+
+def reorder(client, headers, course_id, updated_at, **lists):
+    db.session.remove()
+    return client.put(f'/api/courses/{course_id}/order', json={'updated_at': updated_at, **lists}, headers=headers)
+
+
+def test_reorder_applies_both_lists_and_refuses_a_stale_edit(app, client, login):
+    course_id, contents, exercises, educator = course_with_rows(client, login)
+    seen = stored_updated_at(course_id).isoformat()
+
+    response = reorder(client, educator, course_id, seen, contents=contents[::-1], exercises=exercises[::-1])
+    assert response.status_code == 200, response.json
+    assert (response.json['contents_moved'], response.json['exercises_moved']) == (2, 2)
+    order = [c.id for c in CourseContent.query.filter_by(course_id=course_id).order_by(CourseContent.order_index)]
+    assert order == contents[::-1]
+
+    # A second editor still holding the first timestamp gets a 409 with the current one.
+    response = reorder(client, educator, course_id, seen, contents=contents)
+    assert response.status_code == 409
+    assert response.json['updated_at'] == stored_updated_at(course_id).isoformat()
+    order = [c.id for c in CourseContent.query.filter_by(course_id=course_id).order_by(CourseContent.order_index)]
+    assert order == contents[::-1]
+
+
+def test_incomplete_or_duplicate_lists_are_refused_without_writing(app, client, login):
+    course_id, contents, exercises, educator = course_with_rows(client, login)
+    seen = stored_updated_at(course_id)
+
+    for lists in ({'contents': contents[:2]}, {'contents': [contents[0]] * 3},
+                  {'contents': contents[::-1], 'exercises': [exercises[0], exercises[0]]}, {'exercises': 'x'}):
+        response = reorder(client, educator, course_id, seen.isoformat(), **lists)
+        assert response.status_code == 400, lists
+    assert stored_updated_at(course_id) == seen
+    assert CourseContent.query.filter_by(course_id=course_id, order_index=0).one().id == contents[0]
+
+    assert reorder(client, educator, course_id, 'yesterday', contents=contents).status_code == 400
+
+
+def test_whole_second_timestamps_accept_the_fraction_the_editor_saw(app, client, login):
+    course_id, contents, _, educator = course_with_rows(client, login)
+    # MySQL DATETIME drops the fraction the API returned before the row was reloaded.
+    set_updated_at(course_id, datetime(2024, 5, 1, 12, 0, 0))
+
+    assert reorder(client, educator, course_id, '2024-05-01T12:00:01.200000', contents=contents).status_code == 409
+    assert reorder(client, educator, course_id, '2024-05-01T12:00:00.400000', contents=contents).status_code == 200
+
+    # With fractional seconds stored, only the exact value matches.
+    set_updated_at(course_id, datetime(2024, 5, 1, 12, 0, 0, 400000))
+    assert reorder(client, educator, course_id, '2024-05-01T12:00:00', contents=contents).status_code == 409
+
+
+def test_timestamps_with_an_offset_are_compared_in_utc(app, client, login):
+    course_id, contents, _, educator = course_with_rows(client, login)
+    set_updated_at(course_id, datetime(2024, 5, 1, 12, 0, 0, 250000))
+
+    assert reorder(client, educator, course_id, '2024-05-01T12:00:00.250000+02:00', contents=contents).status_code == 409
+    assert reorder(client, educator, course_id, '2024-05-01T14:00:00.250000+02:00', contents=contents).status_code == 200
+
+
+def test_concurrent_reorders_from_the_same_version_apply_once(app, client, login):
+    course_id, contents, _, educator = course_with_rows(client, login)
+    seen = stored_updated_at(course_id).isoformat()
+    db.session.remove()
+
+    # Both requests have passed the stale check before either claims the course.
+    both_checked = threading.Barrier(2, timeout=5)
+
+    def before_claim(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE courses SET updated_at'):
+            both_checked.wait()
+
+    statuses = []
+
+    def editor(order):
+        statuses.append(client.put(f'/api/courses/{course_id}/order',
+                                   json={'updated_at': seen, 'contents': order}, headers=educator).status_code)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_claim)
+    try:
+        threads = [threading.Thread(target=editor, args=(order,)) for order in (contents[::-1], contents[1:] + contents[:1])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_claim)
+
+    assert sorted(statuses) == [200, 409]
@@ -0,0 +1,38 @@
+from app.utils.response_cache import MemoryResponseBackend, ResponseCache
+
+
+def make_worker(generation_dir):
+    cache = ResponseCache()
+    cache.backend = MemoryResponseBackend(str(generation_dir))
+    return cache
+
+
+def test_a_bump_in_one_worker_reaches_the_others(tmp_path):
+    first, second = make_worker(tmp_path), make_worker(tmp_path)
+    assert first.get_or_build('catalog', 'list', {}, lambda: b'old') == (b'old', False)
+    assert second.get_or_build('catalog', 'list', {}, lambda: b'old') == (b'old', False)
+    assert second.get_or_build('catalog', 'list', {}, lambda: b'new') == (b'old', True)
+
+    first.bump('catalog')
+
+    assert second.get_or_build('catalog', 'list', {}, lambda: b'new') == (b'new', False)
+    assert first.get_or_build('catalog', 'list', {}, lambda: b'new') == (b'new', False)
+
+
+def test_generations_only_move_forward(tmp_path):
+    backend = MemoryResponseBackend(str(tmp_path))
+    seen = {backend.generation('catalog')}
+    for _ in range(50):
+        generation = backend.bump('catalog')
+        assert generation not in seen and generation == backend.generation('catalog')
+        seen.add(generation)
+
+
+def test_an_unusable_generation_dir_serves_uncached(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('not a folder')
+    cache = make_worker(blocker / 'response-cache')
+    cache.bump('catalog')
+
+    assert cache.get_or_build('catalog', 'list', {}, lambda: b'body') == (b'body', False)
+    assert cache.get_or_build('catalog', 'list', {}, lambda: b'body') == (b'body', False)
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from app import storage
+from app.models.user import UserRole
+from tests.test_media import create_course
+
+moto = pytest.importorskip('moto')
+
+BUCKET = 'lelms-test'
+
+
+@pytest.fixture
+def app(make_app):
+    """An app storing uploads in an S3 bucket that moto keeps in memory."""
+    with moto.mock_aws():
+        app = make_app(
+            STORAGE_BACKEND='s3', S3_BUCKET=BUCKET, S3_KEY_PREFIX='uploads/', S3_ENDPOINT_URL=None,
+            S3_REGION='us-east-1', S3_ACCESS_KEY_ID='test', S3_SECRET_ACCESS_KEY='test'
+        )
+        with app.app_context():
+            storage.client.create_bucket(Bucket=BUCKET)
+            yield app
+
+def put_object(key, data=b'bytes'):
+    storage.client.put_object(Bucket=BUCKET, Key=key, Body=data)
+
+def keys():
+    return sorted(item['Key'] for item in storage.client.list_objects_v2(Bucket=BUCKET).get('Contents', []))
+
+
+def test_put_file_uploads_with_a_content_type_and_removes_the_local_copy(app, tmp_path):
+    local = tmp_path / 'scratch'
+    local.write_bytes(b'x' * 10)
+
+    storage.put_file(str(local), 'a.mp3')
+
+    assert not local.exists()
+    assert storage.size('a.mp3') == 10 and not storage.exists('b.mp3')
+    head = storage.client.head_object(Bucket=BUCKET, Key='uploads/a.mp3')
+    assert head['ContentType'] == 'audio/mpeg'
+    with storage.fetch('a.mp3') as path:
+        assert open(path, 'rb').read() == b'x' * 10
+    assert not os.path.exists(path)
+
+
+def test_delete_derived_removes_only_the_files_renditions(app):
+    for key in ('uploads/a.mp4', 'uploads/a.mp4.720p.mp4', 'uploads/a.mp4.thumb.jpg', 'uploads/ab.mp4'):
+        put_object(key)
+
+    assert storage.delete('a.mp4', derived=True) == 3
+    assert keys() == ['uploads/ab.mp4']
+    assert storage.delete('ab.mp4') == 1
+
+
+def test_scan_lists_the_prefix_only(app):
+    for key in ('uploads/a.mp3', 'uploads/b.pdf', 'uploads/nested/c.mp3', 'other/d.mp3'):
+        put_object(key, b'12345')
+
+    assert sorted((name, size) for name, size, _ in storage.scan()) == [('a.mp3', 5), ('b.pdf', 5)]
+
+
+def test_direct_upload_is_recorded_once_it_is_in_the_bucket(app, client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+
+    response = client.post(f'/api/courses/{course_id}/content/upload', json={'filename': 'notes.pdf'}, headers=educator)
+    assert response.status_code == 201, response.json
+    target = response.json
+    assert target['method'] == 'POST' and target['fields']['Content-Type'] == 'application/pdf'
+    assert target['fields']['key'].startswith('uploads/') and target['fields']['key'].endswith('.pdf')
+
+    def add_content():
+        return client.post(f'/api/courses/{course_id}/content', json={
+            'title': 'Notes', 'content_type': 'DOCUMENT', 'upload_token': target['upload_token']
+        }, headers=educator)
+
+    response = add_content()
+    assert response.status_code == 400 and 'not been uploaded' in response.json['message']
+
+    # What the browser does with the presigned POST.
+    put_object(target['fields']['key'], b'%PDF notes')
+    response = add_content()
+    assert response.status_code == 201, response.json
+    assert response.json['content_url'] == target['fields']['key']
+
+
+def test_oversized_direct_uploads_are_refused_and_deleted(app, client, login):
+    educator = login('educator@example.com', UserRole.EDUCATOR)
+    course_id = create_course(client, educator)
+    target = client.post(f'/api/courses/{course_id}/content/upload', json={'filename': 'notes.pdf'}, headers=educator).json
+    put_object(target['fields']['key'], b'x' * 2048)
+    app.config['MAX_UPLOAD_SIZE'] = 1024
+
+    response = client.post(f'/api/courses/{course_id}/content', json={
+        'title': 'Notes', 'content_type': 'DOCUMENT', 'upload_token': target['upload_token']
+    }, headers=educator)
+
+    assert response.status_code == 400 and response.json['message'] == 'File is too large.'
+    assert keys() == []
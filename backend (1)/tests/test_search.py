@@ -0,0 +1,65 @@
+import flask_migrate
+import pytest
+
+from app import db, search_index
+from app.models.course import Course
+from app.models.exercise import Exercise, ExerciseType
+from app.models.user import User, UserRole
+from app.services.search_service import SearchService
+from app.utils.search_index import Fts5SearchBackend, MemorySearchBackend
+from tests.conftest import MIGRATIONS
+
+
+@pytest.fixture(params=[MemorySearchBackend, Fts5SearchBackend])
+def search_app(request, make_app):
+    """An app on each search backend: the built-in index, and FTS5 on a migrated database."""
+    fts5 = request.param is Fts5SearchBackend
+    app = make_app(create_tables=not fts5, SEARCH_BACKEND='fts5' if fts5 else 'memory')
+    with app.app_context():
+        if fts5:
+            flask_migrate.upgrade(directory=MIGRATIONS)
+        assert type(search_index.backend) is request.param
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def course(search_app):
+    creator = User(email='educator@example.com', first_name='First', last_name='Last', role=UserRole.EDUCATOR)
+    creator.password_hash = 'unused'
+    db.session.add(creator)
+    db.session.flush()
+    course = Course(title='Spanish', creator_id=creator.user_id, is_published=True)
+    db.session.add(course)
+    db.session.commit()
+    return course
+
+def add_exercise(course, title, question, is_active=True):
+    exercise = Exercise(
+        course_id=course.id, title=title, question_text=question,
+        exercise_type=ExerciseType.MULTIPLE_CHOICE, is_active=is_active
+    )
+    db.session.add(exercise)
+    db.session.commit()
+    return exercise.exercise_id
+
+
+def test_inactive_exercises_do_not_crowd_out_active_ones(search_app, course):
+    for i in range(3):
+        add_exercise(course, f'Verbs {i}', 'verbs verbs verbs', is_active=False)
+    active = add_exercise(course, 'Review', 'a question about verbs')
+    search_index.rebuild()
+
+    results = SearchService.search('verbs', doc_types=['exercise'], limit=2)
+
+    assert [result['id'] for result in results] == [active]
+    assert len(SearchService.search('verbs', doc_types=['exercise'], limit=2, include_unpublished=True)) == 2
+
+
+def test_scores_are_not_rounded(search_app, course):
+    add_exercise(course, 'Verbs', 'irregular verbs')
+    search_index.rebuild()
+
+    (hit,) = search_index.search('verbs', ['exercise'])
+    (result,) = SearchService.search('verbs', doc_types=['exercise'])
+
+    assert result['score'] == hit[2]
@@ -0,0 +1,40 @@
+from app.utils.session_cache import MemorySessionBackend, SessionCache
+
+
+def make_cache(**kwargs):
+    cache = SessionCache()
+    cache.backend = MemorySessionBackend(**kwargs)
+    return cache
+
+
+def test_a_load_overtaken_by_an_invalidation_is_not_cached():
+    cache = make_cache()
+    sessions = {'1': 'old-jti'}
+
+    def stale_loader():
+        # The database is read, then the user logs out before the result is cached.
+        jti = sessions['1']
+        sessions['1'] = None
+        cache.invalidate(1)
+        return jti
+
+    assert cache.get_session_jti(1, stale_loader) == 'old-jti'
+    assert cache.get_session_jti(1, lambda: sessions['1']) is None
+    assert cache.get_session_jti(1, lambda: 'unexpected') is None
+
+
+def test_loads_after_an_invalidation_are_cached():
+    cache = make_cache()
+    cache.invalidate(1)
+    assert cache.get_session_jti(1, lambda: 'new-jti') == 'new-jti'
+    assert cache.get_session_jti(1, lambda: 'unexpected') == 'new-jti'
+
+
+def test_forgotten_invalidations_still_refuse_older_loads():
+    cache = make_cache(max_size=2)
+    generation = cache.backend.generation('1')
+    for user_id in (1, 2, 3):
+        cache.invalidate(user_id)
+
+    cache.backend.set('1', 'old-jti', generation)
+    assert cache.get_session_jti(1, lambda: 'new-jti') == 'new-jti'
@@ -0,0 +1,55 @@
+import io
+import json
+
+from app.models.user import User, UserRole
+
+
+def import_file(client, headers, body, filename='users.ndjson'):
+    return client.post('/api/admin/users/import', data={'file': (io.BytesIO(body.encode()), filename)},
+                       headers=headers, content_type='multipart/form-data')
+
+
+def test_non_text_fields_are_reported_per_row(app, client, login):
+    admin = login('admin@example.com', UserRole.ADMIN)
+    rows = [
+        {'email': 'numeric@example.com', 'password': 12345, 'first_name': 'Num', 'last_name': 'Eric'},
+        {'email': 'nested@example.com', 'password': {'value': 'x'}, 'first_name': 'Nes', 'last_name': 'Ted'},
+        {'email': ['list@example.com'], 'password': 'pw', 'first_name': 'Li', 'last_name': 'St'},
+        {'email': 'ok@example.com', 'password': 'pw', 'first_name': 'O', 'last_name': 'K', 'role': 7},
+    ]
+    response = import_file(client, admin, '\n'.join(json.dumps(row) for row in rows))
+
+    assert response.status_code == 200
+    assert response.json['created'] == 1
+    assert [(error['row'], error['email']) for error in response.json['errors']] == [
+        (2, 'nested@example.com'), (3, None), (4, 'ok@example.com')
+    ]
+    assert User.query.filter_by(email='numeric@example.com').one()
+
+
+def test_large_files_are_sent_to_the_cli(app, client, login):
+    admin = login('admin@example.com', UserRole.ADMIN)
+    app.config['USER_IMPORT_MAX_REQUEST_SIZE'] = 1024
+    row = json.dumps({'email': 'a@example.com', 'password': 'pw', 'first_name': 'A', 'last_name': 'B'})
+
+    response = import_file(client, admin, '\n'.join([row] * 50))
+
+    assert response.status_code == 413
+    assert User.query.filter_by(email='a@example.com').first() is None
+
+
+def test_files_with_too_many_rows_are_refused_before_any_account_is_created(app, client, login):
+    admin = login('admin@example.com', UserRole.ADMIN)
+    app.config['USER_IMPORT_MAX_REQUEST_ROWS'] = 3
+    header = 'email,password,first_name,last_name\n'
+    rows = [f'user{n}@example.com,pw,User,{n}\n' for n in range(4)]
+
+    response = import_file(client, admin, header + ''.join(rows), filename='users.csv')
+    assert response.status_code == 413
+    assert 'flask import-users' in response.json['message']
+    assert User.query.filter(User.email.like('user%')).count() == 0
+
+    # A BOM and a file right at the limit still import in full after the rows are counted.
+    response = import_file(client, admin, '﻿' + header + ''.join(rows[:3]), filename='users.csv')
+    assert response.status_code == 200
+    assert response.json['created'] == 3
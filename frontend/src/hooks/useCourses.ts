@@ -1,6 +1,7 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useEffect } from 'react';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import * as courseService from '../services/courseService';
-import { CourseFilters } from '../types/course.types';
+import { CourseFilters, CourseLessonOutline, ReorderCourseData } from '../types/course.types';
 
 // Query key factory
 const courseKeys = {
@@ -9,25 +10,33 @@ const courseKeys = {
   list: (filters: CourseFilters) => [...courseKeys.lists(), { filters }] as const,
   details: () => [...courseKeys.all, 'detail'] as const,
   detail: (courseId: number) => [...courseKeys.details(), courseId] as const,
+  bundle: (courseId: number) => [...courseKeys.detail(courseId), 'bundle'] as const,
+  processing: (contentId: number) => [...courseKeys.all, 'content', contentId, 'processing'] as const,
+  outline: (courseId: number) => [...courseKeys.detail(courseId), 'outline'] as const,
+  lesson: (contentId: number) => [...courseKeys.all, 'content', contentId] as const,
   enrollments: () => [...courseKeys.all, 'enrollments'] as const,
   meta: () => [...courseKeys.all, 'meta'] as const,
 };
 
 /**
- * Hook to fetch a list of courses with filters.
+ * Hook to fetch the course catalog page by page with filters.
+ * Call `fetchNextPage` to load more while `hasNextPage` is true.
  */
 export const useCourses = (filters: CourseFilters) => {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: courseKeys.list(filters),
-    queryFn: () => {
+    queryFn: ({ pageParam }) => {
       // Remove empty filters before sending to API
       const activeFilters: CourseFilters = {};
       if (filters.search) activeFilters.search = filters.search;
       if (filters.difficulty) activeFilters.difficulty = filters.difficulty;
       if (filters.category) activeFilters.category = filters.category;
-      return courseService.getCourses(activeFilters);
+      if (filters.sort) activeFilters.sort = filters.sort;
+      return courseService.getCourses(activeFilters, pageParam);
     },
-    keepPreviousData: true,
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
+    placeholderData: (previousData) => previousData,
   });
 };
 
@@ -53,6 +62,74 @@ export const useCourseById = (courseId: number) => {
   });
 };
 
+/**
+ * Hook to fetch everything a course page needs (course, outline, exercises,
+ * enrollment and progress) in a single request.
+ * Invalidating `courseKeys.detail(courseId)` refreshes it too.
+ */
+export const useCourseBundle = (courseId: number) => {
+  return useQuery({
+    queryKey: courseKeys.bundle(courseId),
+    queryFn: () => courseService.getCourseBundle(courseId),
+    enabled: !!courseId,
+  });
+};
+
+/**
+ * Hook to fetch a course's lesson outline (no lesson text).
+ */
+export const useCourseOutline = (courseId: number) => {
+  return useQuery({
+    queryKey: courseKeys.outline(courseId),
+    queryFn: () => courseService.getCourseOutline(courseId),
+    enabled: !!courseId,
+  });
+};
+
+const LESSON_STALE_TIME = 5 * 60 * 1000; // 5 minutes
+
+/**
+ * Hook to fetch one lesson's text. Given the course outline, it also prefetches the
+ * previous and next lessons, so turning a page is served from the cache.
+ */
+export const useLesson = (contentId: number, outline?: CourseLessonOutline[]) => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!outline || !contentId) return;
+    const index = outline.findIndex((lesson) => lesson.id === contentId);
+    if (index === -1) return;
+    [outline[index - 1], outline[index + 1]].forEach((neighbour) => {
+      if (neighbour) {
+        queryClient.prefetchQuery({
+          queryKey: courseKeys.lesson(neighbour.id),
+          queryFn: () => courseService.getLesson(neighbour.id),
+          staleTime: LESSON_STALE_TIME,
+        });
+      }
+    });
+  }, [contentId, outline, queryClient]);
+
+  return useQuery({
+    queryKey: courseKeys.lesson(contentId),
+    queryFn: () => courseService.getLesson(contentId),
+    enabled: !!contentId,
+    staleTime: LESSON_STALE_TIME,
+  });
+};
+
+/**
+ * Hook to poll the processing of an uploaded content item until it is ready or has failed.
+ */
+export const useContentProcessing = (contentId: number, enabled = true) => {
+  return useQuery({
+    queryKey: courseKeys.processing(contentId),
+    queryFn: () => courseService.getContentProcessing(contentId),
+    enabled: enabled && !!contentId,
+    refetchInterval: (query) => (query.state.data?.processing_status === 'PENDING' ? 3000 : false),
+  });
+};
+
 /**
  * Hook to fetch the current user's enrollments.
  */
@@ -63,6 +140,36 @@ export const useMyEnrollments = () => {
   });
 };
 
+/**
+ * Hook for reordering a course's lessons and exercises. On a 409 conflict, reload the
+ * course and reapply the change on top of the current order.
+ */
+export const useReorderCourse = () => {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: ({ courseId, data }: { courseId: number; data: ReorderCourseData }) =>
+      courseService.reorderCourse(courseId, data),
+    onSettled: (_, __, { courseId }) => {
+      queryClient.invalidateQueries({ queryKey: courseKeys.detail(courseId) });
+      queryClient.invalidateQueries({ queryKey: ['exercises', 'list', { courseId }] });
+    },
+  });
+};
+
+/**
+ * Hook for copying a course; redirect to `data.course.id` on success.
+ */
+export const useCloneCourse = () => {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: ({ courseId, title }: { courseId: number; title?: string }) =>
+      courseService.cloneCourse(courseId, title),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: courseKeys.lists() });
+    },
+  });
+};
+
 /**
  * Hook for enrolling in a course.
  */
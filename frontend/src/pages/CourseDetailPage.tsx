@@ -1,6 +1,6 @@
 import React from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { useCourseById, useMyEnrollments, useEnrollInCourse, useUnenrollFromCourse } from '../hooks/useCourses';
+import { useCourseBundle, useEnrollInCourse, useUnenrollFromCourse } from '../hooks/useCourses';
 import Loading from '../components/common/Loading';
 import { Clock, BarChart, User } from 'lucide-react';
 
@@ -8,13 +8,14 @@ const CourseDetailPage: React.FC = () => {
     const { courseId } = useParams<{ courseId: string }>();
     const numericCourseId = Number(courseId);
 
-    const { data: course, isLoading: isLoadingCourse, error: courseError } = useCourseById(numericCourseId);
-    const { data: enrollments, isLoading: isLoadingEnrollments } = useMyEnrollments();
+    // One request for the course and the user's enrollment in it.
+    const { data: bundle, isLoading: isLoadingCourse, error: courseError } = useCourseBundle(numericCourseId);
+    const course = bundle?.course;
     
     const enrollMutation = useEnrollInCourse();
     const unenrollMutation = useUnenrollFromCourse();
 
-    const isEnrolled = enrollments?.some(e => e.course_id === numericCourseId);
+    const isEnrolled = !!bundle?.enrollment;
     
     const handleEnroll = () => {
         enrollMutation.mutate(numericCourseId);
@@ -24,7 +25,7 @@ const CourseDetailPage: React.FC = () => {
         unenrollMutation.mutate(numericCourseId);
     };
 
-    if (isLoadingCourse || isLoadingEnrollments) {
+    if (isLoadingCourse) {
         return <Loading fullScreen />;
     }
 
@@ -2,12 +2,13 @@ import React, { useState } from 'react';
 import CourseList from '../components/courses/CourseList';
 import { useCourses, useCourseMeta } from '../hooks/useCourses';
 import useDebounce from '../hooks/useDebounce';
-import { DifficultyLevel } from '../types/course.types';
+import { CourseSort, DifficultyLevel } from '../types/course.types';
 
 const CoursesPage: React.FC = () => {
     const [searchTerm, setSearchTerm] = useState('');
     const [difficulty, setDifficulty] = useState<DifficultyLevel | ''>('');
     const [category, setCategory] = useState('');
+    const [sort, setSort] = useState<CourseSort>('newest');
 
     const debouncedSearchTerm = useDebounce(searchTerm, 500);
 
@@ -15,9 +16,11 @@ const CoursesPage: React.FC = () => {
         search: debouncedSearchTerm,
         difficulty: difficulty,
         category: category,
+        sort: sort,
     };
 
-    const { data: courses, isLoading, error } = useCourses(filters);
+    const { data, isLoading, error, fetchNextPage, hasNextPage, isFetchingNextPage } = useCourses(filters);
+    const courses = data?.pages.flatMap(page => page.courses);
     const { data: meta } = useCourseMeta();
 
     return (
@@ -54,10 +57,31 @@ const CoursesPage: React.FC = () => {
                         <option value="">All Categories</option>
                         {meta?.categories.map(c => <option key={c} value={c}>{c}</option>)}
                     </select>
+                    <select
+                        className="select select-bordered w-full md:w-auto"
+                        value={sort}
+                        onChange={(e) => setSort(e.target.value as CourseSort)}
+                    >
+                        <option value="newest">Newest</option>
+                        <option value="popular">Most popular</option>
+                        <option value="title">Title (A-Z)</option>
+                    </select>
                 </div>
             </div>
 
             <CourseList courses={courses} isLoading={isLoading} error={error as Error | null} />
+
+            {hasNextPage && (
+                <div className="flex justify-center mt-8">
+                    <button
+                        className="btn btn-outline"
+                        onClick={() => fetchNextPage()}
+                        disabled={isFetchingNextPage}
+                    >
+                        {isFetchingNextPage ? 'Loading...' : 'Load more courses'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
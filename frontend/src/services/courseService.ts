@@ -1,3 +1,4 @@
+import axios from 'axios';
 import api from './api';
 import {
   Course,
@@ -8,16 +9,28 @@ import {
   UpdateCourseData,
   AddCourseContentData,
   CourseFilters,
+  CoursePage,
+  CourseBundle,
+  ClonedCourse,
+  ContentProcessing,
+  CourseLessonOutline,
+  ReorderCourseData,
+  ReorderCourseResult,
+  DirectUpload,
 } from '../types/course.types';
 
 /**
- * Retrieves a list of courses, with optional filtering.
+ * Retrieves one page of courses, with optional filtering and sorting.
+ * Pass the previous page's `next_cursor` as `cursor` to fetch the next page.
  * Corresponds to: GET /api/courses/
  */
 export const getCourses = async (
-  params?: CourseFilters
-): Promise<Course[]> => {
-  const response = await api.get<Course[]>('/courses/', { params });
+  params?: CourseFilters,
+  cursor?: string | null
+): Promise<CoursePage> => {
+  const response = await api.get<CoursePage>('/courses/', {
+    params: { ...params, ...(cursor ? { cursor } : {}) },
+  });
   return response.data;
 };
 
@@ -40,6 +53,16 @@ export const getCourseById = async (courseId: number): Promise<Course> => {
   return response.data;
 };
 
+/**
+ * Retrieves a course together with its lesson outline, exercises and the
+ * current user's enrollment and progress.
+ * Corresponds to: GET /api/courses/<course_id>/bundle
+ */
+export const getCourseBundle = async (courseId: number): Promise<CourseBundle> => {
+  const response = await api.get<CourseBundle>(`/courses/${courseId}/bundle`);
+  return response.data;
+};
+
 /**
  * Updates an existing course.
  * Requires Course Creator or Admin role.
@@ -65,6 +88,27 @@ export const deleteCourse = async (
   return response.data;
 };
 
+/**
+ * Copies a course with its contents and exercises. The copy is unpublished.
+ * Requires Course Creator or Admin role.
+ * Corresponds to: POST /api/courses/<course_id>/clone
+ */
+export const cloneCourse = async (courseId: number, title?: string): Promise<ClonedCourse> => {
+  const response = await api.post<ClonedCourse>(`/courses/${courseId}/clone`, title ? { title } : {});
+  return response.data;
+};
+
+/**
+ * Reorders a course's lessons and/or exercises in one request.
+ * Fails with 409 if the course changed since `data.updated_at`.
+ * Requires Course Creator or Admin role.
+ * Corresponds to: PUT /api/courses/<course_id>/order
+ */
+export const reorderCourse = async (courseId: number, data: ReorderCourseData): Promise<ReorderCourseResult> => {
+  const response = await api.put<ReorderCourseResult>(`/courses/${courseId}/order`, data);
+  return response.data;
+};
+
 /**
  * Enrolls the current user in a specific course.
  * Corresponds to: POST /api/courses/<course_id>/enroll
@@ -110,7 +154,65 @@ export const getCourseContent = async (
 };
 
 /**
- * Adds a new content item to a course. Handles both JSON and file uploads.
+ * Retrieves the lesson outline of a course; lesson bodies are not read or sent.
+ * Corresponds to: GET /api/courses/<course_id>/content?outline=true
+ */
+export const getCourseOutline = async (courseId: number): Promise<CourseLessonOutline[]> => {
+  const response = await api.get<CourseLessonOutline[]>(`/courses/${courseId}/content`, {
+    params: { outline: true },
+  });
+  return response.data;
+};
+
+/**
+ * Retrieves a single lesson with its text. The response carries an ETag, so the
+ * browser revalidates a lesson it has seen before and gets a 304 if it is unchanged.
+ * Corresponds to: GET /api/courses/content/<content_id>
+ */
+export const getLesson = async (contentId: number): Promise<CourseContent> => {
+  const response = await api.get<CourseContent>(`/courses/content/${contentId}`);
+  return response.data;
+};
+
+/**
+ * Starts a direct upload of a lesson file.
+ * Requires Course Creator or Admin role.
+ * Corresponds to: POST /api/courses/<course_id>/content/upload
+ */
+export const startContentUpload = async (courseId: number, file: File): Promise<DirectUpload> => {
+  const response = await api.post<DirectUpload>(`/courses/${courseId}/content/upload`, {
+    filename: file.name,
+    content_type: file.type || undefined,
+  });
+  return response.data;
+};
+
+/**
+ * Sends a file to the target from startContentUpload.
+ * Uses plain axios: the URL is presigned, so it must not carry the API's Authorization header.
+ */
+export const uploadToStorage = async (
+  upload: DirectUpload,
+  file: File,
+  onUploadProgress?: (fraction: number) => void
+): Promise<void> => {
+  const progress = onUploadProgress
+    ? { onUploadProgress: (event: { loaded: number; total?: number }) => onUploadProgress(event.loaded / (event.total || file.size)) }
+    : {};
+  if (upload.method === 'POST') {
+    const formData = new FormData();
+    Object.entries(upload.fields ?? {}).forEach(([name, value]) => formData.append(name, value));
+    // S3 ignores form fields after the file, so it goes last.
+    formData.append('file', file);
+    await axios.post(upload.url, formData, progress);
+  } else {
+    await axios.put(upload.url, file, { headers: upload.headers, ...progress });
+  }
+};
+
+/**
+ * Adds a new content item to a course. Files are uploaded straight to storage first,
+ * then the content is recorded with the upload's token.
  * Requires Course Creator or Admin role.
  * Corresponds to: POST /api/courses/<course_id>/content
  */
@@ -118,34 +220,20 @@ export const addCourseContent = async (
   courseId: number,
   data: AddCourseContentData
 ): Promise<CourseContent> => {
-  let requestBody: FormData | AddCourseContentData;
-  const headers = {};
-
+  let uploadToken: string | undefined;
   if (data.file) {
-    const formData = new FormData();
-    formData.append('title', data.title);
-    formData.append('content_type', data.content_type);
-    formData.append('file', data.file);
-    if (data.order_index !== undefined) {
-      formData.append('order_index', String(data.order_index));
-    }
-    requestBody = formData;
-    // Axios will set the correct multipart/form-data header with boundary
-  } else {
-    requestBody = {
-      title: data.title,
-      content_type: data.content_type,
-      content_text: data.content_text,
-      order_index: data.order_index,
-    };
-    headers['Content-Type'] = 'application/json';
+    const upload = await startContentUpload(courseId, data.file);
+    await uploadToStorage(upload, data.file, data.onUploadProgress);
+    uploadToken = upload.upload_token;
   }
 
-  const response = await api.post<CourseContent>(
-    `/courses/${courseId}/content`,
-    requestBody,
-    { headers }
-  );
+  const response = await api.post<CourseContent>(`/courses/${courseId}/content`, {
+    title: data.title,
+    content_type: data.content_type,
+    content_text: data.content_text,
+    order_index: data.order_index,
+    upload_token: uploadToken,
+  });
   return response.data;
 };
 
@@ -161,6 +249,15 @@ export const deleteCourseContent = async (
   return response.data;
 };
 
+/**
+ * Retrieves the processing state and derived assets of an uploaded content item.
+ * Corresponds to: GET /api/courses/content/<content_id>/processing
+ */
+export const getContentProcessing = async (contentId: number): Promise<ContentProcessing> => {
+  const response = await api.get<ContentProcessing>(`/courses/content/${contentId}/processing`);
+  return response.data;
+};
+
 /**
  * Retrieves metadata for UI filters (categories and difficulties).
  * Public endpoint.
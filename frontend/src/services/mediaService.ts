@@ -0,0 +1,14 @@
+import api from './api';
+import { MediaLink } from '../types/course.types';
+
+/**
+ * Gets the URL of an uploaded file, for use as an <audio>, <video>, <img> or link src.
+ * Media elements cannot send the Authorization header, so the URL carries a token signed
+ * for this one file. It stays the same for a while, so the browser can cache the file.
+ * Corresponds to: GET /api/media/<name>/link, for a content_url of 'uploads/<name>'
+ */
+export const getMediaUrl = async (contentUrl: string): Promise<string> => {
+  const name = contentUrl.split('/').pop() ?? contentUrl;
+  const response = await api.get<MediaLink>(`/media/${encodeURIComponent(name)}/link`);
+  return response.data.url;
+};
@@ -56,6 +56,22 @@ export interface Enrollment {
  */
 export type ContentType = 'text' | 'video' | 'audio' | 'document' | 'image';
 
+/**
+ * State of the background processing of an uploaded video, audio or image.
+ * Based on: CourseContent.processing_status (null when there is nothing to process)
+ */
+export type ProcessingStatus = 'PENDING' | 'READY' | 'FAILED';
+
+/**
+ * Files and data built from an upload. URLs are content URLs; pass them to getMediaUrl.
+ * Based on: CourseContent.derived_assets
+ */
+export interface DerivedAssets {
+  renditions?: { url: string; bitrate: string; height?: number }[];
+  thumbnail?: string;
+  waveform?: { peaks: number[]; duration: number }; // peaks are 0-1, duration in seconds
+}
+
 /**
  * Represents a single piece of content within a course.
  * Based on: CourseContent Schema
@@ -68,10 +84,117 @@ export interface CourseContent {
   content_url: string | null;
   content_text: string | null;
   order_index: number;
+  processing_status: ProcessingStatus | null;
+  derived_assets: DerivedAssets | null;
+  processing_error: string | null;
   created_at: string; // ISO 8601 date string
   updated_at: string; // ISO 8601 date string
 }
 
+/**
+ * Payload for reordering a course; each list must hold every id of its kind exactly once.
+ * Based on: PUT /api/courses/<course_id>/order
+ */
+export interface ReorderCourseData {
+  updated_at: string; // the course's updated_at as last loaded
+  contents?: number[];
+  exercises?: number[];
+}
+
+/**
+ * Result of a reorder. Use `updated_at` as the base of the next edit.
+ * A 409 response carries the course's current `updated_at` instead.
+ */
+export interface ReorderCourseResult {
+  updated_at: string;
+  contents_moved: number;
+  exercises_moved: number;
+}
+
+/**
+ * A lesson as listed by the course outline, without its text.
+ * Based on: GET /api/courses/<course_id>/content?outline=true
+ */
+export type CourseLessonOutline = Pick<
+  CourseContent,
+  'id' | 'course_id' | 'title' | 'content_type' | 'content_url' | 'order_index' | 'processing_status' | 'updated_at'
+>;
+
+/**
+ * Processing state of an upload, polled after adding file content.
+ * Based on: GET /api/courses/content/<content_id>/processing
+ */
+export type ContentProcessing = Pick<CourseContent, 'id' | 'processing_status' | 'processing_error' | 'derived_assets'>;
+
+/**
+ * A lesson as listed in a course outline, without its text.
+ * Based on: GET /api/courses/<course_id>/bundle -> contents
+ */
+export type CourseContentOutline = Pick<CourseContent, 'id' | 'title' | 'content_type' | 'content_url' | 'order_index'>;
+
+/**
+ * An exercise as listed in a course bundle.
+ * Based on: GET /api/courses/<course_id>/bundle -> exercises
+ */
+export interface CourseBundleExercise {
+  exercise_id: number;
+  title: string;
+  exercise_type: string;
+  difficulty_level: string;
+  points: number;
+  time_limit: number | null;
+  order_index: number | null;
+  is_active: boolean;
+}
+
+/**
+ * The caller's progress in a course.
+ * Based on: app/models/progress.py -> ProgressTrackingSchema
+ */
+export interface CourseProgress {
+  id: number;
+  user_id: number;
+  course_id: number;
+  lessons_completed: number;
+  exercises_completed: number;
+  total_score: number;
+  average_accuracy: string;
+  time_spent: number;
+  streak_days: number;
+  skill_scores: Record<string, number> | null;
+  last_activity: string;
+  updated_at: string;
+}
+
+/**
+ * Everything needed to open a course page, in one response.
+ * `enrollment` and `progress` are null when the caller isn't enrolled / has no progress yet.
+ * Based on: GET /api/courses/<course_id>/bundle
+ */
+export interface CourseBundle {
+  course: Course;
+  contents: CourseContentOutline[];
+  exercises: CourseBundleExercise[];
+  enrollment: {
+    id: number;
+    status: Enrollment['status'];
+    enrollment_date: string;
+    completion_percentage: string;
+    last_accessed: string;
+  } | null;
+  progress: CourseProgress | null;
+}
+
+/**
+ * Result of copying a course, with the ids of the copied rows keyed by their source ids.
+ * Based on: POST /api/courses/<course_id>/clone
+ */
+export interface ClonedCourse {
+  course: Course;
+  contents: Record<string, number>;
+  exercises: Record<string, number>;
+}
+
 /**
  * Represents the metadata for course filtering options.
  * Based on: GET /api/courses/meta-info
@@ -110,8 +233,40 @@ export interface AddCourseContentData {
   order_index?: number;
   content_text?: string;
   file?: File;
+  /** Called with the fraction (0-1) of the file uploaded so far. */
+  onUploadProgress?: (fraction: number) => void;
+}
+
+/**
+ * Where to send a lesson file so it goes straight to storage.
+ * 'POST': a multipart form with `fields`, then the file as 'file'. 'PUT': the file as the body, with `headers`.
+ * Based on: POST /api/courses/<course_id>/content/upload
+ */
+export interface DirectUpload {
+  upload_token: string;
+  method: 'POST' | 'PUT';
+  url: string;
+  fields?: Record<string, string>;
+  headers?: Record<string, string>;
+  expires_in: number;
+  max_size: number;
+}
+
+/**
+ * A URL for an uploaded file that needs no Authorization header; `expires_at` is a Unix time in seconds.
+ * Based on: GET /api/media/<name>/link
+ */
+export interface MediaLink {
+  url: string;
+  expires_at: number;
 }
 
+/**
+ * Sort orders supported by the course catalog.
+ * Based on: GET /api/courses/?sort=
+ */
+export type CourseSort = 'newest' | 'popular' | 'title';
+
 /**
  * Data shape for filtering the course list.
  * Based on: GET /api/courses/
@@ -120,4 +275,15 @@ export interface CourseFilters {
   search?: string;
   difficulty?: DifficultyLevel | '';
   category?: string | '';
+  sort?: CourseSort;
+}
+
+/**
+ * A single page of the course catalog.
+ * `next_cursor` is passed back as `cursor` to fetch the following page; it is null on the last page.
+ * Based on: GET /api/courses/
+ */
+export interface CoursePage {
+  courses: Course[];
+  next_cursor: string | null;
 }
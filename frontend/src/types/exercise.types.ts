@@ -61,11 +61,15 @@ export interface CreateExercisePayload {
     }
 }
 
+// An answer: text; one entry per blank for multi-blank exercises;
+// prompt -> answer for matching and vocabulary exercises.
+export type ExerciseAnswer = string | string[] | Record<string, string>;
+
 // Payload for submitting an answer
 export interface SubmitAttemptPayload {
     exerciseId: number;
     payload: {
-        answer: string;
+        answer: ExerciseAnswer;
         time_taken?: number;
     }
 }